@@ -0,0 +1,380 @@
+"""Almacenamiento local de semanas guardadas en SQLite.
+
+Guarda el resumen de cada semana y sus siete registros diarios por empleado
+y semana_key, para que los horarios sobrevivan a reinicios de la aplicación
+y puedan consultarse por rangos sin pasar por Google Sheets. Lo usan tanto
+la interfaz como los procesos por lotes (importador_horarios --db).
+
+La tabla agregados_mes mantiene los totales por empleado y mes (según la
+fecha de cada día, así una semana que cruza de mes aporta a ambos). Se
+ajusta por diferencia en la misma transacción que guarda o borra semanas;
+resumen_periodos la combina en trimestres y años.
+
+La tabla borradores guarda el formulario sin guardar de las semanas que la
+interfaz expulsa de la sesión (ver estado_semanas); no cuenta en los totales.
+"""
+import datetime
+import json
+import sqlite3
+import threading
+from datetime import timedelta
+
+from motor_salario import (
+    DIAS_SEMANA,
+    obtener_rango_semana,
+    formato_horas_minutos,
+    formato_horas_minutos_texto,
+)
+
+RUTA_POR_DEFECTO = 'salario.db'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS semanas (
+    empleado TEXT NOT NULL,
+    semana_key TEXT NOT NULL,
+    lunes TEXT NOT NULL,
+    domingo TEXT NOT NULL,
+    dias_trabajados INTEGER NOT NULL,
+    minutos_trabajados INTEGER NOT NULL,
+    pago_base INTEGER NOT NULL,
+    recargos INTEGER NOT NULL,
+    total_semanal INTEGER NOT NULL,
+    version_tarifas TEXT,
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (empleado, semana_key)
+);
+CREATE INDEX IF NOT EXISTS idx_semanas_empleado_lunes ON semanas (empleado, lunes);
+CREATE INDEX IF NOT EXISTS idx_semanas_lunes ON semanas (lunes);
+CREATE TABLE IF NOT EXISTS dias (
+    empleado TEXT NOT NULL,
+    semana_key TEXT NOT NULL,
+    indice_dia INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    entrada TEXT,
+    salida TEXT,
+    minutos_trabajados INTEGER NOT NULL,
+    pago_base INTEGER NOT NULL,
+    pago_total INTEGER NOT NULL,
+    recargo INTEGER NOT NULL,
+    descripcion TEXT NOT NULL,
+    sin_trabajo INTEGER NOT NULL,
+    segmentos TEXT,
+    PRIMARY KEY (empleado, semana_key, indice_dia),
+    FOREIGN KEY (empleado, semana_key) REFERENCES semanas (empleado, semana_key) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS agregados_mes (
+    empleado TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    dias_trabajados INTEGER NOT NULL,
+    minutos_trabajados INTEGER NOT NULL,
+    pago_base INTEGER NOT NULL,
+    recargos INTEGER NOT NULL,
+    total_pagado INTEGER NOT NULL,
+    PRIMARY KEY (empleado, mes)
+);
+CREATE TABLE IF NOT EXISTS borradores (
+    empleado TEXT NOT NULL,
+    semana_key TEXT NOT NULL,
+    form_data TEXT NOT NULL,
+    guardado INTEGER NOT NULL,
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (empleado, semana_key)
+);
+"""
+
+COLUMNAS_AGREGADOS = ('dias_trabajados', 'minutos_trabajados', 'pago_base', 'recargos', 'total_pagado')
+
+# Aportes de los días guardados de una semana, agrupados por mes ('AAAA-MM')
+CONSULTA_APORTES_SEMANA = """
+SELECT empleado, substr(fecha, 1, 7) AS mes, SUM(1 - sin_trabajo), SUM(minutos_trabajados),
+       SUM(pago_base), SUM(recargo), SUM(pago_total)
+FROM dias WHERE empleado = ? AND semana_key = ? GROUP BY mes
+"""
+
+
+def obtener_clave_semana(lunes):
+    """semana_key con el mismo formato que usa la interfaz ('AAAAMMDD_AAAAMMDD')"""
+    lunes, domingo = obtener_rango_semana(lunes)
+    return f"{lunes.strftime('%Y%m%d')}_{domingo.strftime('%Y%m%d')}"
+
+def _sumar_aporte(aportes, clave, valores):
+    actuales = aportes.setdefault(clave, [0] * len(COLUMNAS_AGREGADOS))
+    for i, valor in enumerate(valores):
+        actuales[i] += valor
+
+def _hora_texto(hora):
+    return hora.strftime('%H:%M') if hora is not None else None
+
+def _hora_desde_texto(texto):
+    return datetime.datetime.strptime(texto, '%H:%M').time() if texto else None
+
+def _segmentos_texto(segmentos):
+    """Tramos de un turno partido como '08:00-12:00,14:00-18:00'"""
+    if not segmentos:
+        return None
+    return ",".join(f"{_hora_texto(tramo['entrada'])}-{_hora_texto(tramo['salida'])}" for tramo in segmentos)
+
+def _segmentos_desde_texto(texto):
+    tramos = []
+    for tramo in texto.split(','):
+        entrada, salida = tramo.split('-')
+        tramos.append({'entrada': _hora_desde_texto(entrada), 'salida': _hora_desde_texto(salida)})
+    return tramos
+
+
+class AlmacenSemanas:
+    """Semanas y registros diarios en un archivo SQLite, compartible entre hilos.
+
+    Todas las escrituras de un llamado ocurren en una sola transacción; las
+    semanas guardadas de nuevo reemplazan a las anteriores.
+    """
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.row_factory = sqlite3.Row
+        self._conexion.execute("PRAGMA foreign_keys = ON")
+        if ruta != ':memory:':
+            self._conexion.execute("PRAGMA journal_mode = WAL")
+            self._conexion.execute("PRAGMA synchronous = NORMAL")
+        with self._conexion:
+            self._conexion.executescript(ESQUEMA)
+            columnas = {fila['name'] for fila in self._conexion.execute("PRAGMA table_info(dias)")}
+            if 'segmentos' not in columnas:
+                # Bases creadas antes de los turnos partidos
+                self._conexion.execute("ALTER TABLE dias ADD COLUMN segmentos TEXT")
+        # Bases creadas antes de existir agregados_mes
+        if (self._conexion.execute("SELECT 1 FROM agregados_mes LIMIT 1").fetchone() is None
+                and self._conexion.execute("SELECT 1 FROM dias LIMIT 1").fetchone() is not None):
+            self.reconstruir_agregados()
+
+    def guardar_semana(self, empleado, lunes, registros_semana, horarios_completos, version_tarifas=None):
+        """Guarda (o reemplaza) una semana de un empleado"""
+        self.guardar_semanas([(empleado, lunes, registros_semana, horarios_completos, version_tarifas)])
+
+    def guardar_semanas(self, semanas):
+        """Guarda muchas semanas en una sola transacción.
+
+        semanas: iterable de (empleado, lunes, registros_semana, horarios_completos, version_tarifas).
+        Si una semana de un empleado aparece varias veces se guarda la última.
+        Retorna la cantidad de semanas guardadas.
+        """
+        semanas_lote = {}
+        actualizado = datetime.datetime.now().isoformat(timespec='seconds')
+
+        for empleado, lunes, registros_semana, horarios_completos, version_tarifas in semanas:
+            lunes, domingo = obtener_rango_semana(lunes)
+            lunes, domingo = lunes.date(), domingo.date()
+            semana_key = obtener_clave_semana(lunes)
+            fila_semana = (
+                empleado, semana_key, lunes.isoformat(), domingo.isoformat(),
+                sum(1 for registro in registros_semana if not registro['sin_trabajo']),
+                sum(registro['minutos_trabajados'] for registro in registros_semana),
+                sum(registro['pago_base'] for registro in registros_semana),
+                sum(registro['recargo'] for registro in registros_semana),
+                sum(registro['pago_total'] for registro in registros_semana),
+                version_tarifas, actualizado
+            )
+            filas_dias_semana = []
+            for i, registro in enumerate(registros_semana):
+                horario = horarios_completos.get(registro['dia'], {})
+                filas_dias_semana.append((
+                    empleado, semana_key, i, (lunes + timedelta(days=i)).isoformat(),
+                    _hora_texto(horario.get('entrada')), _hora_texto(horario.get('salida')),
+                    registro['minutos_trabajados'], registro['pago_base'], registro['pago_total'],
+                    registro['recargo'], registro['descripcion'], 1 if registro['sin_trabajo'] else 0,
+                    _segmentos_texto(horario.get('segmentos'))
+                ))
+            # Una repetición reemplaza a la anterior: sus aportes no se descuentan ni insertan dos veces
+            semanas_lote[(empleado, semana_key)] = (fila_semana, filas_dias_semana)
+
+        filas_semanas = [fila_semana for fila_semana, _ in semanas_lote.values()]
+        filas_dias = [fila for _, filas_dias_semana in semanas_lote.values() for fila in filas_dias_semana]
+
+        aportes = {}
+        for fila in filas_dias:
+            _sumar_aporte(aportes, (fila[0], fila[3][:7]), (1 - fila[11], fila[6], fila[7], fila[9], fila[8]))
+
+        with self._lock, self._conexion:
+            # Descontar lo que aportaban las versiones anteriores de estas semanas
+            for fila in filas_semanas:
+                self._descontar_semana(aportes, fila[0], fila[1])
+            # Borrar primero los días para que una semana más corta no deje días viejos
+            self._conexion.executemany(
+                "DELETE FROM dias WHERE empleado = ? AND semana_key = ?",
+                [(fila[0], fila[1]) for fila in filas_semanas]
+            )
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO semanas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas_semanas
+            )
+            self._conexion.executemany(
+                "INSERT INTO dias VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas_dias
+            )
+            self._aplicar_aportes(aportes)
+        return len(filas_semanas)
+
+    def _descontar_semana(self, aportes, empleado, semana_key):
+        for fila in self._conexion.execute(CONSULTA_APORTES_SEMANA, (empleado, semana_key)):
+            _sumar_aporte(aportes, (fila[0], fila[1]), tuple(-valor for valor in fila[2:]))
+
+    def _aplicar_aportes(self, aportes):
+        """Suma las diferencias por (empleado, mes) a agregados_mes"""
+        self._conexion.executemany(
+            """INSERT INTO agregados_mes VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (empleado, mes) DO UPDATE SET
+                   dias_trabajados = dias_trabajados + excluded.dias_trabajados,
+                   minutos_trabajados = minutos_trabajados + excluded.minutos_trabajados,
+                   pago_base = pago_base + excluded.pago_base,
+                   recargos = recargos + excluded.recargos,
+                   total_pagado = total_pagado + excluded.total_pagado""",
+            [clave + tuple(valores) for clave, valores in aportes.items()]
+        )
+        self._conexion.execute(
+            "DELETE FROM agregados_mes WHERE dias_trabajados = 0 AND minutos_trabajados = 0 AND total_pagado = 0"
+        )
+
+    def reconstruir_agregados(self):
+        """Recalcula agregados_mes desde todos los días guardados"""
+        with self._lock, self._conexion:
+            self._conexion.execute("DELETE FROM agregados_mes")
+            self._conexion.execute(
+                """INSERT INTO agregados_mes
+                   SELECT empleado, substr(fecha, 1, 7), SUM(1 - sin_trabajo), SUM(minutos_trabajados),
+                          SUM(pago_base), SUM(recargo), SUM(pago_total)
+                   FROM dias GROUP BY empleado, substr(fecha, 1, 7)"""
+            )
+
+    def agregados_mes(self, empleado=None, desde=None, hasta=None):
+        """Totales por empleado y mes, con desde/hasta como 'AAAA-MM' inclusive"""
+        condiciones = ["mes BETWEEN ? AND ?"]
+        parametros = [desde or '0000-00', hasta or '9999-99']
+        if empleado is not None:
+            condiciones.append("empleado = ?")
+            parametros.append(empleado)
+        with self._lock:
+            filas = self._conexion.execute(
+                f"SELECT * FROM agregados_mes WHERE {' AND '.join(condiciones)} ORDER BY empleado, mes", parametros
+            ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def cargar_semana(self, empleado, lunes):
+        """Retorna (registros_semana, horarios_completos, total_semanal) o None si no está guardada"""
+        semana_key = obtener_clave_semana(lunes)
+        with self._lock:
+            semana = self._conexion.execute(
+                "SELECT total_semanal FROM semanas WHERE empleado = ? AND semana_key = ?", (empleado, semana_key)
+            ).fetchone()
+            if semana is None:
+                return None
+            dias = self._conexion.execute(
+                "SELECT * FROM dias WHERE empleado = ? AND semana_key = ? ORDER BY indice_dia", (empleado, semana_key)
+            ).fetchall()
+
+        registros_semana = []
+        horarios_completos = {}
+        for fila in dias:
+            dia = DIAS_SEMANA[fila['indice_dia']]
+            minutos_trabajados = fila['minutos_trabajados']
+            registros_semana.append({
+                'dia': dia,
+                'minutos_trabajados': minutos_trabajados,
+                'horas_formato': formato_horas_minutos(minutos_trabajados),
+                'horas_texto': formato_horas_minutos_texto(minutos_trabajados),
+                'horas_decimal': minutos_trabajados / 60,
+                'pago_base': fila['pago_base'],
+                'pago_total': fila['pago_total'],
+                'recargo': fila['recargo'],
+                'descripcion': fila['descripcion'],
+                'sin_trabajo': bool(fila['sin_trabajo'])
+            })
+            if fila['entrada'] is not None and not fila['sin_trabajo']:
+                horarios_completos[dia] = {
+                    'entrada': _hora_desde_texto(fila['entrada']),
+                    'salida': _hora_desde_texto(fila['salida'])
+                }
+                if fila['segmentos']:
+                    horarios_completos[dia]['segmentos'] = _segmentos_desde_texto(fila['segmentos'])
+        return registros_semana, horarios_completos, semana['total_semanal']
+
+    def eliminar_semana(self, empleado, lunes):
+        """Borra una semana y sus días; retorna True si existía"""
+        semana_key = obtener_clave_semana(lunes)
+        aportes = {}
+        with self._lock, self._conexion:
+            self._descontar_semana(aportes, empleado, semana_key)
+            cursor = self._conexion.execute(
+                "DELETE FROM semanas WHERE empleado = ? AND semana_key = ?", (empleado, semana_key)
+            )
+            self._aplicar_aportes(aportes)
+        return cursor.rowcount > 0
+
+    def semanas_empleado(self, empleado, desde=None, hasta=None):
+        """Resúmenes de las semanas del empleado entre las semanas de desde y hasta (inclusive), en orden"""
+        desde = obtener_rango_semana(desde)[0].date().isoformat() if desde is not None else '0001-01-01'
+        hasta = obtener_rango_semana(hasta)[0].date().isoformat() if hasta is not None else '9999-12-31'
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT * FROM semanas WHERE empleado = ? AND lunes BETWEEN ? AND ? ORDER BY lunes",
+                (empleado, desde, hasta)
+            ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def totales_por_empleado(self, ultimas_semanas, hasta=None):
+        """Totales por empleado en las últimas N semanas hasta la semana de 'hasta' (hoy por defecto).
+
+        Retorna {empleado: {'semanas', 'minutos_trabajados', 'pago_base', 'recargos', 'total_pagado'}}.
+        """
+        lunes_final = obtener_rango_semana(hasta)[0].date()
+        lunes_inicial = lunes_final - timedelta(weeks=ultimas_semanas - 1)
+        with self._lock:
+            filas = self._conexion.execute(
+                """SELECT empleado, COUNT(*) AS semanas, SUM(minutos_trabajados) AS minutos_trabajados,
+                          SUM(pago_base) AS pago_base, SUM(recargos) AS recargos, SUM(total_semanal) AS total_pagado
+                   FROM semanas WHERE lunes BETWEEN ? AND ? GROUP BY empleado""",
+                (lunes_inicial.isoformat(), lunes_final.isoformat())
+            ).fetchall()
+        return {fila['empleado']: {clave: fila[clave] for clave in fila.keys() if clave != 'empleado'} for fila in filas}
+
+    def guardar_borrador(self, empleado, lunes, form_data, guardado=False):
+        """Guarda (o reemplaza) el formulario de una semana tal como está en la interfaz.
+
+        guardado indica si la semana tenía sus horarios guardados al expulsarla.
+        """
+        contenido = {
+            'horarios': {clave: _hora_texto(hora) for clave, hora in form_data['horarios'].items()},
+            'recargos': form_data['recargos'],
+            'sin_trabajo': form_data['sin_trabajo'],
+            'tramos': form_data.get('tramos', {})
+        }
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO borradores VALUES (?, ?, ?, ?, ?)",
+                (empleado, obtener_clave_semana(lunes), json.dumps(contenido, ensure_ascii=False),
+                 1 if guardado else 0, datetime.datetime.now().isoformat(timespec='seconds'))
+            )
+
+    def cargar_borrador(self, empleado, lunes):
+        """Retorna (form_data, guardado) del borrador de una semana, o None si no hay"""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT form_data, guardado FROM borradores WHERE empleado = ? AND semana_key = ?",
+                (empleado, obtener_clave_semana(lunes))
+            ).fetchone()
+        if fila is None:
+            return None
+        form_data = json.loads(fila['form_data'])
+        form_data['horarios'] = {clave: _hora_desde_texto(texto) for clave, texto in form_data['horarios'].items()}
+        return form_data, bool(fila['guardado'])
+
+    def eliminar_borrador(self, empleado, lunes):
+        """Borra el borrador de una semana; retorna True si existía"""
+        with self._lock, self._conexion:
+            cursor = self._conexion.execute(
+                "DELETE FROM borradores WHERE empleado = ? AND semana_key = ?", (empleado, obtener_clave_semana(lunes))
+            )
+        return cursor.rowcount > 0
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
@@ -1,54 +1,42 @@
 import streamlit as st
 import datetime
-import base64
+import functools
+import os
 from datetime import timedelta
 
-# Manejo de importaciones
-try:
-    from fpdf import FPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from motor_salario import (
+    REGLAS_TARIFAS,
+    DIAS_SEMANA,
+    obtener_rango_semana,
+    formato_horas_minutos_texto,
+    huella_reglas_tarifas,
+    horario_desde_segmentos,
+    actualizar_reglas_tarifas,
+    reglas_para_fecha,
+    SemanaIncremental,
+)
+from reporte_pdf import PDF_AVAILABLE, renderizar_pdf, obtener_nombre_pdf, huella_reporte
+from exportador_sheets import guardar_semana
+from conexion_sheets import SHEETS_AVAILABLE, ConexionSheets
+from cola_exportaciones import ColaExportaciones, COMPLETADO, ERROR
+from almacen_semanas import AlmacenSemanas, RUTA_POR_DEFECTO
+from resumen_periodos import PERIODOS, nombre_periodo, resumen_por_periodo
+from estado_semanas import MAXIMO_SEMANAS, TTL_SEMANAS, RegistroSemanasSesion
+from metricas import METRICAS, contar, medir, medido
+from reglas_tarifas import obtener_catalogo
 
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-    SHEETS_AVAILABLE = True
-except ImportError:
-    SHEETS_AVAILABLE = False
+# Empleado y base SQLite donde se guardan las semanas de esta instalación. Sin inicio
+# de sesión (st.login) todas las sesiones usan EMPLEADO_APP: la base es de un solo usuario
+EMPLEADO_APP = os.environ.get('SALARIO_EMPLEADO', 'principal')
+RUTA_ALMACEN = os.environ.get('SALARIO_DB', RUTA_POR_DEFECTO)
 
-# REGLAS Y TARIFAS (Centralizadas para fácil mantenimiento)
-REGLAS_TARIFAS = {
-    "hora_normal": 15500,
-    "tarifa_6_horas": 100000,
-    "recargos_disponibles": {
-        "Ninguno": 0,
-        "$5,000": 5000,
-        "$10,000": 10000,
-        "$15,000": 15000,
-        "$20,000": 20000,
-        "$25,000": 25000,
-        "$40,000": 40000
-    },
-    "descripciones": {
-        "menos_6_horas": "Menos de 6 horas: Horas trabajadas × $15,500",
-        "exacto_6_horas": "Exactamente 6 horas: $100,000 fijos",
-        "mas_6_horas": "Más de 6 horas: $100,000 + (horas extra × $15,500)",
-        "recargos": "Recargos: Se suman al pago base según corresponda"
-    }
-}
+# Semanas que conserva cada sesión y segundos sin uso antes de expulsarlas (quedan como borrador en la base)
+MAXIMO_SEMANAS_SESION = int(os.environ.get('SALARIO_MAX_SEMANAS_SESION', MAXIMO_SEMANAS))
+TTL_SEMANAS_SESION = int(os.environ.get('SALARIO_TTL_SEMANAS_SESION', TTL_SEMANAS))
 
-def obtener_rango_semana(fecha_referencia=None):
-    """Obtiene el rango de fechas de la semana (lunes a domingo)"""
-    if fecha_referencia is None:
-        fecha_referencia = datetime.datetime.now()
-    elif isinstance(fecha_referencia, datetime.date):
-        fecha_referencia = datetime.datetime.combine(fecha_referencia, datetime.time())
-    
-    # Encontrar el lunes de esta semana
-    lunes = fecha_referencia - timedelta(days=fecha_referencia.weekday())
-    domingo = lunes + timedelta(days=6)
-    return lunes, domingo
+# Panel de métricas siempre visible y archivo de exportación en formato Prometheus
+MODO_DEBUG = os.environ.get('SALARIO_DEBUG', '') not in ('', '0')
+RUTA_METRICAS = os.environ.get('SALARIO_METRICAS_ARCHIVO')
 
 def selector_semana():
     """Crea un selector de semana personalizado"""
@@ -95,8 +83,11 @@ def selector_semana():
     
     return lunes, domingo
 
-def mostrar_reglas_tarifas():
-    """Muestra las reglas y tarifas en la interfaz"""
+def mostrar_reglas_tarifas(reglas=None):
+    """Muestra las reglas y tarifas en la interfaz (por defecto, REGLAS_TARIFAS)"""
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    umbral = reglas.get('umbral_horas', 6)
     with st.container():
         st.markdown("---")
         st.markdown("### 📊 REGLAS Y TARIFAS APLICADAS")
@@ -106,55 +97,168 @@ def mostrar_reglas_tarifas():
         with col1:
             st.markdown("#### 💰 Tarifas Actuales")
             st.markdown(f"""
-            - **Hora normal:** `${REGLAS_TARIFAS['hora_normal']:,.0f}`
-            - **6 horas completas:** `${REGLAS_TARIFAS['tarifa_6_horas']:,.0f}`
-            - **Horas extra:** `${REGLAS_TARIFAS['hora_normal']:,.0f}` c/u
+            - **Hora normal:** `${reglas['hora_normal']:,.0f}`
+            - **{umbral} horas completas:** `${reglas['tarifa_6_horas']:,.0f}`
+            - **Horas extra:** `${reglas['hora_normal']:,.0f}` c/u
             """)
             
         with col2:
             st.markdown("#### 📝 Reglas de Cálculo")
-            st.markdown("""
-            - **Menos de 6 horas:** Horas × $15,500
-            - **Exactamente 6 horas:** $100,000 fijos  
-            - **Más de 6 horas:** $100,000 + (horas extra × $15,500)
+            st.markdown(f"""
+            - **Menos de {umbral} horas:** Horas × ${reglas['hora_normal']:,.0f}
+            - **Exactamente {umbral} horas:** ${reglas['tarifa_6_horas']:,.0f} fijos  
+            - **Más de {umbral} horas:** ${reglas['tarifa_6_horas']:,.0f} + (horas extra × ${reglas['hora_normal']:,.0f})
             - **Recargos:** Se suman al pago base
             """)
         
         st.markdown("#### 🎯 Recargos Disponibles")
-        recargos_html = "".join([f'<span style="background-color: #52FA0A; padding: 4px 8px; margin: 2px; border-radius: 4px; display: inline-block;">{key}</span>' for key in REGLAS_TARIFAS['recargos_disponibles'].keys()])
+        recargos_html = "".join([f'<span style="background-color: #52FA0A; padding: 4px 8px; margin: 2px; border-radius: 4px; display: inline-block;">{key}</span>' for key in reglas['recargos_disponibles'].keys()])
         st.markdown(f'<div style="margin: 10px 0;">{recargos_html}</div>', unsafe_allow_html=True)
 
-def formato_horas_minutos(minutos_totales):
-    """Convierte minutos totales a formato hh:mm"""
-    if minutos_totales == 0:
-        return "00:00"
-    horas = int(minutos_totales // 60)
-    minutos = int(minutos_totales % 60)
-    return f"{horas:02d}:{minutos:02d}"
+@st.cache_resource(show_spinner=False)
+def obtener_almacen():
+    """Base SQLite de semanas compartida por todas las sesiones del proceso"""
+    return AlmacenSemanas(RUTA_ALMACEN)
+
+def empleado_actual():
+    """Clave de las semanas de la sesión: el correo del usuario autenticado o, sin inicio de sesión, EMPLEADO_APP"""
+    # Sin autenticación configurada st.user puede no tener is_logged_in
+    if st.user.get('is_logged_in'):
+        return st.user.get('email') or st.user.get('sub') or EMPLEADO_APP
+    return EMPLEADO_APP
+
+def autenticacion_configurada():
+    """Indica si secrets.toml tiene la sección [auth] que requiere st.login"""
+    try:
+        return 'auth' in st.secrets
+    except Exception:
+        return False
+
+def cargar_form_data_guardado(lunes):
+    """Reconstruye el form_data de una semana guardada en la base local, o None si no existe"""
+    try:
+        semana = obtener_almacen().cargar_semana(empleado_actual(), lunes)
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo leer la base local: {str(e)}")
+        return None
+    if semana is None:
+        return None
+    
+    registros_semana, horarios_completos, _ = semana
+    nombres_recargo = {valor: nombre for nombre, valor in reglas_para_fecha(lunes)['recargos_disponibles'].items()}
+    form_data = {'horarios': {}, 'recargos': {}, 'sin_trabajo': {}, 'tramos': {}}
+    for registro in registros_semana:
+        dia = registro['dia']
+        form_data['sin_trabajo'][dia] = registro['sin_trabajo']
+        if dia in horarios_completos:
+            tramos = horarios_completos[dia].get('segmentos') or [horarios_completos[dia]]
+            form_data['tramos'][dia] = len(tramos)
+            for j, tramo in enumerate(tramos):
+                sufijo = f"_{j}" if j else ""
+                form_data['horarios'][f"{dia}_entrada{sufijo}"] = tramo['entrada']
+                form_data['horarios'][f"{dia}_salida{sufijo}"] = tramo['salida']
+            form_data['recargos'][dia] = nombres_recargo.get(registro['recargo'], "Ninguno")
+    return form_data
 
-def formato_horas_minutos_texto(minutos_totales):
-    """Convierte minutos totales a formato 'hh horas y mm minutos'"""
-    if minutos_totales == 0:
-        return "0 horas y 0 minutos"
-    horas = int(minutos_totales // 60)
-    minutos = int(minutos_totales % 60)
-    return f"{horas} hora{'s' if horas != 1 else ''} y {minutos} minuto{'s' if minutos != 1 else ''}"
+def cargar_borrador_semana(lunes):
+    """Retorna (form_data, guardado) del borrador de una semana expulsada de la sesión, o None"""
+    try:
+        return obtener_almacen().cargar_borrador(empleado_actual(), lunes)
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo leer la base local: {str(e)}")
+        return None
 
+def guardar_borrador_expulsado(semana_key, valores):
+    """Guarda en la base local el formulario de una semana que se expulsa de la sesión"""
+    form_data = valores.get(f'form_data_{semana_key}')
+    if not form_data or not form_data['horarios']:
+        return
+    lunes = datetime.datetime.strptime(semana_key.split('_')[0], '%Y%m%d')
+    try:
+        obtener_almacen().guardar_borrador(
+            empleado_actual(), lunes, form_data, valores.get(f'horarios_guardados_{semana_key}', False)
+        )
+    except Exception as e:
+        st.warning(f"⚠️ No se pudo guardar el borrador en la base local: {str(e)}")
+
+def mostrar_resumen_periodos():
+    """Muestra los totales mensuales, trimestrales o anuales de las semanas guardadas"""
+    with st.expander("📆 Resumen por Período"):
+        col_periodo, col_anio = st.columns(2)
+        with col_periodo:
+            periodo = st.selectbox(
+                "Agrupar por",
+                options=list(PERIODOS.keys()),
+                format_func=lambda clave: PERIODOS[clave],
+                key="resumen_periodo"
+            )
+        with col_anio:
+            anio_actual = datetime.datetime.now().year
+            anio = st.selectbox("Año", options=list(range(anio_actual, anio_actual - 5, -1)), key="resumen_anio")
+        
+        try:
+            totales = resumen_por_periodo(obtener_almacen(), periodo, empleado_actual(), anio)
+        except Exception as e:
+            st.warning(f"⚠️ No se pudo leer la base local: {str(e)}")
+            return
+        
+        if not totales:
+            st.info("No hay semanas guardadas en este año")
+            return
+        
+        filas = ["| Período | Días | Horas | Pago base | Recargos | Total |", "|---|---|---|---|---|---|"]
+        for total in totales:
+            filas.append(
+                f"| {nombre_periodo(total['periodo'])} | {total['dias_trabajados']} | {total['horas_texto']} | "
+                f"${total['pago_base']:,.0f} | ${total['recargos']:,.0f} | **${total['total_pagado']:,.0f}** |"
+            )
+        st.markdown("\n".join(filas))
+
+@medido('formulario_horarios')
 def crear_formulario_horarios(lunes, domingo):
     """Crea los controles de horarios sin formulario para permitir reruns automáticos"""
     
     # Inicializar session state para esta semana si no existe
     semana_key = f"{lunes.strftime('%Y%m%d')}_{domingo.strftime('%Y%m%d')}"
     
+    # Acotar la memoria de la sesión: las semanas menos usadas salen del session_state
+    semanas_sesion = st.session_state.setdefault(
+        'semanas_sesion', RegistroSemanasSesion(MAXIMO_SEMANAS_SESION, TTL_SEMANAS_SESION)
+    )
+    expulsadas = semanas_sesion.usar(st.session_state, semana_key, guardar_borrador_expulsado)
+    if expulsadas:
+        contar('semanas_expulsadas', len(expulsadas))
+    
     if f'form_data_{semana_key}' not in st.session_state:
-        st.session_state[f'form_data_{semana_key}'] = {
-            'horarios': {},
-            'recargos': {},
-            'sin_trabajo': {}
-        }
+        # Recuperar la semana de la base local: el borrador si se expulsó de la sesión,
+        # si no la semana guardada en una sesión anterior
+        borrador = cargar_borrador_semana(lunes)
+        form_data_guardado = cargar_form_data_guardado(lunes) if borrador is None else None
+        if borrador is not None:
+            st.session_state[f'form_data_{semana_key}'], st.session_state[f'horarios_guardados_{semana_key}'] = borrador
+        elif form_data_guardado is not None:
+            st.session_state[f'form_data_{semana_key}'] = form_data_guardado
+            st.session_state[f'horarios_guardados_{semana_key}'] = True
+        else:
+            st.session_state[f'form_data_{semana_key}'] = {
+                'horarios': {},
+                'recargos': {},
+                'sin_trabajo': {},
+                'tramos': {}
+            }
     
     form_data = st.session_state[f'form_data_{semana_key}']
-    dias_semana = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+    form_data.setdefault('tramos', {})
+    dias_semana = DIAS_SEMANA
+    
+    # Cálculos por día memorizados: solo se recalcula el día cuyos controles cambiaron
+    if f'calculo_{semana_key}' not in st.session_state:
+        st.session_state[f'calculo_{semana_key}'] = SemanaIncremental()
+    calculo_semana = st.session_state[f'calculo_{semana_key}']
+    # Las tarifas son las de la versión vigente el lunes de la semana seleccionada
+    reglas = reglas_para_fecha(lunes)
+    version_tarifas = huella_reglas_tarifas(reglas)
+    recargos_disponibles = reglas['recargos_disponibles']
     
     registros_semana = []
     horarios_completos = {}
@@ -184,6 +288,7 @@ def crear_formulario_horarios(lunes, domingo):
                 hora_entrada = datetime.time(0, 0)
                 hora_salida = datetime.time(0, 0)
                 recargo = 0
+                segmentos = None
                 
             else:
                 # DÍA CON TRABAJO - Expander siempre expandido y funcional
@@ -210,21 +315,51 @@ def crear_formulario_horarios(lunes, domingo):
                             key=f"salida_{semana_key}_{i}"
                         )
                     
+                    # Tramos adicionales para turnos partidos
+                    segmentos = [(hora_entrada, hora_salida)]
+                    tramos = st.number_input(
+                        f"Tramos {dia}",
+                        min_value=1,
+                        max_value=6,
+                        value=form_data['tramos'].get(dia, 1),
+                        key=f"tramos_{semana_key}_{i}",
+                        help="Más de un tramo si el día tiene turno partido; los tramos solapados se cuentan una vez"
+                    )
+                    for j in range(1, tramos):
+                        col_entrada_tramo, col_salida_tramo = st.columns(2)
+                        with col_entrada_tramo:
+                            entrada_tramo = st.time_input(
+                                f"Entrada {j + 1}",
+                                value=form_data['horarios'].get(f"{dia}_entrada_{j}", datetime.time(18, 0)),
+                                key=f"entrada_{semana_key}_{i}_{j}"
+                            )
+                        with col_salida_tramo:
+                            salida_tramo = st.time_input(
+                                f"Salida {j + 1}",
+                                value=form_data['horarios'].get(f"{dia}_salida_{j}", datetime.time(20, 0)),
+                                key=f"salida_{semana_key}_{i}_{j}"
+                            )
+                        segmentos.append((entrada_tramo, salida_tramo))
+                        form_data['horarios'][f"{dia}_entrada_{j}"] = entrada_tramo
+                        form_data['horarios'][f"{dia}_salida_{j}"] = salida_tramo
+                    form_data['tramos'][dia] = tramos
+                    
                     # Selector de recargo
+                    opciones_recargo = list(recargos_disponibles.keys())
                     recargo_default = form_data['recargos'].get(dia, "Ninguno")
+                    if recargo_default not in opciones_recargo:
+                        # El recargo guardado ya no existe en esta versión de tarifas
+                        recargo_default = opciones_recargo[0]
                     recargo_seleccionado = st.selectbox(
                         f"Recargo {dia}",
-                        options=list(REGLAS_TARIFAS['recargos_disponibles'].keys()),
-                        index=list(REGLAS_TARIFAS['recargos_disponibles'].keys()).index(recargo_default),
+                        options=opciones_recargo,
+                        index=opciones_recargo.index(recargo_default),
                         key=f"recargo_{semana_key}_{i}"
                     )
-                    recargo = REGLAS_TARIFAS['recargos_disponibles'][recargo_seleccionado]
+                    recargo = recargos_disponibles[recargo_seleccionado]
                     
                     # Guardar horarios completos
-                    horarios_completos[dia] = {
-                        'entrada': hora_entrada,
-                        'salida': hora_salida
-                    }
+                    horarios_completos[dia] = horario_desde_segmentos(segmentos)
                     
                     # Actualizar form_data
                     form_data['horarios'][f"{dia}_entrada"] = hora_entrada
@@ -234,39 +369,10 @@ def crear_formulario_horarios(lunes, domingo):
             # Actualizar estado de día sin trabajo
             form_data['sin_trabajo'][dia] = sin_trabajo
             
-            # Calcular horas trabajadas en minutos
-            if sin_trabajo:
-                minutos_trabajados = 0
-                horas_trabajadas = 0
-                # Forzar recargo a 0 cuando es día sin trabajo
-                recargo = 0
-            else:
-                minutos_entrada = hora_entrada.hour * 60 + hora_entrada.minute
-                minutos_salida = hora_salida.hour * 60 + hora_salida.minute
-                
-                if minutos_salida >= minutos_entrada:
-                    minutos_trabajados = minutos_salida - minutos_entrada
-                else:
-                    minutos_trabajados = (24 * 60 - minutos_entrada) + minutos_salida
-                
-                horas_trabajadas = minutos_trabajados / 60
-            
-            # Calcular pago del día
-            pago_total, descripcion, pago_base = calcular_pago_dia(horas_trabajadas, recargo)
-            
-            # Guardar registro con formato hh:mm
-            registro = {
-                'dia': dia,
-                'minutos_trabajados': minutos_trabajados,
-                'horas_formato': formato_horas_minutos(minutos_trabajados),
-                'horas_texto': formato_horas_minutos_texto(minutos_trabajados),  # Nuevo formato de texto
-                'horas_decimal': horas_trabajadas,
-                'pago_base': int(round(pago_base, 0)),  # Redondear a entero
-                'pago_total': int(round(pago_total, 0)),  # Redondear a entero
-                'recargo': recargo,
-                'descripcion': descripcion,
-                'sin_trabajo': sin_trabajo
-            }
+            # Calcular horas y pago del día (reutiliza el cálculo si no cambió)
+            registro = calculo_semana.actualizar_dia(
+                i, dia, hora_entrada, hora_salida, recargo, sin_trabajo, version_tarifas, reglas, segmentos
+            )
             registros_semana.append(registro)
     
     # Botones de acción fuera del flujo principal
@@ -276,6 +382,11 @@ def crear_formulario_horarios(lunes, domingo):
         if st.button("💾 Guardar Horarios", use_container_width=True):
             st.session_state[f'form_data_{semana_key}'] = form_data
             st.session_state[f'horarios_guardados_{semana_key}'] = True  # Marcar como guardado
+            try:
+                obtener_almacen().guardar_semana(empleado_actual(), lunes, registros_semana, horarios_completos, reglas['version'])
+                obtener_almacen().eliminar_borrador(empleado_actual(), lunes)
+            except Exception as e:
+                st.warning(f"⚠️ No se pudo guardar en la base local: {str(e)}")
             st.success("✅ Horarios guardados (listos para calcular)")
     
     with col2:
@@ -284,9 +395,15 @@ def crear_formulario_horarios(lunes, domingo):
             st.session_state[f'form_data_{semana_key}'] = {
                 'horarios': {},
                 'recargos': {},
-                'sin_trabajo': {}
+                'sin_trabajo': {},
+                'tramos': {}
             }
             st.session_state[f'horarios_guardados_{semana_key}'] = False  # Marcar como no guardado
+            try:
+                obtener_almacen().eliminar_semana(empleado_actual(), lunes)
+                obtener_almacen().eliminar_borrador(empleado_actual(), lunes)
+            except Exception as e:
+                st.warning(f"⚠️ No se pudo borrar de la base local: {str(e)}")
             st.info("🗑️ Horarios limpiados")
             st.rerun()  # Forzar actualización para limpiar inmediatamente
     
@@ -299,181 +416,22 @@ def crear_formulario_horarios(lunes, domingo):
     else:
         return [], {}, False
 
-def calcular_pago_dia(horas_trabajadas, recargo):
-    """Calcula el pago del día según las reglas establecidas"""
-    HORA_NORMAL = REGLAS_TARIFAS['hora_normal']
-    TARIFA_6_HORAS = REGLAS_TARIFAS['tarifa_6_horas']
-    
-    if horas_trabajadas == 0:
-        return 0, "Día sin trabajo", 0
-    elif horas_trabajadas < 6:
-        pago_base = horas_trabajadas * HORA_NORMAL
-        return int(round(pago_base + recargo, 0)), f"Horas normales ({horas_trabajadas:.2f}h)", int(round(pago_base, 0))
-    elif horas_trabajadas == 6:
-        return int(round(TARIFA_6_HORAS + recargo, 0)), "6 horas completas", TARIFA_6_HORAS
-    else:
-        horas_extra = horas_trabajadas - 6
-        pago_base = TARIFA_6_HORAS + (horas_extra * HORA_NORMAL)
-        return int(round(pago_base + recargo, 0)), f"6h + {horas_extra:.2f}h extra", int(round(pago_base, 0))
+@st.cache_data(max_entries=64, show_spinner=False)
+def obtener_pdf_semana(semana_key, huella_datos, _registros_semana, _total_semanal, _horarios_completos, _lunes_semana, _domingo_semana):
+    """Bytes del PDF de una semana, generados una sola vez por (semana, huella de los datos).
 
-def generar_pdf(registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana):
-    """Genera un PDF con el reporte detallado incluyendo reglas y tarifas"""
-    if not PDF_AVAILABLE:
-        return None
-    
-    try:
-        pdf = FPDF()
-        pdf.add_page()
-        
-        fecha_generacion = datetime.datetime.now()
-        
-        # Título con rango de fechas
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, 'REPORTE DE SALARIO SEMANAL', new_x="LMARGIN", new_y="NEXT", align='C')
-        pdf.ln(2)
-        
-        # Rango de fechas de la semana
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 10, f'Semana: {lunes_semana.strftime("%d/%m/%Y")} - {domingo_semana.strftime("%d/%m/%Y")}', new_x="LMARGIN", new_y="NEXT", align='C')
-        pdf.ln(2)
-        
-        # Fecha y hora de generación
-        pdf.set_font('Arial', 'I', 10)
-        pdf.cell(0, 10, f'Generado el: {fecha_generacion.strftime("%d/%m/%Y a las %H:%M")}', new_x="LMARGIN", new_y="NEXT", align='C')
-        pdf.ln(10)
-        
-        # SECCIÓN MEJORADA: REGLAS Y TARIFAS EN PDF
-        pdf.set_font('Arial', 'B', 14)
-        pdf.cell(0, 10, 'REGLAS Y TARIFAS APLICADAS:', new_x="LMARGIN", new_y="NEXT")
-        pdf.ln(5)
-        
-        # Tarifas
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'TARIFAS:', new_x="LMARGIN", new_y="NEXT")
-        pdf.set_font('Arial', '', 10)
-        pdf.cell(0, 6, f"- Hora normal: ${REGLAS_TARIFAS['hora_normal']:,.0f}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 6, f"- 6 horas completas: ${REGLAS_TARIFAS['tarifa_6_horas']:,.0f}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 6, f"- Horas extra: ${REGLAS_TARIFAS['hora_normal']:,.0f} c/u", new_x="LMARGIN", new_y="NEXT")
-        pdf.ln(5)
-        
-        # Reglas
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'REGLAS DE CALCULO:', new_x="LMARGIN", new_y="NEXT")
-        pdf.set_font('Arial', '', 10)
-        reglas = [
-            REGLAS_TARIFAS['descripciones']['menos_6_horas'],
-            REGLAS_TARIFAS['descripciones']['exacto_6_horas'],
-            REGLAS_TARIFAS['descripciones']['mas_6_horas'],
-            REGLAS_TARIFAS['descripciones']['recargos']
-        ]
-        
-        for regla in reglas:
-            pdf.cell(0, 6, regla, new_x="LMARGIN", new_y="NEXT")
-        
-        # Recargos
-        pdf.ln(5)
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 8, 'RECARGOS DISPONIBLES:', new_x="LMARGIN", new_y="NEXT")
-        pdf.set_font('Arial', '', 10)
-        recargos_texto = ", ".join(REGLAS_TARIFAS['recargos_disponibles'].keys())
-        pdf.cell(0, 6, recargos_texto, new_x="LMARGIN", new_y="NEXT")
-        
-        pdf.ln(10)
-        
-        # Tabla de datos
-        pdf.set_font('Arial', 'B', 14)
-        pdf.cell(0, 10, 'DETALLE POR DIA:', new_x="LMARGIN", new_y="NEXT")
-        pdf.ln(5)
-        
-        # Encabezados de tabla
-        pdf.set_font('Arial', 'B', 9)
-        pdf.cell(25, 10, 'DIA', border=1, align='C')
-        pdf.cell(25, 10, 'FECHA', border=1, align='C')
-        pdf.cell(20, 10, 'ENTRADA', border=1, align='C')
-        pdf.cell(20, 10, 'SALIDA', border=1, align='C')
-        pdf.cell(20, 10, 'HORAS', border=1, align='C')
-        pdf.cell(30, 10, 'PAGO BASE', border=1, align='C')
-        pdf.cell(25, 10, 'RECARGO', border=1, align='C')
-        pdf.cell(35, 10, 'TOTAL DIA', border=1, new_x="LMARGIN", new_y="NEXT", align='C')
-        
-        # Datos de la tabla
-        pdf.set_font('Arial', '', 9)
-        
-        for i, registro in enumerate(registros_semana):
-            # Calcular fecha específica para cada día
-            fecha_dia = lunes_semana + timedelta(days=i)
-            fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
-            
-            dia = registro['dia']
-            if dia in horarios_completos and not registro['sin_trabajo']:
-                # Formatear hora en formato 12h AM/PM para el PDF
-                entrada = horarios_completos[dia]['entrada']
-                salida = horarios_completos[dia]['salida']
-                
-                entrada_str = entrada.strftime('%I:%M %p').lstrip('0')
-                salida_str = salida.strftime('%I:%M %p').lstrip('0')
-            else:
-                entrada_str = "---"
-                salida_str = "---"
-            
-            pdf.cell(25, 10, registro['dia'][:7], border=1, align='C')
-            pdf.cell(25, 10, fecha_dia_str, border=1, align='C')
-            pdf.cell(20, 10, entrada_str, border=1, align='C')
-            pdf.cell(20, 10, salida_str, border=1, align='C')
-            pdf.cell(20, 10, registro['horas_formato'], border=1, align='C')  # Usar formato hh:mm
-            pdf.cell(30, 10, f"${registro['pago_base']:,.0f}", border=1, align='C')
-            pdf.cell(25, 10, f"${registro['recargo']:,.0f}", border=1, align='C')
-            pdf.cell(35, 10, f"${registro['pago_total']:,.0f}", border=1, new_x="LMARGIN", new_y="NEXT", align='C')
-        
-        pdf.ln(10)
-        
-        # CALCULAR TOTAL DE HORAS TRABAJADAS EN MINUTOS
-        total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in registros_semana)
-        total_horas_formato = formato_horas_minutos(total_minutos_trabajados)
-        total_horas_texto = formato_horas_minutos_texto(total_minutos_trabajados)  # Nuevo formato
-        
-        # Totales
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, f'TOTAL SEMANAL: ${total_semanal:,.0f} COP', new_x="LMARGIN", new_y="NEXT", align='C')
-        pdf.set_font('Arial', 'B', 14)
-        pdf.cell(0, 10, f'TOTAL HORAS TRABAJADAS: {total_horas_texto}', new_x="LMARGIN", new_y="NEXT", align='C')
-        
-        # Análisis detallado
-        pdf.ln(10)
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 10, 'ANALISIS DETALLADO:', new_x="LMARGIN", new_y="NEXT")
-        pdf.set_font('Arial', '', 10)
-        
-        for i, registro in enumerate(registros_semana, 1):
-            fecha_dia = lunes_semana + timedelta(days=i-1)
-            fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
-            
-            dia = registro['dia']
-            if dia in horarios_completos and not registro['sin_trabajo']:
-                entrada = horarios_completos[dia]['entrada']
-                salida = horarios_completos[dia]['salida']
-                entrada_str = entrada.strftime('%I:%M %p').lstrip('0')
-                salida_str = salida.strftime('%I:%M %p').lstrip('0')
-                horario_info = f" ({entrada_str} - {salida_str})"
-            else:
-                horario_info = ""
-            
-            pdf.cell(0, 8, f"{i}. {registro['dia']} ({fecha_dia_str}): {registro['descripcion']}{horario_info}", new_x="LMARGIN", new_y="NEXT")
-            if registro['recargo'] > 0:
-                pdf.cell(0, 8, f"   + Recargo aplicado: ${registro['recargo']:,.0f}", new_x="LMARGIN", new_y="NEXT")
-            pdf.ln(2)
-        
-        # CORRECCIÓN: pdf.output() ya retorna bytes, no necesita encode
-        return pdf.output()
-        
-    except Exception as e:
-        st.error(f"Error generando PDF: {e}")
-        return None
+    Se llama desde el botón de descarga al hacer clic, no en cada rerun; los
+    argumentos con guion bajo no forman parte de la clave de la caché.
+    """
+    with medir('generar_pdf'):
+        return bytes(renderizar_pdf(_registros_semana, _total_semanal, _horarios_completos, _lunes_semana, _domingo_semana))
 
-def obtener_nombre_pdf(lunes_semana, domingo_semana):
-    """Genera el nombre del PDF con el formato solicitado"""
-    return f"Salary_sem_{lunes_semana.strftime('%d_%m_%y')}_to_{domingo_semana.strftime('%d_%m_%y')}.pdf"
+@st.cache_resource(show_spinner=False)
+def obtener_conexion_google_sheets(info_cuenta, spreadsheet_name):
+    """Conexión compartida por todas las sesiones del proceso; no se conecta hasta usarla"""
+    return ConexionSheets(info_cuenta, spreadsheet_name)
 
+@medido('setup_google_sheets')
 def setup_google_sheets():
     """Configura la conexión con Google Sheets"""
     if not SHEETS_AVAILABLE:
@@ -485,121 +443,57 @@ def setup_google_sheets():
             return None
             
         secrets = st.secrets['google_sheets']
-        SCOPES = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        creds = Credentials.from_service_account_info(dict(secrets), scopes=SCOPES)
-        client = gspread.authorize(creds)
-        
         spreadsheet_name = secrets.get('spreadsheet_name', 'Registro_Salarios_Semanal')
-        spreadsheet = client.open(spreadsheet_name)
         
-        return spreadsheet
+        # No se conecta aquí: autentica y lista las hojas al primer guardado
+        return obtener_conexion_google_sheets(dict(secrets), spreadsheet_name)
         
     except Exception as e:
         st.error(f"❌ Error conectando a Google Sheets: {e}")
         return None
 
-def guardar_en_google_sheets(spreadsheet, registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana):
-    """Guarda los datos en Google Sheets con fechas exactas"""
-    try:
-        fecha_guardado = datetime.datetime.now()
-        
-        # Crear nombre de la hoja con fecha
-        nombre_hoja = f"Semana_{lunes_semana.strftime('%d_%m_%y')}_a_{domingo_semana.strftime('%d_%m_%y')}"
-        
-        # Limpiar nombre de caracteres inválidos
-        nombre_hoja = "".join(c for c in nombre_hoja if c.isalnum() or c in (' ', '_', '-')).rstrip()
-        
-        # Crear o seleccionar worksheet
-        try:
-            worksheet = spreadsheet.worksheet(nombre_hoja)
-            worksheet.clear()
-        except gspread.WorksheetNotFound:
-            worksheet = spreadsheet.add_worksheet(title=nombre_hoja, rows="100", cols="20")
-        
-        # CALCULAR TOTAL DE HORAS TRABAJADAS
-        total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in registros_semana)
-        total_horas_texto = formato_horas_minutos_texto(total_minutos_trabajados)  # Nuevo formato
-        
-        # Preparar datos para Google Sheets
-        headers = [
-            'Día', 'Fecha', 'Entrada', 'Salida', 'Horas Trabajadas', 
-            'Pago Base', 'Recargo', 'Total Día', 'Descripción', 'Sin Trabajo'
-        ]
-        
-        data = [headers]
-        
-        for i, registro in enumerate(registros_semana):
-            # Calcular fecha específica para cada día
-            fecha_dia = lunes_semana + timedelta(days=i)
-            fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
-            
-            # Obtener horarios si existen
-            entrada_str = "---"
-            salida_str = "---"
-            
-            if registro['dia'] in horarios_completos and not registro['sin_trabajo']:
-                horario = horarios_completos[registro['dia']]
-                entrada_str = horario['entrada'].strftime('%I:%M %p').lstrip('0')
-                salida_str = horario['salida'].strftime('%I:%M %p').lstrip('0')
-            
-            fila = [
-                registro['dia'],
-                fecha_dia_str,
-                entrada_str,
-                salida_str,
-                registro['horas_formato'],  # Usar nuevo formato de texto
-                registro['pago_base'],
-                registro['recargo'],
-                registro['pago_total'],
-                registro['descripcion'],
-                "Sí" if registro['sin_trabajo'] else "No"
-            ]
-            data.append(fila)
-        
-        # Agregar filas de información
-        data.append([])  # Fila vacía
-        data.append(["TOTAL SEMANAL", "", "", "", "", "", "", total_semanal, "", ""])
-        data.append(["TOTAL HORAS TRABAJADAS", "", "", "", total_horas_texto, "", "", "", "", ""])  # Nuevo formato
-        data.append([])
-        data.append(["Fecha de registro", fecha_guardado.strftime("%d/%m/%Y %H:%M:%S")])
-        data.append(["Rango de semana", f"{lunes_semana.strftime('%d/%m/%Y')} - {domingo_semana.strftime('%d/%m/%Y')}"])
-        
-        # Escribir datos
-        worksheet.update('A1', data)
-        
-        # Aplicar formato básico
+@st.cache_resource(show_spinner=False)
+def obtener_cola_exportaciones():
+    """Cola de exportaciones compartida por todas las sesiones del proceso"""
+    return ColaExportaciones()
+
+@st.fragment(run_every=1)
+def mostrar_estado_exportaciones():
+    """Consulta los trabajos en segundo plano de esta sesión sin bloquear la interfaz"""
+    cola = obtener_cola_exportaciones()
+    
+    trabajo_sheets = st.session_state.get('trabajo_sheets')
+    if trabajo_sheets:
+        estado = cola.estado(trabajo_sheets)
+        if estado is None or estado['estado'] in (COMPLETADO, ERROR):
+            del st.session_state['trabajo_sheets']
+            if estado and estado['estado'] == COMPLETADO:
+                st.session_state.google_sheets_guardado = True
+                st.session_state.nombre_hoja_guardada = estado['resultado']
+            elif estado:
+                st.session_state.error_sheets = estado['error']
+            st.rerun()
+        st.info("💾 Guardando en Google Sheets en segundo plano...")
+
+def mostrar_metricas():
+    """Exporta las métricas a SALARIO_METRICAS_ARCHIVO y las muestra con ?debug=1 o SALARIO_DEBUG"""
+    if RUTA_METRICAS:
         try:
-            # Resaltar headers
-            worksheet.format('A1:J1', {
-                'backgroundColor': {'red': 0.2, 'green': 0.6, 'blue': 0.8},
-                'textFormat': {'bold': True, 'foregroundColor': {'red': 1.0, 'green': 1.0, 'blue': 1.0}}
-            })
-            
-            # Resaltar totales
-            total_row = len(data) - 4
-            worksheet.format(f'A{total_row}:J{total_row}', {
-                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.5},
-                'textFormat': {'bold': True}
-            })
-            
-            total_horas_row = len(data) - 3
-            worksheet.format(f'A{total_horas_row}:J{total_horas_row}', {
-                'backgroundColor': {'red': 0.8, 'green': 0.95, 'blue': 0.8},
-                'textFormat': {'bold': True}
-            })
-            
-        except Exception as format_error:
-            st.warning(f"⚠️ No se pudo aplicar formato automático: {format_error}")
-        
-        return nombre_hoja
-        
-    except Exception as e:
-        st.error(f"❌ Error guardando en Google Sheets: {e}")
-        return None
+            METRICAS.escribir_archivo(RUTA_METRICAS)
+        except OSError as e:
+            st.sidebar.warning(f"⚠️ No se pudieron exportar las métricas: {str(e)}")
+    
+    if not (MODO_DEBUG or st.query_params.get('debug') == '1'):
+        return
+    
+    resumen = METRICAS.resumen()
+    with st.sidebar.expander("🔧 Métricas del proceso", expanded=True):
+        for nombre, tiempo in sorted(resumen['tiempos'].items()):
+            st.write(f"**{nombre}:** {tiempo['cantidad']} × {tiempo['promedio'] * 1000:.1f} ms "
+                     f"(máx {tiempo['maximo'] * 1000:.1f} ms)")
+        for nombre, valor in sorted(resumen['contadores'].items()):
+            st.write(f"**{nombre}:** {valor:,}")
+        st.code(METRICAS.exportar_prometheus(), language='text')
 
 def main():
     # Configuración de la página
@@ -609,29 +503,35 @@ def main():
         layout="wide"
     )
     
+    # Con [auth] en secrets.toml cada usuario inicia sesión y guarda sus propias semanas
+    if autenticacion_configurada() and not st.user.get('is_logged_in'):
+        st.title("💰 Calculadora de Salario Semanal")
+        st.button("Iniciar sesión", on_click=st.login, type="primary")
+        st.stop()
+    
     # Título y descripción
     st.title("💰 Calculadora de Salario Semanal")
     
+    # Recargar reglas_tarifas.json si se modificó desde el último rerun
+    actualizar_reglas_tarifas()
+    if obtener_catalogo().error_carga:
+        st.warning(f"⚠️ No se pudo recargar el archivo de tarifas; se usan las anteriores ({obtener_catalogo().error_carga})")
+    
     # SELECTOR DE SEMANA
     lunes, domingo = selector_semana()
     
     # MOSTRAR REGLAS Y TARIFAS (siempre visible)
-    mostrar_reglas_tarifas()
+    mostrar_reglas_tarifas(reglas_para_fecha(lunes))
     
     st.markdown("### 📝 Ingresa tus horarios por día")
     
-    # Configurar Google Sheets
-    spreadsheet = None
-    if SHEETS_AVAILABLE:
-        spreadsheet = setup_google_sheets()
-    
     # Inicializar session state
     if 'registros_semana' not in st.session_state:
         st.session_state.registros_semana = []
     if 'total_semanal' not in st.session_state:
         st.session_state.total_semanal = 0
-    if 'pdf_bytes' not in st.session_state:
-        st.session_state.pdf_bytes = None
+    if 'total_minutos_trabajados' not in st.session_state:
+        st.session_state.total_minutos_trabajados = 0
     if 'horarios_completos' not in st.session_state:
         st.session_state.horarios_completos = {}
     if 'google_sheets_guardado' not in st.session_state:
@@ -643,7 +543,7 @@ def main():
     if limpiar:
         st.session_state.registros_semana = []
         st.session_state.total_semanal = 0
-        st.session_state.pdf_bytes = None
+        st.session_state.total_minutos_trabajados = 0
         st.session_state.horarios_completos = {}
         st.session_state.google_sheets_guardado = False
     
@@ -659,13 +559,13 @@ def main():
         if horarios_guardados:
             if st.button("📊 Calcular Salario Semanal", type="primary", use_container_width=True):
                 if registros_semana:
+                    # Totales ya ajustados por diferencia en SemanaIncremental al cambiar cada día
+                    calculo_semana = st.session_state[f'calculo_{semana_key}']
                     st.session_state.registros_semana = registros_semana
-                    st.session_state.total_semanal = int(round(sum(registro['pago_total'] for registro in registros_semana), 0))  # Redondear a entero
+                    st.session_state.total_semanal = calculo_semana.total_semanal
+                    st.session_state.total_minutos_trabajados = calculo_semana.total_minutos_trabajados
                     st.session_state.horarios_completos = horarios_completos
                     st.session_state.google_sheets_guardado = False
-                    
-                    if PDF_AVAILABLE:
-                        st.session_state.pdf_bytes = generar_pdf(registros_semana, st.session_state.total_semanal, horarios_completos, lunes, domingo)
                     st.success("✅ Cálculo completado")
                 else:
                     st.warning("⚠️ Primero ingresa los horarios y guarda el formulario")
@@ -676,22 +576,28 @@ def main():
                      help="⚠️ Primero debes guardar los horarios para poder calcular")
     
     with col2:
-        if spreadsheet and st.session_state.registros_semana and not st.session_state.google_sheets_guardado:
+        if 'error_sheets' in st.session_state:
+            st.error(f"❌ Error guardando en Google Sheets: {st.session_state.pop('error_sheets')}")
+        
+        if (SHEETS_AVAILABLE and st.session_state.registros_semana and not st.session_state.google_sheets_guardado
+                and 'trabajo_sheets' not in st.session_state):
             if st.button("💾 Guardar en Google Sheets", use_container_width=True):
-                with st.spinner("Guardando en Google Sheets..."):
-                    nombre_hoja = guardar_en_google_sheets(
-                        spreadsheet, 
-                        st.session_state.registros_semana, 
+                # La conexión se abre en el hilo de fondo solo al guardar y se reutiliza entre reruns
+                conexion = setup_google_sheets()
+                if conexion:
+                    st.session_state.trabajo_sheets = obtener_cola_exportaciones().enviar(
+                        'sheets',
+                        guardar_semana,
+                        conexion,
+                        st.session_state.registros_semana,
                         st.session_state.total_semanal,
                         st.session_state.horarios_completos,
                         lunes,
                         domingo
                     )
-                    if nombre_hoja:
-                        st.session_state.google_sheets_guardado = True
-                        st.success(f"✅ Guardado en Google Sheets: {nombre_hoja}")
         elif st.session_state.google_sheets_guardado:
-            st.success("✅ Ya guardado en Google Sheets")
+            nombre_hoja = st.session_state.get('nombre_hoja_guardada')
+            st.success(f"✅ Guardado en Google Sheets: {nombre_hoja}" if nombre_hoja else "✅ Ya guardado en Google Sheets")
     
     with col3:
         if st.button("🔄 Limpiar Todo", use_container_width=True):
@@ -699,6 +605,10 @@ def main():
                 del st.session_state[key]
             st.rerun()
     
+    # Estado de los trabajos en segundo plano (se refresca solo mientras haya alguno)
+    if 'trabajo_sheets' in st.session_state:
+        mostrar_estado_exportaciones()
+    
     # Mostrar resultados solo después de calcular
     if st.session_state.registros_semana:
         st.markdown("---")
@@ -707,7 +617,7 @@ def main():
         total_semanal = st.session_state.total_semanal
         
         # CALCULAR TOTAL DE HORAS TRABAJADAS
-        total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in st.session_state.registros_semana)
+        total_minutos_trabajados = st.session_state.total_minutos_trabajados
         total_horas_texto = formato_horas_minutos_texto(total_minutos_trabajados)  # Nuevo formato
         
         # Mostrar tabla de resultados con fechas
@@ -725,11 +635,11 @@ def main():
                 else:
                     dia = registro['dia']
                     if dia in st.session_state.horarios_completos:
-                        entrada = st.session_state.horarios_completos[dia]['entrada']
-                        salida = st.session_state.horarios_completos[dia]['salida']
-                        entrada_str = entrada.strftime('%I:%M %p').lstrip('0')
-                        salida_str = salida.strftime('%I:%M %p').lstrip('0')
-                        st.write(f"🕒 {entrada_str} - {salida_str}")
+                        horario = st.session_state.horarios_completos[dia]
+                        for tramo in horario.get('segmentos') or [horario]:
+                            entrada_str = tramo['entrada'].strftime('%I:%M %p').lstrip('0')
+                            salida_str = tramo['salida'].strftime('%I:%M %p').lstrip('0')
+                            st.write(f"🕒 {entrada_str} - {salida_str}")
             
             with col3:
                 if not registro['sin_trabajo']:
@@ -753,22 +663,28 @@ def main():
             st.success(f"## ⏱️ TOTAL HORAS: {total_horas_texto}")  # Nuevo formato
         
         # Sección para generar PDF
-        if PDF_AVAILABLE and st.session_state.pdf_bytes is not None:
+        if PDF_AVAILABLE:
             st.markdown("### 📄 Generar Reporte en PDF")
             
-            # Crear enlace de descarga con nombre personalizado
+            # El PDF se genera al hacer clic (en un hilo aparte) y se guarda en caché por semana y datos;
+            # la página solo lleva el botón, no los bytes del archivo
             try:
-                # Asegurarnos de que son bytes
-                if isinstance(st.session_state.pdf_bytes, str):
-                    b64_pdf = base64.b64encode(st.session_state.pdf_bytes.encode('latin1')).decode()
-                else:
-                    b64_pdf = base64.b64encode(st.session_state.pdf_bytes).decode()
-                    
                 nombre_pdf = obtener_nombre_pdf(lunes, domingo)
+                huella_datos = huella_reporte(
+                    st.session_state.registros_semana, total_semanal, st.session_state.horarios_completos, lunes
+                )
                 
-                st.markdown(
-                    f'<a href="data:application/pdf;base64,{b64_pdf}" download="{nombre_pdf}" style="background-color: #4CAF50; color: white; padding: 14px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; font-size: 16px; font-weight: bold; margin: 10px 0;">📥 DESCARGAR {nombre_pdf}</a>',
-                    unsafe_allow_html=True
+                st.download_button(
+                    f"📥 DESCARGAR {nombre_pdf}",
+                    data=functools.partial(
+                        obtener_pdf_semana, semana_key, huella_datos, st.session_state.registros_semana,
+                        total_semanal, st.session_state.horarios_completos, lunes, domingo
+                    ),
+                    file_name=nombre_pdf,
+                    mime="application/pdf",
+                    on_click="ignore",
+                    type="primary",
+                    key=f"descargar_pdf_{semana_key}"
                 )
                 
                 st.info("""
@@ -784,6 +700,13 @@ def main():
                 """)
             except Exception as e:
                 st.error(f"Error preparando PDF para descarga: {e}")
+    
+    # Totales de las semanas guardadas por mes, trimestre o año
+    st.markdown("---")
+    mostrar_resumen_periodos()
+    
+    mostrar_metricas()
 
 if __name__ == "__main__":
-    main()
+    with medir('rerun'):
+        main()
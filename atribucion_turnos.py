@@ -0,0 +1,73 @@
+"""Atribución de turnos nocturnos a días y semanas usando fechas y horas completas.
+
+calcular_minutos_trabajados asigna al día de entrada todos los minutos de un
+turno que cruza medianoche. Aquí cada turno se convierte en un intervalo
+[inicio, fin) de datetime y se divide en el corte configurado:
+
+- 'ninguno': sin división, igual que el formulario.
+- 'medianoche': cada día calendario recibe sus propios minutos.
+- 'semana': solo se divide en la medianoche del domingo al lunes, para que
+  la parte posterior cuente en la semana siguiente.
+
+Cada turno produce uno o dos Turno con la fecha a la que se atribuyen, sin
+duplicar minutos; el recargo queda en el día de entrada.
+"""
+import datetime
+from datetime import timedelta
+
+from motor_salario import Turno, calcular_minutos_trabajados
+
+CORTE_NINGUNO = 'ninguno'
+CORTE_MEDIANOCHE = 'medianoche'
+CORTE_SEMANA = 'semana'
+CORTES = (CORTE_NINGUNO, CORTE_MEDIANOCHE, CORTE_SEMANA)
+
+MEDIANOCHE = datetime.time(0, 0)
+
+
+def intervalo_turno(turno):
+    """Retorna (inicio, fin) como datetime del turno; fin cae al día siguiente si cruza medianoche"""
+    fecha = turno.fecha.date() if isinstance(turno.fecha, datetime.datetime) else turno.fecha
+    inicio = datetime.datetime.combine(fecha, turno.entrada)
+    return inicio, inicio + timedelta(minutes=calcular_minutos_trabajados(turno.entrada, turno.salida))
+
+def _es_corte(medianoche, corte):
+    if corte == CORTE_MEDIANOCHE:
+        return True
+    if corte == CORTE_SEMANA:
+        return medianoche.weekday() == 0
+    if corte == CORTE_NINGUNO:
+        return False
+    raise ValueError(f"Corte desconocido: {corte!r} (use {', '.join(CORTES)})")
+
+def dividir_turno(inicio, fin, recargo=0, corte=CORTE_SEMANA):
+    """Divide el intervalo [inicio, fin) en Turno atribuidos según el corte.
+
+    El turno debe durar menos de 24 horas, por lo que cruza a lo sumo una
+    medianoche. El tramo después del corte se registra desde las 00:00 del
+    día siguiente y sin recargo.
+    """
+    if fin < inicio:
+        raise ValueError(f"El turno termina ({fin}) antes de empezar ({inicio})")
+    if fin - inicio >= timedelta(days=1):
+        raise ValueError(f"El turno del {inicio.strftime('%d/%m/%Y %H:%M')} dura 24 horas o más")
+
+    medianoche = datetime.datetime.combine(inicio.date() + timedelta(days=1), MEDIANOCHE)
+    if fin <= medianoche or not _es_corte(medianoche, corte):
+        return [Turno(inicio.date(), inicio.time(), fin.time(), recargo)]
+    return [
+        Turno(inicio.date(), inicio.time(), MEDIANOCHE, recargo),
+        Turno(medianoche.date(), MEDIANOCHE, fin.time(), 0)
+    ]
+
+def atribuir_turno(turno, corte=CORTE_SEMANA):
+    """Divide un Turno de fecha y horas según el corte; los días sin trabajo no se tocan"""
+    if turno.sin_trabajo or corte == CORTE_NINGUNO:
+        return [turno]
+    inicio, fin = intervalo_turno(turno)
+    return dividir_turno(inicio, fin, turno.recargo, corte)
+
+def atribuir_turnos(turnos, corte=CORTE_SEMANA):
+    """Itera los tramos atribuidos de una secuencia de turnos"""
+    for turno in turnos:
+        yield from atribuir_turno(turno, corte)
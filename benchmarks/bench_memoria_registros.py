@@ -0,0 +1,59 @@
+"""Compara la memoria de un millón de días con dicts, RegistroDia y DiasCompactos.
+
+Uso: python benchmarks/bench_memoria_registros.py [cantidad_dias]
+"""
+import datetime
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_salario import DIAS_SEMANA, REGLAS_TARIFAS, calcular_registro_dia
+from registros_compactos import DiasCompactos, RegistroDia
+
+
+def generar_dias(cantidad, semilla=0):
+    """Genera (indice_dia, entrada, salida, recargo, sin_trabajo) sintéticos"""
+    aleatorio = random.Random(semilla)
+    recargos = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    for i in range(cantidad):
+        entrada = datetime.time(aleatorio.randrange(5, 12), aleatorio.choice((0, 15, 30, 45)))
+        salida = datetime.time(aleatorio.randrange(12, 24), aleatorio.choice((0, 15, 30, 45)))
+        yield i % 7, entrada, salida, aleatorio.choice(recargos), aleatorio.random() < 0.15
+
+def medir(construir, cantidad):
+    """Retorna los MB que quedan asignados tras construir la estructura"""
+    gc.collect()
+    tracemalloc.start()
+    estructura = construir(generar_dias(cantidad))
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estructura
+    return actual / 1024 / 1024
+
+def con_dicts(dias):
+    return [calcular_registro_dia(DIAS_SEMANA[i], entrada, salida, recargo, sin_trabajo)
+            for i, entrada, salida, recargo, sin_trabajo in dias]
+
+def con_slots(dias):
+    return [RegistroDia.calcular(i, entrada, salida, recargo, sin_trabajo)
+            for i, entrada, salida, recargo, sin_trabajo in dias]
+
+def con_columnas(dias):
+    columnas = DiasCompactos()
+    for i, entrada, salida, recargo, sin_trabajo in dias:
+        columnas.agregar_registro(RegistroDia.calcular(i, entrada, salida, recargo, sin_trabajo))
+    return columnas
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Días de empleados: {cantidad:,}")
+    for nombre, construir in (("dict por día", con_dicts), ("RegistroDia (__slots__)", con_slots), ("DiasCompactos (arrays)", con_columnas)):
+        megas = medir(construir, cantidad)
+        print(f"{nombre:<24} {megas:9.1f} MB  ({megas * 1024 * 1024 / cantidad:6.1f} bytes/día)")
+
+if __name__ == "__main__":
+    main()
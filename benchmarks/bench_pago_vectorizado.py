@@ -0,0 +1,73 @@
+"""Compara calcular_pagos_vectorizado contra un ciclo de calcular_pago_dia.
+
+Uso: python benchmarks/bench_pago_vectorizado.py [cantidad_turnos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_salario import REGLAS_TARIFAS, calcular_pago_dia
+from pago_vectorizado import calcular_pagos_vectorizado
+
+
+def generar_turnos(cantidad, semilla=0):
+    """Genera turnos sintéticos con entradas, salidas y recargos aleatorios"""
+    rng = np.random.default_rng(semilla)
+    recargos_disponibles = np.array(list(REGLAS_TARIFAS['recargos_disponibles'].values()))
+    minutos_entrada = rng.integers(0, 24 * 60, cantidad)
+    minutos_salida = rng.integers(0, 24 * 60, cantidad)
+    recargos = rng.choice(recargos_disponibles, cantidad)
+    return minutos_entrada, minutos_salida, recargos
+
+def calcular_con_ciclo(minutos_entrada, minutos_salida, recargos):
+    """Versión escalar: un llamado a calcular_pago_dia por turno"""
+    minutos_resultado, pagos_base, pagos_total = [], [], []
+    for entrada, salida, recargo in zip(minutos_entrada.tolist(), minutos_salida.tolist(), recargos.tolist()):
+        minutos_trabajados = salida - entrada if salida >= entrada else (24 * 60 - entrada) + salida
+        pago_total, _, pago_base = calcular_pago_dia(minutos_trabajados / 60, recargo)
+        minutos_resultado.append(minutos_trabajados)
+        pagos_base.append(int(round(pago_base, 0)))
+        pagos_total.append(int(round(pago_total, 0)))
+    return minutos_resultado, pagos_base, pagos_total
+
+def verificar_equivalencia():
+    """Compara ambas versiones sobre toda la grilla de minutos y recargos"""
+    recargos_disponibles = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    grilla = np.arange(24 * 60 + 1)
+    entrada = np.zeros(len(grilla) * len(recargos_disponibles), dtype=np.int64)
+    salida = np.tile(grilla, len(recargos_disponibles)) % (24 * 60)
+    recargos = np.repeat(recargos_disponibles, len(grilla))
+    # El minuto 1440 corresponde a entrada == salida, que da 0 minutos igual que la versión escalar
+    esperado = calcular_con_ciclo(entrada, salida, recargos)
+    obtenido = calcular_pagos_vectorizado(entrada, salida, recargos)
+    assert obtenido['minutos_trabajados'].tolist() == esperado[0]
+    assert obtenido['pago_base'].tolist() == esperado[1]
+    assert obtenido['pago_total'].tolist() == esperado[2]
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    verificar_equivalencia()
+
+    minutos_entrada, minutos_salida, recargos = generar_turnos(cantidad)
+
+    inicio = time.perf_counter()
+    esperado = calcular_con_ciclo(minutos_entrada, minutos_salida, recargos)
+    tiempo_ciclo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenido = calcular_pagos_vectorizado(minutos_entrada, minutos_salida, recargos)
+    tiempo_vectorizado = time.perf_counter() - inicio
+
+    assert obtenido['pago_total'].tolist() == esperado[2]
+
+    print(f"Turnos: {cantidad:,}")
+    print(f"Ciclo calcular_pago_dia: {tiempo_ciclo:.3f}s")
+    print(f"Vectorizado NumPy:       {tiempo_vectorizado:.3f}s")
+    print(f"Aceleración:             {tiempo_ciclo / tiempo_vectorizado:.1f}x")
+
+if __name__ == "__main__":
+    main()
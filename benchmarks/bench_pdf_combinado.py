@@ -0,0 +1,86 @@
+"""Mide el PDF combinado contra un PDF por semana y su crecimiento con la cantidad de semanas.
+
+Para cada cantidad genera semanas sintéticas de varios empleados, escribe el
+reporte combinado en un archivo temporal y reporta tiempo, tamaño, páginas
+y tamaño por semana, que deberían mantenerse casi constantes (crecimiento
+lineal). Compara con la suma de los PDF individuales de renderizar_pdf.
+
+Uso: python benchmarks/bench_pdf_combinado.py [cantidad ...]
+"""
+import datetime
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_salario import REGLAS_TARIFAS, Turno, calcular_semana
+from reporte_pdf import renderizar_pdf, renderizar_pdf_combinado
+
+# fpdf2 avisa en cada llamado que Arial se sustituye por Helvetica
+warnings.simplefilter('ignore', DeprecationWarning)
+
+EMPLEADOS = 20
+
+
+def generar_semanas(cantidad, semilla=0):
+    """Genera semanas sintéticas listas para renderizar"""
+    aleatorio = random.Random(semilla)
+    recargos = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    semanas = []
+    for _ in range(cantidad):
+        lunes = datetime.datetime(2025, 1, 6) + datetime.timedelta(weeks=aleatorio.randrange(52))
+        turnos = [
+            Turno(
+                (lunes + datetime.timedelta(days=i)).date(),
+                datetime.time(aleatorio.randrange(6, 12), aleatorio.choice((0, 15, 30, 45))),
+                datetime.time(aleatorio.randrange(13, 23), aleatorio.choice((0, 15, 30, 45))),
+                aleatorio.choice(recargos)
+            )
+            for i in range(7) if aleatorio.random() < 0.85
+        ]
+        registros_semana, horarios_completos, total_semanal = calcular_semana(turnos, lunes)
+        semanas.append((registros_semana, total_semanal, horarios_completos, lunes, lunes + datetime.timedelta(days=6)))
+    return semanas
+
+def semanas_por_empleado(cantidad):
+    """Reparte las semanas sintéticas entre EMPLEADOS, agrupadas por empleado"""
+    semanas = [
+        (f"empleado_{i % EMPLEADOS:02d}",) + semana
+        for i, semana in enumerate(generar_semanas(cantidad))
+    ]
+    return sorted(semanas, key=lambda semana: (semana[0], semana[5]))
+
+def medir(cantidad, directorio):
+    semanas = semanas_por_empleado(cantidad)
+    ruta = os.path.join(directorio, f'combinado_{cantidad}.pdf')
+
+    inicio = time.perf_counter()
+    renderizar_pdf_combinado(iter(semanas), ruta, semanas_totales=cantidad)
+    tiempo_combinado = time.perf_counter() - inicio
+    with open(ruta, 'rb') as archivo:
+        contenido = archivo.read()
+    paginas = len(re.findall(rb'/Type /Page\b', contenido))
+
+    inicio = time.perf_counter()
+    bytes_individuales = sum(len(renderizar_pdf(*semana[1:])) for semana in semanas)
+    tiempo_individual = time.perf_counter() - inicio
+    return tiempo_combinado, len(contenido), paginas, tiempo_individual, bytes_individuales
+
+def main():
+    cantidades = [int(valor) for valor in sys.argv[1:]] or [100, 200, 400, 800]
+    print(f"{'semanas':>8} {'páginas':>8} {'tiempo':>9} {'ms/sem':>7} {'tamaño':>10} {'KB/sem':>7} "
+          f"{'individual':>11} {'KB/sem ind':>10}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in cantidades:
+            tiempo, tamano, paginas, tiempo_individual, bytes_individuales = medir(cantidad, directorio)
+            print(f"{cantidad:>8,} {paginas:>8,} {tiempo:>8.2f}s {tiempo / cantidad * 1000:>7.2f} "
+                  f"{tamano / 1024:>8.0f}KB {tamano / cantidad / 1024:>7.2f} "
+                  f"{tiempo_individual:>10.2f}s {bytes_individuales / cantidad / 1024:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compara la tabla precalculada de pagos contra el cálculo con ramas.
+
+Verifica primero que TablaPagos da lo mismo que calcular_pago_minutos y
+calcular_registro_dia para todos los minutos, recargos y versiones del
+catálogo, y que obtener_tabla se reconstruye al cambiar las tarifas. Luego
+mide pago más textos de horas por día y calcular_semana completo.
+
+Uso: python benchmarks/bench_tabla_pagos.py [cantidad_dias]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_salario import (
+    REGLAS_TARIFAS,
+    calcular_pago_minutos,
+    calcular_registro_dia,
+    calcular_semana,
+    formato_horas_minutos,
+    formato_horas_minutos_texto,
+)
+from reglas_tarifas import obtener_catalogo
+from tabla_pagos import MINUTOS_TABLA, obtener_tabla
+from suite import generar_semanas
+
+
+def verificar_equivalencia():
+    """Compara tabla y cálculo directo sobre toda la grilla de minutos y recargos"""
+    for reglas in obtener_catalogo().versiones:
+        tabla = obtener_tabla(reglas)
+        for recargo in reglas['recargos_disponibles'].values():
+            for minutos in range(MINUTOS_TABLA + 60):
+                assert tabla.pago(minutos, recargo) == calcular_pago_minutos(minutos, recargo, reglas)
+                salida = datetime.time((minutos // 60) % 24, minutos % 60)
+                for sin_trabajo in (False, True):
+                    esperado = calcular_registro_dia('Lunes', datetime.time(0, 0), salida, recargo, sin_trabajo, reglas)
+                    obtenido = tabla.registro_dia('Lunes', esperado['minutos_trabajados'], recargo, sin_trabajo)
+                    assert obtenido == esperado, (minutos, recargo, sin_trabajo)
+
+    # Un cambio de tarifas con la misma versión debe dar una tabla nueva
+    reglas = dict(REGLAS_TARIFAS)
+    anterior = obtener_tabla(reglas)
+    reglas['hora_normal'] += 100
+    assert obtener_tabla(reglas) is not anterior
+    assert obtener_tabla(reglas).pago(60, 0)[2] == reglas['hora_normal']
+
+def medir_dias(cantidad, semilla=0):
+    aleatorio = random.Random(semilla)
+    recargos = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    casos = [(aleatorio.randrange(MINUTOS_TABLA), aleatorio.choice(recargos)) for _ in range(cantidad)]
+
+    inicio = time.perf_counter()
+    for minutos, recargo in casos:
+        calcular_pago_minutos(minutos, recargo)
+        formato_horas_minutos(minutos)
+        formato_horas_minutos_texto(minutos)
+    tiempo_ramas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    tabla = obtener_tabla()
+    horas_formato = tabla.horas_formato
+    horas_texto = tabla.horas_texto
+    for minutos, recargo in casos:
+        tabla.pago(minutos, recargo)
+        horas_formato[minutos]
+        horas_texto[minutos]
+    tiempo_tabla = time.perf_counter() - inicio
+    return tiempo_ramas, tiempo_tabla
+
+def medir_semanas(cantidad, semilla=0):
+    semanas = [(turnos, lunes.date() if isinstance(lunes, datetime.datetime) else lunes)
+               for turnos, lunes in generar_semanas(cantidad, semilla)]
+    reglas = REGLAS_TARIFAS
+
+    inicio = time.perf_counter()
+    esperado = [calcular_semana(turnos, lunes, reglas) for turnos, lunes in semanas]
+    tiempo_ramas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenido = [calcular_semana(turnos, lunes, reglas, obtener_tabla(reglas)) for turnos, lunes in semanas]
+    tiempo_tabla = time.perf_counter() - inicio
+
+    assert obtenido == esperado
+    return tiempo_ramas, tiempo_tabla
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    verificar_equivalencia()
+
+    inicio = time.perf_counter()
+    obtener_tabla(dict(REGLAS_TARIFAS, version='construccion'))
+    tiempo_construccion = time.perf_counter() - inicio
+
+    dias_ramas, dias_tabla = medir_dias(cantidad)
+    semanas_ramas, semanas_tabla = medir_semanas(cantidad // 100)
+
+    print(f"Construcción de una tabla: {tiempo_construccion * 1000:.1f} ms")
+    print(f"Días: {cantidad:,}")
+    print(f"  Cálculo con ramas: {dias_ramas:.3f}s")
+    print(f"  Tabla:             {dias_tabla:.3f}s ({dias_ramas / dias_tabla:.1f}x)")
+    print(f"Semanas (calcular_semana): {cantidad // 100:,}")
+    print(f"  Cálculo con ramas: {semanas_ramas:.3f}s")
+    print(f"  Tabla:             {semanas_tabla:.3f}s ({semanas_ramas / semanas_tabla:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Suite de mediciones reproducibles con salida JSON para comparar versiones.
+
+Mide, sobre semanas sintéticas generadas con semilla fija:
+- calcular_pago_dia: llamados por segundo.
+- semana_formulario: una semana como la calcula crear_formulario_horarios
+  (SemanaIncremental), en frío, en un rerun sin cambios y cambiando un día.
+- pdf: latencia de renderizar_pdf (el trabajo de obtener_pdf_semana) y tamaño.
+- sheets: solicitudes a la API por semana con EscritorSheets (el camino de
+  guardar_semana) contra el documento falso de sheets_falso, y
+  para volver a leer todas las semanas con LectorSheets, sin y con caché.
+
+Uso:
+    python benchmarks/suite.py --salida actual.json
+    python benchmarks/suite.py --comparar base.json --tolerancia 0.10
+
+Con --comparar se marca como regresión toda métrica que empeore más que la
+tolerancia respecto del archivo base, y el proceso termina con código 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_salario import (
+    DIAS_SEMANA,
+    REGLAS_TARIFAS,
+    Turno,
+    SemanaIncremental,
+    calcular_pago_dia,
+    calcular_semana,
+    huella_reglas_tarifas,
+)
+from reporte_pdf import PDF_AVAILABLE, renderizar_pdf
+from exportador_sheets import EscritorSheets
+from lector_sheets import LectorSheets
+from sheets_falso import HojaCalculoFalsa
+
+# fpdf2 avisa en cada llamado que Arial se sustituye por Helvetica
+warnings.simplefilter('ignore', DeprecationWarning)
+
+# Dirección de cada métrica: True si un valor menor es mejor
+MENOR_ES_MEJOR = {
+    'llamados_por_segundo': False,
+    'frio_us': True,
+    'rerun_sin_cambios_us': True,
+    'cambio_un_dia_us': True,
+    'mediana_ms': True,
+    'p95_ms': True,
+    'bytes_promedio': True,
+    'solicitudes_por_semana': True,
+    'solicitudes_lote': True,
+    'solicitudes_lectura': True,
+    'solicitudes_lectura_cache': True,
+}
+
+
+def generar_turnos_semana(aleatorio, lunes):
+    """Turnos sintéticos de una semana: ~85% de días trabajados con recargos al azar"""
+    recargos = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    return [
+        Turno(
+            lunes + datetime.timedelta(days=i),
+            datetime.time(aleatorio.randrange(6, 12), aleatorio.choice((0, 15, 30, 45))),
+            datetime.time(aleatorio.randrange(13, 23), aleatorio.choice((0, 15, 30, 45))),
+            aleatorio.choice(recargos)
+        )
+        for i in range(len(DIAS_SEMANA)) if aleatorio.random() < 0.85
+    ]
+
+def generar_semanas(cantidad, semilla=0):
+    """Semanas sintéticas como (turnos, lunes) con lunes distintos a lo largo de un año"""
+    aleatorio = random.Random(semilla)
+    semanas = []
+    for _ in range(cantidad):
+        lunes = datetime.date(2025, 1, 6) + datetime.timedelta(weeks=aleatorio.randrange(52))
+        semanas.append((generar_turnos_semana(aleatorio, lunes), lunes))
+    return semanas
+
+def _entradas_formulario(turnos, lunes):
+    """Argumentos de actualizar_dia para los siete días, como los arma el formulario"""
+    por_indice = {(turno.fecha - lunes).days: turno for turno in turnos}
+    entradas = []
+    for i, dia in enumerate(DIAS_SEMANA):
+        turno = por_indice.get(i)
+        if turno is None:
+            entradas.append((i, dia, datetime.time(0, 0), datetime.time(0, 0), 0, True))
+        else:
+            entradas.append((i, dia, turno.entrada, turno.salida, turno.recargo, False))
+    return entradas
+
+def medir_pago_dia(cantidad, semilla):
+    aleatorio = random.Random(semilla)
+    recargos = list(REGLAS_TARIFAS['recargos_disponibles'].values())
+    casos = [(aleatorio.randrange(0, 24 * 60) / 60, aleatorio.choice(recargos)) for _ in range(cantidad)]
+    inicio = time.perf_counter()
+    for horas, recargo in casos:
+        calcular_pago_dia(horas, recargo)
+    return {'llamados_por_segundo': round(cantidad / (time.perf_counter() - inicio))}
+
+def medir_semana_formulario(semanas):
+    entradas = [_entradas_formulario(turnos, lunes) for turnos, lunes in semanas]
+    calculos = [SemanaIncremental() for _ in semanas]
+
+    def recorrer(modificar=False):
+        inicio = time.perf_counter()
+        for calculo, dias in zip(calculos, entradas):
+            # El formulario calcula la huella de tarifas una vez por rerun
+            version_tarifas = huella_reglas_tarifas()
+            for j, entrada in enumerate(dias):
+                if modificar and j == 0:
+                    # El usuario cambia la salida del lunes una hora
+                    i, dia, hora_entrada, hora_salida, recargo, sin_trabajo = entrada
+                    hora_salida = datetime.time((hora_salida.hour + 1) % 24, hora_salida.minute)
+                    entrada = (i, dia, hora_entrada, hora_salida, recargo, sin_trabajo)
+                calculo.actualizar_dia(*entrada, version_tarifas)
+        return (time.perf_counter() - inicio) / len(entradas) * 1e6
+
+    return {
+        'frio_us': round(recorrer(), 2),
+        'rerun_sin_cambios_us': round(recorrer(), 2),
+        'cambio_un_dia_us': round(recorrer(modificar=True), 2),
+    }
+
+def medir_pdf(semanas):
+    if not PDF_AVAILABLE:
+        return None
+    tiempos = []
+    tamanos = []
+    for turnos, lunes in semanas:
+        registros_semana, horarios_completos, total_semanal = calcular_semana(turnos, lunes)
+        domingo = lunes + datetime.timedelta(days=6)
+        inicio = time.perf_counter()
+        pdf_bytes = renderizar_pdf(registros_semana, total_semanal, horarios_completos, lunes, domingo)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        tamanos.append(len(pdf_bytes))
+    tiempos.sort()
+    return {
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'p95_ms': round(tiempos[int(len(tiempos) * 0.95) - 1], 3),
+        'bytes_promedio': round(statistics.mean(tamanos)),
+    }
+
+def medir_sheets(semanas):
+    calculadas = []
+    for turnos, lunes in semanas:
+        registros_semana, horarios_completos, total_semanal = calcular_semana(turnos, lunes)
+        calculadas.append((registros_semana, total_semanal, horarios_completos, lunes, lunes + datetime.timedelta(days=6)))
+
+    # Una semana por guardado, como el botón de la interfaz
+    solicitudes = []
+    for semana in calculadas:
+        documento = HojaCalculoFalsa()
+        escritor = EscritorSheets(documento)
+        escritor.encolar(*semana)
+        escritor.vaciar()
+        solicitudes.append(documento.solicitudes)
+
+    # Todas las semanas en un mismo escritor
+    documento = HojaCalculoFalsa()
+    escritor = EscritorSheets(documento)
+    for semana in calculadas:
+        escritor.encolar(*semana)
+    escritor.vaciar()
+    solicitudes_lote = documento.solicitudes
+
+    # Leer de vuelta todas las semanas; la segunda lectura usa la caché
+    lector = LectorSheets(documento)
+    lector.leer_semanas()
+    solicitudes_lectura = documento.solicitudes - solicitudes_lote
+    lector.leer_semanas()
+
+    return {
+        'solicitudes_por_semana': statistics.mean(solicitudes),
+        'solicitudes_lote': solicitudes_lote,
+        'solicitudes_lectura': solicitudes_lectura,
+        'solicitudes_lectura_cache': documento.solicitudes - solicitudes_lote - solicitudes_lectura,
+    }
+
+def ejecutar(cantidad_semanas, cantidad_pagos, semilla):
+    semanas = generar_semanas(cantidad_semanas, semilla)
+    resultados = {
+        'calcular_pago_dia': medir_pago_dia(cantidad_pagos, semilla),
+        'semana_formulario': medir_semana_formulario(semanas),
+        'pdf': medir_pdf(semanas),
+        'sheets': medir_sheets(semanas),
+    }
+    return {
+        'meta': {
+            'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'semilla': semilla,
+            'semanas': cantidad_semanas,
+            'pagos': cantidad_pagos,
+        },
+        'resultados': {nombre: valores for nombre, valores in resultados.items() if valores is not None}
+    }
+
+def comparar(base, actual, tolerancia):
+    """Lista de regresiones (grupo, métrica, base, actual, cambio relativo)"""
+    regresiones = []
+    for grupo, metricas in actual['resultados'].items():
+        for metrica, valor in metricas.items():
+            valor_base = base.get('resultados', {}).get(grupo, {}).get(metrica)
+            if not valor_base or metrica not in MENOR_ES_MEJOR:
+                continue
+            cambio = (valor - valor_base) / valor_base
+            empeora = cambio > tolerancia if MENOR_ES_MEJOR[metrica] else cambio < -tolerancia
+            if empeora:
+                regresiones.append((grupo, metrica, valor_base, valor, cambio))
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mediciones de cálculo, PDF y Google Sheets en JSON")
+    parser.add_argument('--semanas', type=int, default=500, help="Semanas sintéticas por medición")
+    parser.add_argument('--pagos', type=int, default=200_000, help="Llamados a calcular_pago_dia")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto la salida estándar)")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.10, help="Empeoramiento relativo admitido (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    actual = ejecutar(args.semanas, args.pagos, args.semilla)
+    texto = json.dumps(actual, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(base, actual, args.tolerancia)
+        for grupo, metrica, valor_base, valor, cambio in regresiones:
+            print(f"REGRESIÓN {grupo}.{metrica}: {valor_base} -> {valor} ({cambio:+.1%})", file=sys.stderr)
+        if regresiones:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Tiempo de importación en frío de los módulos de la aplicación.
+
+Importa cada módulo en un proceso nuevo con `python -X importtime` y
+reporta la mediana del tiempo acumulado y qué dependencias pesadas
+(fpdf, gspread, google-auth, pyarrow) quedaron cargadas sin usarse.
+
+Uso:
+    python benchmarks/tiempo_importacion.py
+    python benchmarks/tiempo_importacion.py --repeticiones 9 --salida importacion.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = ('reporte_pdf', 'conexion_sheets', 'importador_horarios', 'reportes_lote', 'app_salario')
+
+# Dependencias opcionales que no deberían cargarse solo por importar un módulo
+DEPENDENCIAS_PESADAS = ('fpdf', 'gspread', 'google.oauth2', 'pyarrow')
+
+
+def importar_en_frio(modulo):
+    """Retorna (microsegundos acumulados del módulo, nombres de todos los módulos cargados)"""
+    entorno = dict(os.environ, PYTHONPATH=RAIZ, PYTHONDONTWRITEBYTECODE='1')
+    # Directorio temporal para que importar la aplicación no cree archivos en el repositorio
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            cwd=directorio, env=entorno, capture_output=True, text=True, check=True
+        )
+
+    acumulado = None
+    cargados = set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or '|' not in linea:
+            continue
+        _, tiempo_acumulado, nombre = linea.split('|', 2)
+        if not tiempo_acumulado.strip().isdigit():
+            continue  # Encabezado
+        cargados.add(nombre.strip())
+        if nombre == f' {modulo}':  # Sin sangría: importación de nivel superior
+            acumulado = int(tiempo_acumulado)
+    return acumulado, cargados
+
+def medir_modulo(modulo, repeticiones):
+    tiempos = []
+    cargados = set()
+    for _ in range(repeticiones):
+        acumulado, cargados = importar_en_frio(modulo)
+        tiempos.append(acumulado)
+    return {
+        'mediana_ms': round(statistics.median(tiempos) / 1000, 1),
+        'minimo_ms': round(min(tiempos) / 1000, 1),
+        'dependencias_cargadas': [nombre for nombre in DEPENDENCIAS_PESADAS if nombre in cargados],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación en frío de los módulos en JSON")
+    parser.add_argument('modulos', nargs='*', default=MODULOS, help="Módulos a medir")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Procesos por módulo (se reporta la mediana)")
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto la salida estándar)")
+    args = parser.parse_args(argv)
+
+    resultados = {modulo: medir_modulo(modulo, args.repeticiones) for modulo in args.modulos}
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
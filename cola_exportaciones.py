@@ -0,0 +1,89 @@
+"""Cola de exportaciones en segundo plano (guardado en Google Sheets).
+
+Un único pool de hilos por proceso ejecuta los trabajos; la interfaz solo
+recibe un id de trabajo y consulta su estado en cada rerun, sin bloquear la
+sesión mientras responde la API de Sheets. El PDF no pasa por la cola: se
+genera al pedir la descarga (ver obtener_pdf_semana en app_salario).
+"""
+import concurrent.futures
+import threading
+import time
+import uuid
+
+from metricas import contar, medir
+
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+COMPLETADO = 'completado'
+ERROR = 'error'
+
+
+class ColaExportaciones:
+    """Pool de hilos compartido con registro de estado y resultados por id de trabajo.
+
+    Los trabajos terminados se conservan hasta ttl_segundos y como máximo
+    max_resultados, descartando primero los más antiguos.
+    """
+
+    def __init__(self, max_trabajadores=4, max_resultados=500, ttl_segundos=3600):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_trabajadores, thread_name_prefix='exportacion'
+        )
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self.max_resultados = max_resultados
+        self.ttl_segundos = ttl_segundos
+
+    def enviar(self, tipo, funcion, *args, **kwargs):
+        """Encola funcion(*args, **kwargs) y retorna el id del trabajo"""
+        id_trabajo = uuid.uuid4().hex
+        with self._lock:
+            self._limpiar()
+            self._trabajos[id_trabajo] = {
+                'id': id_trabajo,
+                'tipo': tipo,
+                'estado': PENDIENTE,
+                'resultado': None,
+                'error': None,
+                'creado': time.time(),
+                'terminado': None
+            }
+        self._executor.submit(self._ejecutar, id_trabajo, tipo, funcion, args, kwargs)
+        return id_trabajo
+
+    def _ejecutar(self, id_trabajo, tipo, funcion, args, kwargs):
+        self._actualizar(id_trabajo, estado=EN_PROCESO)
+        try:
+            with medir(f'trabajo_{tipo}'):
+                resultado = funcion(*args, **kwargs)
+            self._actualizar(id_trabajo, estado=COMPLETADO, resultado=resultado, terminado=time.time())
+        except Exception as e:
+            contar(f'trabajos_{tipo}_error')
+            self._actualizar(id_trabajo, estado=ERROR, error=f"{type(e).__name__}: {e}", terminado=time.time())
+
+    def _actualizar(self, id_trabajo, **cambios):
+        with self._lock:
+            if id_trabajo in self._trabajos:
+                self._trabajos[id_trabajo].update(cambios)
+
+    def _limpiar(self):
+        """Descarta trabajos vencidos y los terminados más antiguos por encima del límite"""
+        ahora = time.time()
+        terminados = sorted(
+            (trabajo for trabajo in self._trabajos.values() if trabajo['terminado'] is not None),
+            key=lambda trabajo: trabajo['terminado']
+        )
+        sobrantes = len(terminados) - self.max_resultados
+        for i, trabajo in enumerate(terminados):
+            if i < sobrantes or ahora - trabajo['terminado'] > self.ttl_segundos:
+                del self._trabajos[trabajo['id']]
+
+    def estado(self, id_trabajo):
+        """Copia del estado del trabajo, o None si no existe o ya fue descartado"""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return dict(trabajo) if trabajo else None
+
+    def cerrar(self, esperar=True):
+        """Detiene el pool; con esperar=True termina los trabajos en curso"""
+        self._executor.shutdown(wait=esperar)
@@ -0,0 +1,94 @@
+"""Conexión reutilizable a Google Sheets.
+
+Autentica una sola vez por proceso, renueva el token solo cuando está por
+vencer y mantiene en memoria la lista de hojas del documento para no
+consultar metadatos en cada guardado.
+"""
+import datetime
+import importlib.util
+import threading
+
+from metricas import contar, medir
+
+# Manejo de importaciones: se comprueba que gspread (que depende de google-auth)
+# esté instalado sin importarlo; la importación ocurre en la primera conexión
+SHEETS_AVAILABLE = importlib.util.find_spec('gspread') is not None
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# Renovar el token si vence en menos de este margen
+MARGEN_EXPIRACION = datetime.timedelta(minutes=5)
+
+
+class ConexionSheets:
+    """Cliente de gspread, documento abierto y lista de hojas compartidos entre llamados.
+
+    Nada se conecta al crear el objeto: la autenticación y la apertura del
+    documento ocurren en el primer llamado a obtener_spreadsheet().
+    """
+
+    def __init__(self, info_cuenta, spreadsheet_name, scopes=SCOPES):
+        self.info_cuenta = info_cuenta
+        self.spreadsheet_name = spreadsheet_name
+        self.scopes = scopes
+        self.credenciales = None
+        self.client = None
+        self.spreadsheet = None
+        self.hojas = None
+        self._lock = threading.Lock()
+
+    def _token_vigente(self):
+        """Indica si el token actual sirve al menos por MARGEN_EXPIRACION"""
+        if self.credenciales is None or not self.credenciales.token:
+            return False
+        if self.credenciales.expiry is None:
+            return True
+        # google-auth guarda expiry como datetime UTC sin zona horaria
+        ahora = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return self.credenciales.expiry - ahora > MARGEN_EXPIRACION
+
+    def obtener_spreadsheet(self):
+        """Retorna el documento abierto, autenticando o renovando el token solo si hace falta"""
+        import gspread
+        from google.auth.transport.requests import Request
+        from google.oauth2.service_account import Credentials
+
+        with self._lock:
+            if self.client is None:
+                with medir('sheets_autenticacion'):
+                    self.credenciales = Credentials.from_service_account_info(self.info_cuenta, scopes=self.scopes)
+                    self.client = gspread.authorize(self.credenciales)
+            if not self._token_vigente():
+                contar('sheets_renovaciones_token')
+                with medir('sheets_renovacion_token'):
+                    self.credenciales.refresh(Request())
+            if self.spreadsheet is None:
+                contar('sheets_solicitudes')
+                with medir('sheets_apertura'):
+                    self.spreadsheet = self.client.open(self.spreadsheet_name)
+            return self.spreadsheet
+
+    def hojas_existentes(self):
+        """Retorna una copia de {título: id} de las hojas; solo consulta la API la primera vez"""
+        spreadsheet = self.obtener_spreadsheet()
+        with self._lock:
+            if self.hojas is None:
+                contar('sheets_solicitudes')
+                self.hojas = {worksheet.title: worksheet.id for worksheet in spreadsheet.worksheets()}
+            return dict(self.hojas)
+
+    def registrar_hojas(self, hojas, completas=False):
+        """Agrega hojas creadas a la lista en memoria; con completas, hojas reemplaza la lista"""
+        with self._lock:
+            if completas:
+                self.hojas = dict(hojas)
+            elif self.hojas is not None:
+                self.hojas.update(hojas)
+
+    def invalidar_hojas(self):
+        """Descarta la lista de hojas en memoria (por ejemplo, si se borró una hoja a mano)"""
+        with self._lock:
+            self.hojas = None
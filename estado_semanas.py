@@ -0,0 +1,68 @@
+"""Límite de memoria para el estado por semana de una sesión de Streamlit.
+
+Cada semana visitada deja en st.session_state su form_data_<semana_key>, la
+marca horarios_guardados_<semana_key>, el cálculo incremental y las claves
+de cada control (entrada_<semana_key>_0, ...). RegistroSemanasSesion recuerda
+cuándo se usó cada semana por última vez y expulsa las que superan el
+máximo (las menos recientes) o el tiempo de vida. Antes de borrarlas,
+al_expulsar recibe sus valores para poder guardarlos (por ejemplo, como
+borrador en la base local) y recargarlos al volver a la semana.
+"""
+import time
+from collections import OrderedDict
+
+# Semanas que conserva una sesión y segundos sin uso tras los que se expulsa una semana
+MAXIMO_SEMANAS = 8
+TTL_SEMANAS = 30 * 60
+
+
+def claves_de_semana(estado, semana_key):
+    """Claves del estado que pertenecen a la semana: terminan en _<semana_key> o lo contienen seguido de _"""
+    sufijo = f"_{semana_key}"
+    return [
+        clave for clave in list(estado.keys())
+        if isinstance(clave, str) and (clave.endswith(sufijo) or f"{sufijo}_" in clave)
+    ]
+
+
+class RegistroSemanasSesion:
+    """Orden de uso de las semanas de una sesión, con expulsión LRU y por tiempo de vida"""
+
+    def __init__(self, maximo=MAXIMO_SEMANAS, ttl=TTL_SEMANAS, reloj=time.monotonic):
+        self.maximo = maximo
+        self.ttl = ttl
+        self.reloj = reloj
+        self._ultimo_uso = OrderedDict()
+
+    def __len__(self):
+        return len(self._ultimo_uso)
+
+    def usar(self, estado, semana_key, al_expulsar=None):
+        """Marca la semana como la más reciente y expulsa las vencidas o sobrantes.
+
+        La semana en uso nunca se expulsa. Retorna las semana_key expulsadas.
+        """
+        ahora = self.reloj()
+        self._ultimo_uso[semana_key] = ahora
+        self._ultimo_uso.move_to_end(semana_key)
+
+        expulsadas = []
+        # De la menos a la más reciente
+        for clave, ultimo_uso in self._ultimo_uso.items():
+            if clave == semana_key:
+                continue
+            if ahora - ultimo_uso > self.ttl or len(self._ultimo_uso) - len(expulsadas) > self.maximo:
+                expulsadas.append(clave)
+
+        for clave in expulsadas:
+            self.expulsar(estado, clave, al_expulsar)
+        return expulsadas
+
+    def expulsar(self, estado, semana_key, al_expulsar=None):
+        """Borra del estado las claves de la semana, pasándoselas antes a al_expulsar(semana_key, valores)"""
+        claves = claves_de_semana(estado, semana_key)
+        if al_expulsar is not None:
+            al_expulsar(semana_key, {clave: estado[clave] for clave in claves})
+        for clave in claves:
+            del estado[clave]
+        self._ultimo_uso.pop(semana_key, None)
@@ -0,0 +1,144 @@
+"""Exportación de semanas calculadas a CSV, XLSX y JSON Lines para nómina.
+
+Escribe las mismas columnas que las hojas de exportador_sheets (precedidas por el
+empleado), una fila por día, a medida que llegan las semanas: la memoria no
+crece con la cantidad de semanas. CSV y JSON Lines pueden comprimirse con
+gzip; XLSX usa el modo write-only de openpyxl (que ya es un zip).
+
+Uso:
+    python exportador_archivos.py horarios.csv --salida nomina.csv.gz
+    python exportador_archivos.py horarios.csv --salida nomina.xlsx --ordenado
+"""
+import argparse
+import csv
+import gzip
+import importlib.util
+import json
+import sys
+
+from exportador_sheets import ENCABEZADOS_SHEETS, construir_filas_semana
+from metricas import contar, medir
+
+COLUMNAS_EXPORTACION = ['Empleado'] + ENCABEZADOS_SHEETS
+FORMATOS = ('csv', 'xlsx', 'jsonl')
+
+# Manejo de importaciones: openpyxl se importa solo al escribir un XLSX
+XLSX_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+
+
+def filas_exportacion(semanas):
+    """Itera las filas de COLUMNAS_EXPORTACION de (empleado, lunes, registros_semana, horarios_completos)"""
+    for empleado, lunes, registros_semana, horarios_completos in semanas:
+        for fila in construir_filas_semana(registros_semana, horarios_completos, lunes):
+            yield [empleado] + fila
+
+def _abrir_texto(ruta, comprimir):
+    if comprimir:
+        return gzip.open(ruta, 'wt', encoding='utf-8', newline='')
+    return open(ruta, 'w', encoding='utf-8', newline='')
+
+def exportar_csv(semanas, ruta, comprimir=False):
+    """Escribe las semanas en CSV y retorna la cantidad de filas de días"""
+    cantidad = 0
+    with _abrir_texto(ruta, comprimir) as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS_EXPORTACION)
+        for fila in filas_exportacion(semanas):
+            escritor.writerow(fila)
+            cantidad += 1
+    return cantidad
+
+def exportar_jsonl(semanas, ruta, comprimir=False):
+    """Escribe un objeto JSON por día y retorna la cantidad de filas"""
+    cantidad = 0
+    with _abrir_texto(ruta, comprimir) as archivo:
+        for fila in filas_exportacion(semanas):
+            archivo.write(json.dumps(dict(zip(COLUMNAS_EXPORTACION, fila)), ensure_ascii=False))
+            archivo.write("\n")
+            cantidad += 1
+    return cantidad
+
+def exportar_xlsx(semanas, ruta):
+    """Escribe las semanas en una hoja XLSX en modo write-only; lanza RuntimeError sin openpyxl"""
+    if not XLSX_AVAILABLE:
+        raise RuntimeError("Se requiere openpyxl para exportar a XLSX")
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Nomina")
+    hoja.append(COLUMNAS_EXPORTACION)
+    cantidad = 0
+    for fila in filas_exportacion(semanas):
+        hoja.append(fila)
+        cantidad += 1
+    libro.save(ruta)
+    return cantidad
+
+def formato_desde_ruta(ruta):
+    """Retorna (formato, comprimir) según la extensión: .csv, .jsonl, .xlsx, con .gz opcional"""
+    nombre = str(ruta).lower()
+    comprimir = nombre.endswith('.gz')
+    if comprimir:
+        nombre = nombre[:-3]
+    for formato in FORMATOS:
+        if nombre.endswith('.' + formato):
+            return formato, comprimir
+    raise ValueError(f"No se reconoce el formato de {ruta} (use {', '.join(FORMATOS)})")
+
+def exportar(semanas, ruta, formato=None, comprimir=None):
+    """Exporta en el formato indicado o deducido de la extensión; retorna la cantidad de filas"""
+    if comprimir is None:
+        comprimir = str(ruta).lower().endswith('.gz')
+    if formato is None:
+        formato, _ = formato_desde_ruta(ruta)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato!r} (use {', '.join(FORMATOS)})")
+    if formato == 'xlsx' and comprimir:
+        raise ValueError("XLSX ya es un archivo comprimido; no se puede usar gzip")
+
+    with medir(f'exportar_{formato}'):
+        if formato == 'csv':
+            cantidad = exportar_csv(semanas, ruta, comprimir)
+        elif formato == 'jsonl':
+            cantidad = exportar_jsonl(semanas, ruta, comprimir)
+        else:
+            cantidad = exportar_xlsx(semanas, ruta)
+    contar('filas_exportadas', cantidad)
+    return cantidad
+
+def main(argv=None):
+    from atribucion_turnos import CORTES, CORTE_SEMANA
+    from importador_horarios import agrupar_semanas, leer_filas
+    from motor_salario import calcular_semana, reglas_para_fecha
+    from tabla_pagos import obtener_tabla
+
+    parser = argparse.ArgumentParser(description="Exporta los días calculados de todas las semanas a CSV, XLSX o JSON Lines")
+    parser.add_argument('archivo', help="Archivo CSV o Parquet con employee, date, entrada, salida, recargo")
+    parser.add_argument('--salida', required=True, help="Archivo de salida (.csv, .jsonl, .xlsx; .gz para comprimir)")
+    parser.add_argument('--formato', choices=FORMATOS, help="Formato de salida (por defecto, según la extensión)")
+    parser.add_argument('--gzip', action='store_true', default=None, help="Comprimir la salida CSV o JSON Lines")
+    parser.add_argument('--ordenado', action='store_true',
+                        help="El archivo está ordenado por fecha: emite cada semana al cerrarse "
+                             "(necesario para que la memoria no crezca con el archivo)")
+    parser.add_argument('--corte', choices=CORTES, default=CORTE_SEMANA,
+                        help="Dónde dividir los turnos que cruzan medianoche (por defecto, entre semanas)")
+    args = parser.parse_args(argv)
+
+    def calcular_semanas():
+        for empleado, lunes, turnos in agrupar_semanas(leer_filas(args.archivo), ordenado=args.ordenado, corte=args.corte):
+            reglas = reglas_para_fecha(lunes)
+            registros_semana, horarios_completos, _ = calcular_semana(
+                turnos, lunes, reglas, obtener_tabla(reglas), compacto=True
+            )
+            yield empleado, lunes, registros_semana, horarios_completos
+
+    try:
+        cantidad = exportar(calcular_semanas(), args.salida, args.formato, args.gzip)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Filas exportadas: {cantidad}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""Escritura por lotes en Google Sheets sin dependencias de interfaz.
+
+Agrupa la creación de hojas, la limpieza, los valores y el formato de muchas
+semanas en la menor cantidad posible de llamados a spreadsheet.batch_update,
+y reintenta con espera exponencial cuando la API responde 429 (cuota excedida).
+"""
+import datetime
+import random
+import time
+import zlib
+from datetime import timedelta
+
+from metricas import contar, medido, medir
+from motor_salario import formato_horas_minutos_texto
+
+ENCABEZADOS_SHEETS = [
+    'Día', 'Fecha', 'Entrada', 'Salida', 'Horas Trabajadas',
+    'Pago Base', 'Recargo', 'Total Día', 'Descripción', 'Sin Trabajo'
+]
+
+# Formatos aplicados a encabezados y filas de totales (los que aplicaba guardar_en_google_sheets)
+FORMATO_ENCABEZADOS = {
+    'backgroundColor': {'red': 0.2, 'green': 0.6, 'blue': 0.8},
+    'textFormat': {'bold': True, 'foregroundColor': {'red': 1.0, 'green': 1.0, 'blue': 1.0}}
+}
+FORMATO_TOTAL_SEMANAL = {
+    'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.5},
+    'textFormat': {'bold': True}
+}
+FORMATO_TOTAL_HORAS = {
+    'backgroundColor': {'red': 0.8, 'green': 0.95, 'blue': 0.8},
+    'textFormat': {'bold': True}
+}
+
+
+def obtener_nombre_hoja(lunes_semana, domingo_semana):
+    """Nombre de la hoja de una semana, sin caracteres inválidos"""
+    nombre_hoja = f"Semana_{lunes_semana.strftime('%d_%m_%y')}_a_{domingo_semana.strftime('%d_%m_%y')}"
+    return "".join(c for c in nombre_hoja if c.isalnum() or c in (' ', '_', '-')).rstrip()
+
+def construir_filas_semana(registros_semana, horarios_completos, lunes_semana):
+    """Filas por día con las columnas de ENCABEZADOS_SHEETS"""
+    filas = []
+    for i, registro in enumerate(registros_semana):
+        # Calcular fecha específica para cada día
+        fecha_dia = lunes_semana + timedelta(days=i)
+        fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
+
+        # Obtener horarios si existen
+        entrada_str = "---"
+        salida_str = "---"
+
+        if registro['dia'] in horarios_completos and not registro['sin_trabajo']:
+            horario = horarios_completos[registro['dia']]
+            entrada_str = horario['entrada'].strftime('%I:%M %p').lstrip('0')
+            salida_str = horario['salida'].strftime('%I:%M %p').lstrip('0')
+
+        filas.append([
+            registro['dia'],
+            fecha_dia_str,
+            entrada_str,
+            salida_str,
+            registro['horas_formato'],
+            registro['pago_base'],
+            registro['recargo'],
+            registro['pago_total'],
+            registro['descripcion'],
+            "Sí" if registro['sin_trabajo'] else "No"
+        ])
+    return filas
+
+def construir_datos_hoja(registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana, fecha_guardado=None):
+    """Arma las filas de la hoja semanal y los formatos a aplicar.
+
+    Retorna (nombre_hoja, data, formatos), donde formatos es una lista de
+    (rango A1, formato) igual a la que aplicaba guardar_en_google_sheets.
+    """
+    if fecha_guardado is None:
+        fecha_guardado = datetime.datetime.now()
+
+    # CALCULAR TOTAL DE HORAS TRABAJADAS
+    total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in registros_semana)
+    total_horas_texto = formato_horas_minutos_texto(total_minutos_trabajados)
+
+    data = [ENCABEZADOS_SHEETS]
+    data.extend(construir_filas_semana(registros_semana, horarios_completos, lunes_semana))
+
+    # Agregar filas de información
+    data.append([])  # Fila vacía
+    data.append(["TOTAL SEMANAL", "", "", "", "", "", "", total_semanal, "", ""])
+    data.append(["TOTAL HORAS TRABAJADAS", "", "", "", total_horas_texto, "", "", "", "", ""])
+    data.append([])
+    data.append(["Fecha de registro", fecha_guardado.strftime("%d/%m/%Y %H:%M:%S")])
+    data.append(["Rango de semana", f"{lunes_semana.strftime('%d/%m/%Y')} - {domingo_semana.strftime('%d/%m/%Y')}"])
+
+    total_row = len(data) - 4
+    total_horas_row = len(data) - 3
+    formatos = [
+        ('A1:J1', FORMATO_ENCABEZADOS),
+        (f'A{total_row}:J{total_row}', FORMATO_TOTAL_SEMANAL),
+        (f'A{total_horas_row}:J{total_horas_row}', FORMATO_TOTAL_HORAS)
+    ]
+    return obtener_nombre_hoja(lunes_semana, domingo_semana), data, formatos
+
+def _valor_celda(valor):
+    """Convierte un valor de Python al CellData de la API de Sheets"""
+    if valor is None or valor == "":
+        return {}
+    if isinstance(valor, bool):
+        return {'userEnteredValue': {'boolValue': valor}}
+    if isinstance(valor, (int, float)):
+        return {'userEnteredValue': {'numberValue': valor}}
+    return {'userEnteredValue': {'stringValue': str(valor)}}
+
+def _rango_filas(id_hoja, rango_a1):
+    """Convierte un rango 'A5:J5' en un GridRange de la API"""
+    inicio, fin = rango_a1.split(':')
+    fila_inicio = int(inicio.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    fila_fin = int(fin.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    columna_inicio = ord(inicio[0]) - ord('A')
+    columna_fin = ord(fin[0]) - ord('A') + 1
+    return {
+        'sheetId': id_hoja,
+        'startRowIndex': fila_inicio - 1,
+        'endRowIndex': fila_fin,
+        'startColumnIndex': columna_inicio,
+        'endColumnIndex': columna_fin
+    }
+
+def solicitudes_hoja(id_hoja, data, formatos):
+    """Solicitudes de batch_update que limpian la hoja, escriben los valores y aplican formato"""
+    solicitudes = [
+        # Equivale a worksheet.clear(): borra valores, conserva formato
+        {'updateCells': {'range': {'sheetId': id_hoja}, 'fields': 'userEnteredValue'}},
+        {'updateCells': {
+            'start': {'sheetId': id_hoja, 'rowIndex': 0, 'columnIndex': 0},
+            'rows': [{'values': [_valor_celda(valor) for valor in fila]} for fila in data],
+            'fields': 'userEnteredValue'
+        }}
+    ]
+    for rango_a1, formato in formatos:
+        solicitudes.append({'repeatCell': {
+            'range': _rango_filas(id_hoja, rango_a1),
+            'cell': {'userEnteredFormat': formato},
+            'fields': f"userEnteredFormat({','.join(formato.keys())})"
+        }})
+    return solicitudes
+
+@medido('guardar_en_google_sheets')
+def guardar_semana(conexion, registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana):
+    """Guarda una semana con una ConexionSheets y retorna el nombre de la hoja.
+
+    No usa la interfaz, por lo que puede ejecutarse en un hilo de fondo; los
+    errores se propagan al llamador.
+    """
+    escritor = EscritorSheets(conexion.obtener_spreadsheet(), hojas_conocidas=conexion.hojas_existentes())
+    nombre_hoja = escritor.encolar(registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana)
+    escritor.vaciar()
+    conexion.registrar_hojas(escritor.hojas_conocidas, completas=escritor.hojas_consultadas)
+    return nombre_hoja
+
+def es_hoja_desactualizada(error):
+    """Indica si la API rechazó un lote porque una hoja ya existe o ya no existe (lista de hojas vieja)"""
+    mensaje = str(error)
+    return 'already exists' in mensaje or 'No grid with id' in mensaje
+
+def es_limite_cuota(error):
+    """Indica si una excepción corresponde a una respuesta 429 de la API"""
+    if getattr(error, 'code', None) == 429:
+        return True
+    respuesta = getattr(error, 'response', None)
+    return getattr(respuesta, 'status_code', None) == 429
+
+def con_reintentos(funcion, *args, max_reintentos=5, espera_inicial=1.0, dormir=time.sleep):
+    """Ejecuta una solicitud reintentando con espera exponencial ante errores 429"""
+    for intento in range(max_reintentos + 1):
+        try:
+            contar('sheets_solicitudes')
+            with medir('sheets_solicitud'):
+                return funcion(*args)
+        except Exception as e:
+            if not es_limite_cuota(e) or intento == max_reintentos:
+                raise
+            contar('sheets_reintentos_cuota')
+            espera = espera_inicial * (2 ** intento)
+            dormir(espera + random.uniform(0, espera / 2))
+
+
+class EscritorSheets:
+    """Cola de semanas a guardar que se escriben juntas con batch_update.
+
+    encolar() solo acumula; vaciar() consulta una vez las hojas existentes y
+    envía todas las semanas en lotes de hasta hojas_por_lote, creando las hojas
+    que falten en la misma solicitud. Si la misma semana se encola varias veces
+    solo se escribe la última versión.
+
+    hojas_conocidas permite pasar un {título: id} ya cargado (por ejemplo el de
+    ConexionSheets) para no consultar metadatos. El escritor trabaja sobre una
+    copia, que actualiza con las hojas creadas; si la API rechaza un lote
+    porque una hoja ya existe o ya no existe, la copia se vuelve a consultar
+    una vez (hojas_consultadas queda en True) y se reintenta.
+    """
+
+    def __init__(self, spreadsheet, hojas_por_lote=50, max_reintentos=5, espera_inicial=1.0, dormir=time.sleep, hojas_conocidas=None):
+        self.spreadsheet = spreadsheet
+        self.hojas_por_lote = hojas_por_lote
+        self.max_reintentos = max_reintentos
+        self.espera_inicial = espera_inicial
+        self.dormir = dormir
+        self.hojas_conocidas = dict(hojas_conocidas) if hojas_conocidas is not None else None
+        self.hojas_consultadas = False
+        self.pendientes = {}
+        self.solicitudes_enviadas = 0
+
+    def encolar(self, registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana, fecha_guardado=None):
+        """Agrega una semana a la cola y retorna el nombre de su hoja"""
+        nombre_hoja, data, formatos = construir_datos_hoja(
+            registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana, fecha_guardado
+        )
+        self.pendientes[nombre_hoja] = (data, formatos)
+        return nombre_hoja
+
+    def hojas_existentes(self):
+        """Retorna {título: id} de las hojas actuales del documento"""
+        worksheets = self._con_reintentos(self.spreadsheet.worksheets)
+        return {worksheet.title: worksheet.id for worksheet in worksheets}
+
+    def vaciar(self):
+        """Escribe todas las semanas pendientes y retorna la lista de nombres de hoja guardados"""
+        if not self.pendientes:
+            return []
+
+        existentes = self.hojas_conocidas if self.hojas_conocidas is not None else self.hojas_existentes()
+        guardadas = []
+        nombres = list(self.pendientes)
+
+        for inicio in range(0, len(nombres), self.hojas_por_lote):
+            lote = nombres[inicio:inicio + self.hojas_por_lote]
+            solicitudes, nuevas = self._solicitudes_lote(lote, existentes)
+            try:
+                self._con_reintentos(self.spreadsheet.batch_update, {'requests': solicitudes})
+            except Exception as e:
+                if self.hojas_conocidas is None or self.hojas_consultadas or not es_hoja_desactualizada(e):
+                    raise
+                # La lista en memoria quedó desactualizada: consultar y reintentar una vez
+                existentes.clear()
+                existentes.update(self.hojas_existentes())
+                self.hojas_consultadas = True
+                solicitudes, nuevas = self._solicitudes_lote(lote, existentes)
+                self._con_reintentos(self.spreadsheet.batch_update, {'requests': solicitudes})
+
+            existentes.update(nuevas)
+            for nombre_hoja in lote:
+                del self.pendientes[nombre_hoja]
+            guardadas.extend(lote)
+
+        return guardadas
+
+    def _solicitudes_lote(self, lote, existentes):
+        """Solicitudes de un lote y {título: id} de las hojas que crea"""
+        ids_usados = set(existentes.values())
+        solicitudes = []
+        nuevas = {}
+        for nombre_hoja in lote:
+            data, formatos = self.pendientes[nombre_hoja]
+            id_hoja = existentes.get(nombre_hoja)
+            if id_hoja is None:
+                id_hoja = self._nuevo_id(nombre_hoja, ids_usados)
+                ids_usados.add(id_hoja)
+                nuevas[nombre_hoja] = id_hoja
+                solicitudes.append({'addSheet': {'properties': {
+                    'sheetId': id_hoja,
+                    'title': nombre_hoja,
+                    'gridProperties': {'rowCount': 100, 'columnCount': 20}
+                }}})
+            solicitudes.extend(solicitudes_hoja(id_hoja, data, formatos))
+        return solicitudes, nuevas
+
+    def _nuevo_id(self, nombre_hoja, ids_usados):
+        """Id de hoja estable a partir del nombre, evitando colisiones"""
+        id_hoja = zlib.crc32(nombre_hoja.encode('utf-8')) & 0x7FFFFFFF
+        while id_hoja in ids_usados or id_hoja == 0:
+            id_hoja = (id_hoja + 1) & 0x7FFFFFFF
+        return id_hoja
+
+    def _con_reintentos(self, funcion, *args):
+        def enviar(*args):
+            self.solicitudes_enviadas += 1
+            return funcion(*args)
+        return con_reintentos(
+            enviar, *args, max_reintentos=self.max_reintentos, espera_inicial=self.espera_inicial, dormir=self.dormir
+        )
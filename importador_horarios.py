@@ -0,0 +1,293 @@
+"""Importador de horarios de varios empleados y resumen semanal por línea de comandos.
+
+Lee archivos CSV (o Parquet si pyarrow está instalado) con las columnas
+employee, date, entrada, salida y recargo, fila por fila, y genera un resumen
+por empleado y semana (lunes a domingo) con los mismos totales de la interfaz.
+
+Uso:
+    python importador_horarios.py horarios.csv --salida resumen.csv
+    python importador_horarios.py horarios.parquet --ordenado
+    python importador_horarios.py horarios.csv --db salario.db
+"""
+import argparse
+import csv
+import datetime
+import importlib.util
+import sys
+
+from motor_salario import (
+    REGLAS_TARIFAS,
+    Turno,
+    obtener_rango_semana,
+    formato_horas_minutos,
+    formato_horas_minutos_texto,
+    calcular_semana,
+    reglas_para_fecha,
+)
+from almacen_semanas import AlmacenSemanas
+from atribucion_turnos import CORTES, CORTE_SEMANA, atribuir_turno
+from registros_compactos import DiasCompactos
+from tabla_pagos import obtener_tabla
+
+# Manejo de importaciones: pyarrow se importa solo al leer un Parquet
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+COLUMNAS_RESUMEN = [
+    'empleado', 'semana_inicio', 'semana_fin', 'dias_trabajados', 'minutos_trabajados',
+    'horas_formato', 'horas_texto', 'pago_base', 'recargos', 'total_semanal', 'version_tarifas'
+]
+
+# Semanas guardadas por transacción con --db
+SEMANAS_POR_TRANSACCION = 1000
+
+FORMATOS_FECHA = ('%Y-%m-%d', '%d/%m/%Y')
+FORMATOS_HORA = ('%H:%M', '%H:%M:%S', '%I:%M %p', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')
+
+
+def parsear_fecha(valor):
+    """Convierte 'YYYY-MM-DD' o 'dd/mm/YYYY' (o un date ya tipado) a datetime.date"""
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    texto = str(valor).strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha inválida: {valor!r}")
+
+def parsear_hora(valor):
+    """Convierte 'HH:MM', 'HH:MM:SS', '8:00 AM' o una fecha y hora a datetime.time; vacío o '---' retorna None"""
+    if valor is None:
+        return None
+    if isinstance(valor, datetime.datetime):
+        return valor.time()
+    if isinstance(valor, datetime.time):
+        return valor
+    texto = str(valor).strip()
+    if texto in ('', '---'):
+        return None
+    for formato in FORMATOS_HORA:
+        try:
+            return datetime.datetime.strptime(texto, formato).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Hora inválida: {valor!r}")
+
+def parsear_recargo(valor, fecha=None):
+    """Acepta el monto en pesos o la etiqueta de un recargo (por ejemplo '$5,000').
+
+    Las etiquetas se buscan en la versión de tarifas vigente en fecha (la del
+    turno), para que un archivo histórico use los recargos de su época; sin
+    fecha, en REGLAS_TARIFAS.
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    texto = str(valor).strip()
+    if texto == '':
+        return 0
+    recargos_disponibles = (REGLAS_TARIFAS if fecha is None else reglas_para_fecha(fecha))['recargos_disponibles']
+    if texto in recargos_disponibles:
+        return recargos_disponibles[texto]
+    return int(float(texto.replace('$', '').replace(',', '')))
+
+def leer_filas_csv(ruta):
+    """Itera las filas de un CSV sin cargar el archivo completo"""
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        yield from csv.DictReader(archivo)
+
+def leer_filas_parquet(ruta, tamano_lote=65536):
+    """Itera las filas de un Parquet por lotes para mantener la memoria acotada"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Se requiere pyarrow para leer archivos Parquet")
+    import pyarrow.parquet as pq
+
+    archivo = pq.ParquetFile(ruta)
+    for lote in archivo.iter_batches(batch_size=tamano_lote):
+        yield from lote.to_pylist()
+
+def leer_filas(ruta):
+    """Selecciona el lector según la extensión del archivo"""
+    if str(ruta).lower().endswith('.parquet'):
+        return leer_filas_parquet(ruta)
+    return leer_filas_csv(ruta)
+
+def fila_a_turno(fila):
+    """Convierte una fila del archivo en (empleado, Turno)"""
+    fecha = parsear_fecha(fila['date'])
+    entrada = parsear_hora(fila.get('entrada'))
+    salida = parsear_hora(fila.get('salida'))
+    sin_trabajo = entrada is None or salida is None
+    turno = Turno(
+        fecha=fecha,
+        entrada=entrada or datetime.time(0, 0),
+        salida=salida or datetime.time(0, 0),
+        recargo=0 if sin_trabajo else parsear_recargo(fila.get('recargo'), fecha),
+        sin_trabajo=sin_trabajo
+    )
+    return str(fila['employee']).strip(), turno
+
+def resumir_semana(empleado, lunes, turnos):
+    """Calcula el resumen de una semana de un empleado con los totales de la interfaz"""
+    reglas = reglas_para_fecha(lunes)
+    registros_semana, _, total_semanal = calcular_semana(turnos, lunes, reglas, obtener_tabla(reglas), compacto=True)
+    return resumir_registros(empleado, lunes, registros_semana, total_semanal, reglas['version'])
+
+def resumir_registros(empleado, lunes, registros_semana, total_semanal, version_tarifas):
+    """Resumen de una semana ya calculada, con las columnas de COLUMNAS_RESUMEN"""
+    total_minutos = sum(registro['minutos_trabajados'] for registro in registros_semana)
+    domingo = lunes + datetime.timedelta(days=6)
+    return {
+        'empleado': empleado,
+        'semana_inicio': lunes.strftime('%d/%m/%Y'),
+        'semana_fin': domingo.strftime('%d/%m/%Y'),
+        'dias_trabajados': sum(1 for registro in registros_semana if not registro['sin_trabajo']),
+        'minutos_trabajados': total_minutos,
+        'horas_formato': formato_horas_minutos(total_minutos),
+        'horas_texto': formato_horas_minutos_texto(total_minutos),
+        'pago_base': sum(registro['pago_base'] for registro in registros_semana),
+        'recargos': sum(registro['recargo'] for registro in registros_semana),
+        'total_semanal': total_semanal,
+        'version_tarifas': version_tarifas
+    }
+
+def _semana_de_fila(fila):
+    """(empleado, lunes) de una fila que no se pudo convertir, o None donde no se puedan leer"""
+    empleado = str(fila.get('employee', '')).strip() or None
+    try:
+        lunes = obtener_rango_semana(parsear_fecha(fila.get('date')))[0].date()
+    except ValueError:
+        lunes = None
+    return empleado, lunes
+
+def agrupar_semanas(filas, ordenado=False, corte=CORTE_SEMANA, al_fallar=None):
+    """Agrupa filas por empleado y semana y produce (empleado, lunes, turnos).
+
+    Varias filas del mismo día son tramos del día (turnos partidos o
+    marcaciones solapadas) y calcular_semana las fusiona. Los turnos que
+    cruzan medianoche se dividen según corte (ver atribucion_turnos): con
+    'semana', la parte posterior a la medianoche del domingo se suma a la
+    semana siguiente.
+
+    Sin ordenado, todas las semanas quedan en memoria hasta el final del
+    archivo. Con ordenado=True las filas deben venir ordenadas por fecha:
+    cada semana se emite en cuanto aparece una fila de una semana posterior
+    y solo las semanas abiertas ocupan memoria. Una fila de una semana ya
+    emitida es un error.
+
+    Las filas que no se pueden interpretar lanzan ValueError con su número
+    (contando desde 1, sin el encabezado). Si se indica al_fallar, en cambio
+    se llama al_fallar(numero_fila, empleado, lunes, error), con None donde
+    no se puedan leer, y la semana de esa fila se descarta entera para no
+    producir un resumen incompleto.
+    """
+    semanas_abiertas = {}
+    semanas_descartadas = set()
+    lunes_actual = None
+
+    for numero_fila, fila in enumerate(filas, start=1):
+        try:
+            empleado, turno = fila_a_turno(fila)
+            lunes = obtener_rango_semana(turno.fecha)[0].date()
+            if ordenado and lunes_actual is not None and lunes < lunes_actual:
+                raise ValueError(
+                    f"el archivo no está ordenado por fecha: la semana del {lunes.strftime('%d/%m/%Y')} ya se "
+                    f"emitió al llegar a la del {lunes_actual.strftime('%d/%m/%Y')} (ordénelo o no use --ordenado)"
+                )
+            tramos = atribuir_turno(turno, corte)
+        except (KeyError, ValueError) as e:
+            if isinstance(e, KeyError):
+                e = ValueError(f"falta la columna {e.args[0]!r}")
+            if al_fallar is None:
+                raise ValueError(f"Fila {numero_fila}: {e}") from e
+            empleado, lunes = _semana_de_fila(fila)
+            ya_emitida = ordenado and lunes is not None and lunes_actual is not None and lunes < lunes_actual
+            if empleado is not None and lunes is not None and not ya_emitida:
+                semanas_descartadas.add((empleado, lunes))
+                semanas_abiertas.pop((empleado, lunes), None)
+            al_fallar(numero_fila, empleado, lunes, e)
+            continue
+
+        if ordenado and lunes_actual is not None and lunes > lunes_actual:
+            for clave in sorted(c for c in semanas_abiertas if c[1] < lunes):
+                yield clave[0], clave[1], semanas_abiertas.pop(clave)
+        if lunes_actual is None or lunes > lunes_actual:
+            lunes_actual = lunes
+
+        for tramo in tramos:
+            lunes_tramo = lunes if tramo.fecha == turno.fecha else obtener_rango_semana(tramo.fecha)[0].date()
+            if (empleado, lunes_tramo) not in semanas_descartadas:
+                semanas_abiertas.setdefault((empleado, lunes_tramo), []).append(tramo)
+
+    for clave in sorted(semanas_abiertas):
+        yield clave[0], clave[1], semanas_abiertas[clave]
+
+def agregar_semanas(filas, ordenado=False, corte=CORTE_SEMANA):
+    """Produce un resumen por cada semana de cada empleado"""
+    for empleado, lunes, turnos in agrupar_semanas(filas, ordenado=ordenado, corte=corte):
+        yield resumir_semana(empleado, lunes, turnos)
+
+def guardar_pendientes(almacen, dias, pendientes):
+    """Guarda en almacen las semanas pendientes, cuyos días están en columnas de dias.
+
+    pendientes: lista de (empleado, lunes, posición del lunes en dias,
+    horarios_completos, version_tarifas).
+    """
+    almacen.guardar_semanas(
+        (empleado, lunes, dias.semana(inicio), horarios_completos, version_tarifas)
+        for empleado, lunes, inicio, horarios_completos, version_tarifas in pendientes
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumen semanal de salarios por empleado")
+    parser.add_argument('archivo', help="Archivo CSV o Parquet con employee, date, entrada, salida, recargo")
+    parser.add_argument('--salida', help="Archivo CSV de salida (por defecto la salida estándar)")
+    parser.add_argument('--ordenado', action='store_true',
+                        help="El archivo está ordenado por fecha: emite cada semana al cerrarse "
+                             "(necesario para que la memoria no crezca con el archivo)")
+    parser.add_argument('--db', help="Guardar además cada semana en esta base SQLite (ver almacen_semanas)")
+    parser.add_argument('--corte', choices=CORTES, default=CORTE_SEMANA,
+                        help="Dónde dividir los turnos que cruzan medianoche (por defecto, entre semanas)")
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenSemanas(args.db) if args.db else None
+    # Semanas por guardar con --db; sus días se acumulan en columnas y no como registros
+    dias_pendientes = DiasCompactos()
+    pendientes = []
+    destino = open(args.salida, 'w', newline='', encoding='utf-8') if args.salida else sys.stdout
+    try:
+        escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_RESUMEN)
+        escritor.writeheader()
+        for empleado, lunes, turnos in agrupar_semanas(leer_filas(args.archivo), ordenado=args.ordenado, corte=args.corte):
+            reglas = reglas_para_fecha(lunes)
+            registros_semana, horarios_completos, total_semanal = calcular_semana(
+                turnos, lunes, reglas, obtener_tabla(reglas), compacto=True
+            )
+            escritor.writerow(resumir_registros(empleado, lunes, registros_semana, total_semanal, reglas['version']))
+            if almacen is not None:
+                pendientes.append((empleado, lunes, len(dias_pendientes), horarios_completos, reglas['version']))
+                for registro in registros_semana:
+                    dias_pendientes.agregar_registro(registro)
+                if len(pendientes) >= SEMANAS_POR_TRANSACCION:
+                    guardar_pendientes(almacen, dias_pendientes, pendientes)
+                    dias_pendientes = DiasCompactos()
+                    pendientes = []
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        # Las semanas ya escritas en el resumen también quedan en la base
+        if pendientes:
+            guardar_pendientes(almacen, dias_pendientes, pendientes)
+        if destino is not sys.stdout:
+            destino.close()
+        if almacen is not None:
+            almacen.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Lectura por lotes de las hojas semanales guardadas en Google Sheets.
+
+Recupera las hojas Semana_dd_mm_yy_a_dd_mm_yy que escribe exportador_sheets
+y las convierte de nuevo en registros_semana y horarios_completos, para
+recalcular o auditar semanas. Las hojas se piden de a muchas por llamado a
+values_batch_get, con varios llamados en paralelo, y los valores quedan en
+una caché local asociada a la revisión del documento (modifiedTime de
+Drive): mientras el documento no cambie, volver a leer cuesta una sola
+solicitud.
+
+En Sheets un turno partido queda solo con la primera entrada y la última
+salida, por lo que los horarios leídos no tienen 'segmentos'.
+
+Uso:
+    python lector_sheets.py cuenta_servicio.json "Registro Salarios" --desde 2025-01-01 --hasta 2025-12-31
+    python lector_sheets.py cuenta_servicio.json "Registro Salarios" --db salario.db --cache lecturas.json
+"""
+import argparse
+import concurrent.futures
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from exportador_sheets import ENCABEZADOS_SHEETS, con_reintentos
+from metricas import contar
+from motor_salario import DIAS_SEMANA, formato_horas_minutos, formato_horas_minutos_texto, obtener_rango_semana
+
+_log = logging.getLogger(__name__)
+
+PATRON_NOMBRE_HOJA = re.compile(r'^Semana_(\d{2})_(\d{2})_(\d{2})_a_\d{2}_\d{2}_\d{2}$')
+
+# Rango leído de cada hoja: encabezados, siete días y filas de totales
+RANGO_HOJA = 'A1:J30'
+HOJAS_POR_SOLICITUD = 50
+HILOS = 4
+
+
+def lunes_desde_nombre_hoja(nombre_hoja):
+    """Lunes de la semana de una hoja 'Semana_06_01_25_a_12_01_25', o None si no es una hoja semanal"""
+    coincidencia = PATRON_NOMBRE_HOJA.match(nombre_hoja)
+    if coincidencia is None:
+        return None
+    dia, mes, anio = coincidencia.groups()
+    return datetime.datetime.strptime(f"{dia}/{mes}/{anio}", '%d/%m/%y')
+
+def _hora_desde_celda(texto):
+    """'8:00 AM' -> time; '---' o vacío -> None"""
+    texto = str(texto).strip()
+    if not texto or texto == '---':
+        return None
+    return datetime.datetime.strptime(texto, '%I:%M %p').time()
+
+def _minutos_desde_celda(texto):
+    """'08:30' -> 510"""
+    horas, minutos = str(texto).split(':')
+    return int(horas) * 60 + int(minutos)
+
+def _entero(valor):
+    """Monto de una celda: número sin formato o texto con separadores de miles"""
+    if valor is None or valor == "":
+        return 0
+    if isinstance(valor, (int, float)):
+        return int(round(valor))
+    return int(round(float(str(valor).replace(',', ''))))
+
+def parsear_hoja(valores):
+    """Convierte los valores de una hoja semanal en (registros_semana, horarios_completos, total_semanal).
+
+    Lanza ValueError si la hoja no tiene los encabezados de ENCABEZADOS_SHEETS.
+    """
+    if not valores or [str(celda) for celda in valores[0][:len(ENCABEZADOS_SHEETS)]] != ENCABEZADOS_SHEETS:
+        raise ValueError("La hoja no tiene los encabezados de una semana guardada")
+
+    registros_semana = []
+    horarios_completos = {}
+    total_semanal = None
+    for fila in valores[1:]:
+        # La API omite las celdas vacías al final de cada fila
+        fila = list(fila) + [""] * (len(ENCABEZADOS_SHEETS) - len(fila))
+        if fila[0] in DIAS_SEMANA:
+            dia = fila[0]
+            minutos_trabajados = _minutos_desde_celda(fila[4])
+            sin_trabajo = fila[9] == "Sí"
+            registros_semana.append({
+                'dia': dia,
+                'minutos_trabajados': minutos_trabajados,
+                'horas_formato': formato_horas_minutos(minutos_trabajados),
+                'horas_texto': formato_horas_minutos_texto(minutos_trabajados),
+                'horas_decimal': minutos_trabajados / 60,
+                'pago_base': _entero(fila[5]),
+                'pago_total': _entero(fila[7]),
+                'recargo': _entero(fila[6]),
+                'descripcion': str(fila[8]),
+                'sin_trabajo': sin_trabajo
+            })
+            entrada = _hora_desde_celda(fila[2])
+            salida = _hora_desde_celda(fila[3])
+            if not sin_trabajo and entrada is not None and salida is not None:
+                horarios_completos[dia] = {'entrada': entrada, 'salida': salida}
+        elif fila[0] == "TOTAL SEMANAL":
+            total_semanal = _entero(fila[7])
+
+    if total_semanal is None:
+        total_semanal = sum(registro['pago_total'] for registro in registros_semana)
+    return registros_semana, horarios_completos, total_semanal
+
+
+class LectorSheets:
+    """Lee muchas hojas semanales de un documento con values_batch_get en paralelo.
+
+    ruta_cache permite conservar los valores leídos en un archivo JSON entre
+    ejecuciones; la caché se descarta entera cuando cambia la revisión del
+    documento.
+    """
+
+    def __init__(self, spreadsheet, hilos=HILOS, hojas_por_solicitud=HOJAS_POR_SOLICITUD, ruta_cache=None,
+                 max_reintentos=5, espera_inicial=1.0, dormir=time.sleep):
+        self.spreadsheet = spreadsheet
+        self.hilos = hilos
+        self.hojas_por_solicitud = hojas_por_solicitud
+        self.ruta_cache = ruta_cache
+        self.max_reintentos = max_reintentos
+        self.espera_inicial = espera_inicial
+        self.dormir = dormir
+        self._lock = threading.Lock()
+        self._cache = self._leer_cache()
+        # {nombre_hoja: motivo} de las hojas que omitió el último leer_semanas
+        self.hojas_omitidas = {}
+
+    def _con_reintentos(self, funcion, *args):
+        return con_reintentos(
+            funcion, *args, max_reintentos=self.max_reintentos, espera_inicial=self.espera_inicial, dormir=self.dormir
+        )
+
+    def _leer_cache(self):
+        if self.ruta_cache and os.path.exists(self.ruta_cache):
+            with open(self.ruta_cache, encoding='utf-8') as archivo:
+                cache = json.load(archivo)
+            if cache.get('documento') == getattr(self.spreadsheet, 'id', None):
+                return cache
+        return {'documento': getattr(self.spreadsheet, 'id', None), 'revision': None, 'hojas': {}}
+
+    def _escribir_cache(self):
+        """Escribe la caché de forma atómica"""
+        if not self.ruta_cache:
+            return
+        directorio = os.path.dirname(os.path.abspath(self.ruta_cache))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            json.dump(self._cache, archivo, ensure_ascii=False)
+        os.replace(temporal, self.ruta_cache)
+
+    def hojas_semanales(self, desde=None, hasta=None):
+        """Nombres de las hojas semanales cuyo lunes está entre las semanas de desde y hasta, en orden"""
+        desde = obtener_rango_semana(desde)[0] if desde is not None else None
+        hasta = obtener_rango_semana(hasta)[0] if hasta is not None else None
+        semanas = []
+        for worksheet in self._con_reintentos(self.spreadsheet.worksheets):
+            lunes = lunes_desde_nombre_hoja(worksheet.title)
+            if lunes is None or (desde is not None and lunes < desde) or (hasta is not None and lunes > hasta):
+                continue
+            semanas.append((lunes, worksheet.title))
+        return [nombre_hoja for _, nombre_hoja in sorted(semanas)]
+
+    def _pedir_lote(self, lote):
+        respuesta = self._con_reintentos(
+            self.spreadsheet.values_batch_get,
+            [f"'{nombre_hoja}'!{RANGO_HOJA}" for nombre_hoja in lote],
+            {'valueRenderOption': 'UNFORMATTED_VALUE'}
+        )
+        # valueRanges llega en el mismo orden que los rangos pedidos
+        return {nombre_hoja: rango.get('values', []) for nombre_hoja, rango in zip(lote, respuesta['valueRanges'])}
+
+    def leer_valores(self, nombres_hojas):
+        """Retorna {nombre_hoja: filas de valores}, pidiendo a la API solo lo que no está en caché"""
+        revision = self._con_reintentos(self.spreadsheet.get_lastUpdateTime)
+        with self._lock:
+            if revision != self._cache['revision']:
+                self._cache['revision'] = revision
+                self._cache['hojas'] = {}
+            hojas = self._cache['hojas']
+            faltantes = [nombre_hoja for nombre_hoja in dict.fromkeys(nombres_hojas) if nombre_hoja not in hojas]
+
+            contar('sheets_hojas_cache', len(nombres_hojas) - len(faltantes))
+            if faltantes:
+                lotes = [
+                    faltantes[inicio:inicio + self.hojas_por_solicitud]
+                    for inicio in range(0, len(faltantes), self.hojas_por_solicitud)
+                ]
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.hilos, len(lotes))) as ejecutor:
+                    for valores in ejecutor.map(self._pedir_lote, lotes):
+                        hojas.update(valores)
+                self._escribir_cache()
+            return {nombre_hoja: hojas[nombre_hoja] for nombre_hoja in nombres_hojas}
+
+    def leer_semanas(self, desde=None, hasta=None, nombres_hojas=None):
+        """Lee y convierte las hojas semanales (todas, las del rango o las indicadas), en orden.
+
+        Retorna una lista de dicts con nombre_hoja, lunes, domingo,
+        registros_semana, horarios_completos y total_semanal. Las hojas cuyo
+        nombre o contenido no tienen el formato de una semana guardada se
+        omiten: quedan con su motivo en hojas_omitidas y se registra una
+        advertencia por cada una.
+        """
+        if nombres_hojas is None:
+            nombres_hojas = self.hojas_semanales(desde, hasta)
+        semanas = []
+        self.hojas_omitidas = {}
+        for nombre_hoja, valores in self.leer_valores(nombres_hojas).items():
+            lunes = lunes_desde_nombre_hoja(nombre_hoja)
+            try:
+                if lunes is None:
+                    raise ValueError("El nombre no es el de una hoja semanal (Semana_dd_mm_yy_a_dd_mm_yy)")
+                registros_semana, horarios_completos, total_semanal = parsear_hoja(valores)
+            except ValueError as e:
+                self.hojas_omitidas[nombre_hoja] = str(e)
+                _log.warning("Se omite la hoja %s: %s", nombre_hoja, e)
+                continue
+            semanas.append({
+                'nombre_hoja': nombre_hoja,
+                'lunes': lunes,
+                'domingo': lunes + timedelta(days=6),
+                'registros_semana': registros_semana,
+                'horarios_completos': horarios_completos,
+                'total_semanal': total_semanal
+            })
+        return semanas
+
+def main(argv=None):
+    from almacen_semanas import AlmacenSemanas
+    from conexion_sheets import SHEETS_AVAILABLE, ConexionSheets
+
+    parser = argparse.ArgumentParser(description="Lee las semanas guardadas en Google Sheets")
+    parser.add_argument('credenciales', help="JSON de la cuenta de servicio")
+    parser.add_argument('documento', help="Nombre del documento de Google Sheets")
+    parser.add_argument('--desde', type=datetime.date.fromisoformat, help="Primera semana (AAAA-MM-DD)")
+    parser.add_argument('--hasta', type=datetime.date.fromisoformat, help="Última semana (AAAA-MM-DD)")
+    parser.add_argument('--hilos', type=int, default=HILOS, help="Solicitudes simultáneas a la API")
+    parser.add_argument('--cache', help="Archivo JSON de caché de lecturas")
+    parser.add_argument('--db', help="Guardar las semanas leídas en esta base SQLite")
+    parser.add_argument('--empleado', default='principal', help="Empleado con el que se guardan en --db")
+    args = parser.parse_args(argv)
+
+    if not SHEETS_AVAILABLE:
+        print("Se requiere gspread para leer de Google Sheets", file=sys.stderr)
+        return 1
+    with open(args.credenciales, encoding='utf-8') as archivo:
+        conexion = ConexionSheets(json.load(archivo), args.documento)
+
+    lector = LectorSheets(conexion.obtener_spreadsheet(), hilos=args.hilos, ruta_cache=args.cache)
+    semanas = lector.leer_semanas(args.desde, args.hasta)
+
+    if args.db:
+        almacen = AlmacenSemanas(args.db)
+        try:
+            almacen.guardar_semanas(
+                (args.empleado, semana['lunes'], semana['registros_semana'], semana['horarios_completos'], None)
+                for semana in semanas
+            )
+        finally:
+            almacen.cerrar()
+    for semana in semanas:
+        print(f"{semana['nombre_hoja']}\t{semana['total_semanal']}")
+    for nombre_hoja, motivo in lector.hojas_omitidas.items():
+        print(f"Hoja omitida {nombre_hoja}: {motivo}", file=sys.stderr)
+    print(f"Semanas leídas: {len(semanas)}, hojas omitidas: {len(lector.hojas_omitidas)}", file=sys.stderr)
+    return 1 if lector.hojas_omitidas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
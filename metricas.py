@@ -0,0 +1,131 @@
+"""Métricas de tiempo y contadores del proceso, exportables en formato Prometheus.
+
+Cada medición cuesta un perf_counter y una actualización bajo un lock, por lo
+que puede dejarse activa en producción. Los datos son por proceso: en
+Streamlit los comparten todas las sesiones.
+
+    with medir('generar_pdf'):
+        ...
+    contar('pdf_bytes', len(pdf_bytes))
+    texto = exportar_prometheus()
+"""
+import bisect
+import functools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIJO = 'salario'
+
+# Límites (segundos) de los buckets del histograma de cada medición
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RegistroMetricas:
+    """Contadores e histogramas de duración con nombre, seguros entre hilos"""
+
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = limites
+        self._contadores = {}
+        self._tiempos = {}
+        self._lock = threading.Lock()
+
+    def contar(self, nombre, valor=1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + valor
+
+    def observar(self, nombre, segundos):
+        """Registra una duración en el histograma de nombre"""
+        with self._lock:
+            tiempo = self._tiempos.get(nombre)
+            if tiempo is None:
+                tiempo = self._tiempos[nombre] = {
+                    'cantidad': 0, 'suma': 0.0, 'maximo': 0.0, 'buckets': [0] * (len(self.limites) + 1)
+                }
+            tiempo['cantidad'] += 1
+            tiempo['suma'] += segundos
+            if segundos > tiempo['maximo']:
+                tiempo['maximo'] = segundos
+            tiempo['buckets'][bisect.bisect_left(self.limites, segundos)] += 1
+
+    @contextmanager
+    def medir(self, nombre):
+        """Mide la duración del bloque, aunque termine con una excepción"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio)
+
+    def medido(self, nombre):
+        """Decorador que mide cada llamado a la función"""
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.medir(nombre):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def resumen(self):
+        """Copia de los valores: {'contadores': {...}, 'tiempos': {nombre: {cantidad, suma, maximo, promedio}}}"""
+        with self._lock:
+            contadores = dict(self._contadores)
+            tiempos = {
+                nombre: {
+                    'cantidad': tiempo['cantidad'],
+                    'suma': tiempo['suma'],
+                    'maximo': tiempo['maximo'],
+                    'promedio': tiempo['suma'] / tiempo['cantidad']
+                }
+                for nombre, tiempo in self._tiempos.items()
+            }
+        return {'contadores': contadores, 'tiempos': tiempos}
+
+    def exportar_prometheus(self):
+        """Texto en formato de exposición de Prometheus"""
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            tiempos = sorted((nombre, dict(tiempo, buckets=list(tiempo['buckets']))) for nombre, tiempo in self._tiempos.items())
+
+        lineas = []
+        for nombre, valor in contadores:
+            metrica = f"{PREFIJO}_{nombre}_total"
+            lineas.append(f"# TYPE {metrica} counter")
+            lineas.append(f"{metrica} {valor}")
+        for nombre, tiempo in tiempos:
+            metrica = f"{PREFIJO}_{nombre}_segundos"
+            lineas.append(f"# TYPE {metrica} histogram")
+            acumulado = 0
+            for limite, cantidad in zip(self.limites, tiempo['buckets']):
+                acumulado += cantidad
+                lineas.append(f'{metrica}_bucket{{le="{limite}"}} {acumulado}')
+            lineas.append(f'{metrica}_bucket{{le="+Inf"}} {tiempo["cantidad"]}')
+            lineas.append(f"{metrica}_sum {tiempo['suma']:.6f}")
+            lineas.append(f"{metrica}_count {tiempo['cantidad']}")
+        return "\n".join(lineas) + "\n"
+
+    def escribir_archivo(self, ruta):
+        """Escribe la exportación de forma atómica (para el textfile collector de node_exporter)"""
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.exportar_prometheus())
+        # mkstemp crea el archivo con permisos 0600; el collector puede correr con otro usuario
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, ruta)
+
+    def reiniciar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._tiempos.clear()
+
+
+# Registro del proceso
+METRICAS = RegistroMetricas()
+contar = METRICAS.contar
+medir = METRICAS.medir
+medido = METRICAS.medido
+exportar_prometheus = METRICAS.exportar_prometheus
@@ -0,0 +1,341 @@
+"""Motor de cálculo de salario sin dependencias de interfaz.
+
+Este módulo no importa Streamlit, FPDF ni gspread, por lo que puede usarse
+directamente desde procesos por lotes y scripts.
+"""
+import datetime
+import hashlib
+import json
+from datetime import timedelta
+from typing import NamedTuple
+
+from reglas_tarifas import obtener_catalogo
+
+# REGLAS Y TARIFAS (versión vigente hoy; las versiones se definen en reglas_tarifas.json)
+REGLAS_TARIFAS = dict(obtener_catalogo().vigente())
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+class Turno(NamedTuple):
+    """Turno de un día: fecha, hora de entrada, hora de salida y recargo en pesos"""
+    fecha: datetime.date
+    entrada: datetime.time
+    salida: datetime.time
+    recargo: int = 0
+    sin_trabajo: bool = False
+
+
+def actualizar_reglas_tarifas():
+    """Recarga el archivo de tarifas si cambió y actualiza REGLAS_TARIFAS en sitio.
+
+    Retorna True si la versión vigente cambió.
+    """
+    catalogo = obtener_catalogo()
+    catalogo.recargar_si_cambio()
+    vigente = catalogo.vigente()
+    if vigente == REGLAS_TARIFAS:
+        return False
+    REGLAS_TARIFAS.clear()
+    REGLAS_TARIFAS.update(vigente)
+    return True
+
+def reglas_para_fecha(fecha):
+    """Versión de tarifas que aplica a la fecha (por ejemplo, el lunes de una semana)"""
+    return obtener_catalogo().version_para(fecha)
+
+def huella_reglas_tarifas(reglas=None):
+    """Hash estable de una versión de tarifas; cambia cuando cambia cualquier tarifa o texto"""
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    contenido = json.dumps(reglas, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+def obtener_rango_semana(fecha_referencia=None):
+    """Obtiene el rango de fechas de la semana (lunes a domingo)"""
+    if fecha_referencia is None:
+        fecha_referencia = datetime.datetime.now()
+    elif isinstance(fecha_referencia, datetime.date):
+        fecha_referencia = datetime.datetime.combine(fecha_referencia, datetime.time())
+
+    # Encontrar el lunes de esta semana
+    lunes = fecha_referencia - timedelta(days=fecha_referencia.weekday())
+    domingo = lunes + timedelta(days=6)
+    return lunes, domingo
+
+def formato_horas_minutos(minutos_totales):
+    """Convierte minutos totales a formato hh:mm"""
+    if minutos_totales == 0:
+        return "00:00"
+    horas = int(minutos_totales // 60)
+    minutos = int(minutos_totales % 60)
+    return f"{horas:02d}:{minutos:02d}"
+
+def formato_horas_minutos_texto(minutos_totales):
+    """Convierte minutos totales a formato 'hh horas y mm minutos'"""
+    if minutos_totales == 0:
+        return "0 horas y 0 minutos"
+    horas = int(minutos_totales // 60)
+    minutos = int(minutos_totales % 60)
+    return f"{horas} hora{'s' if horas != 1 else ''} y {minutos} minuto{'s' if minutos != 1 else ''}"
+
+def calcular_minutos_trabajados(hora_entrada, hora_salida):
+    """Calcula los minutos entre entrada y salida, cruzando medianoche si la salida es menor"""
+    minutos_entrada = hora_entrada.hour * 60 + hora_entrada.minute
+    minutos_salida = hora_salida.hour * 60 + hora_salida.minute
+
+    if minutos_salida >= minutos_entrada:
+        return minutos_salida - minutos_entrada
+    return (24 * 60 - minutos_entrada) + minutos_salida
+
+def segmento_en_minutos(hora_entrada, hora_salida):
+    """Intervalo (inicio, fin) en minutos desde la medianoche del día; fin pasa de 1440 si cruza medianoche"""
+    inicio = hora_entrada.hour * 60 + hora_entrada.minute
+    return inicio, inicio + calcular_minutos_trabajados(hora_entrada, hora_salida)
+
+def fusionar_segmentos(segmentos):
+    """Une los tramos (entrada, salida) de un día que se solapan o se tocan.
+
+    Ordena los intervalos por inicio y los recorre una vez (O(n log n)),
+    extendiendo el último intervalo mientras el siguiente empiece antes de
+    que termine. Retorna la lista ordenada de intervalos (inicio, fin) en minutos.
+    """
+    fusionados = []
+    for inicio, fin in sorted(segmento_en_minutos(entrada, salida) for entrada, salida in segmentos):
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1][1] = fin
+        else:
+            fusionados.append([inicio, fin])
+    return [(inicio, fin) for inicio, fin in fusionados]
+
+def calcular_minutos_segmentos(segmentos):
+    """Minutos trabajados en un día con varios tramos, sin contar dos veces los solapamientos"""
+    return sum(fin - inicio for inicio, fin in fusionar_segmentos(segmentos))
+
+def _minutos_a_hora(minutos):
+    return datetime.time((minutos // 60) % 24, minutos % 60)
+
+def horario_desde_segmentos(segmentos):
+    """Entrada de horarios_completos para un día: primera entrada, última salida y los tramos si hay varios"""
+    if len(segmentos) == 1:
+        entrada, salida = segmentos[0]
+        return {'entrada': entrada, 'salida': salida}
+    tramos = [
+        {'entrada': _minutos_a_hora(inicio), 'salida': _minutos_a_hora(fin)}
+        for inicio, fin in fusionar_segmentos(segmentos)
+    ]
+    return {'entrada': tramos[0]['entrada'], 'salida': tramos[-1]['salida'], 'segmentos': tramos}
+
+def redondear_division(numerador, denominador):
+    """numerador / denominador redondeado a entero, con empates al par (como round() y np.rint).
+
+    Es la única regla de redondeo de los montos: se aplica una vez sobre el
+    valor exacto, sin pasar por punto flotante.
+    """
+    cociente, resto = divmod(numerador, denominador)
+    if 2 * resto > denominador or (2 * resto == denominador and cociente % 2 == 1):
+        cociente += 1
+    return cociente
+
+def calcular_pago_minutos(minutos_trabajados, recargo, reglas=None):
+    """Calcula (pago_total, descripcion, pago_base) del día en aritmética entera.
+
+    El pago base exacto es minutos × hora_normal / 60 (sobre la tarifa del
+    umbral cuando se supera) y se redondea una sola vez; el total es el pago
+    base más el recargo, ambos enteros.
+    """
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    HORA_NORMAL = reglas['hora_normal']
+    TARIFA_6_HORAS = reglas['tarifa_6_horas']
+    UMBRAL = reglas.get('umbral_horas', 6)
+    minutos_umbral = UMBRAL * 60
+
+    if minutos_trabajados == 0:
+        return 0, "Día sin trabajo", 0
+    horas_trabajadas = minutos_trabajados / 60  # Solo para la descripción
+    if minutos_trabajados < minutos_umbral:
+        pago_base = redondear_division(minutos_trabajados * HORA_NORMAL, 60)
+        descripcion = f"Horas normales ({horas_trabajadas:.2f}h)"
+    elif minutos_trabajados == minutos_umbral:
+        pago_base = TARIFA_6_HORAS
+        descripcion = f"{UMBRAL} horas completas"
+    else:
+        pago_base = TARIFA_6_HORAS + redondear_division((minutos_trabajados - minutos_umbral) * HORA_NORMAL, 60)
+        descripcion = f"{UMBRAL}h + {horas_trabajadas - UMBRAL:.2f}h extra"
+    return pago_base + recargo, descripcion, pago_base
+
+def calcular_pago_dia(horas_trabajadas, recargo, reglas=None):
+    """Calcula el pago del día según las reglas establecidas (por defecto, REGLAS_TARIFAS).
+
+    Cálculo original en punto flotante sobre horas, que se conserva para
+    quienes pasan horas fraccionarias (5.999 horas no llegan al umbral). El
+    motor trabaja en minutos con calcular_pago_minutos, que da lo mismo para
+    cualquier cantidad entera de minutos con las tarifas del catálogo.
+    """
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    HORA_NORMAL = reglas['hora_normal']
+    TARIFA_6_HORAS = reglas['tarifa_6_horas']
+    UMBRAL = reglas.get('umbral_horas', 6)
+
+    if horas_trabajadas == 0:
+        return 0, "Día sin trabajo", 0
+    elif horas_trabajadas < UMBRAL:
+        pago_base = horas_trabajadas * HORA_NORMAL
+        return int(round(pago_base + recargo, 0)), f"Horas normales ({horas_trabajadas:.2f}h)", int(round(pago_base, 0))
+    elif horas_trabajadas == UMBRAL:
+        return int(round(TARIFA_6_HORAS + recargo, 0)), f"{UMBRAL} horas completas", TARIFA_6_HORAS
+    else:
+        horas_extra = horas_trabajadas - UMBRAL
+        pago_base = TARIFA_6_HORAS + (horas_extra * HORA_NORMAL)
+        return int(round(pago_base + recargo, 0)), f"{UMBRAL}h + {horas_extra:.2f}h extra", int(round(pago_base, 0))
+
+def calcular_registro_dia(dia, hora_entrada, hora_salida, recargo, sin_trabajo=False, reglas=None, segmentos=None, tabla=None):
+    """Construye el registro de un día con el mismo formato que muestra la interfaz.
+
+    Si se pasan segmentos (lista de (entrada, salida)) las horas salen de sus
+    tramos fusionados en lugar de hora_entrada y hora_salida. Con tabla (una
+    TablaPagos de las mismas reglas) el pago y los textos se consultan en ella.
+    """
+    if sin_trabajo:
+        minutos_trabajados = 0
+        horas_trabajadas = 0
+        # Forzar recargo a 0 cuando es día sin trabajo
+        recargo = 0
+    else:
+        if segmentos is not None:
+            minutos_trabajados = calcular_minutos_segmentos(segmentos)
+        else:
+            minutos_trabajados = calcular_minutos_trabajados(hora_entrada, hora_salida)
+        horas_trabajadas = minutos_trabajados / 60
+
+    if tabla is not None:
+        return tabla.registro_dia(dia, minutos_trabajados, recargo, sin_trabajo)
+
+    pago_total, descripcion, pago_base = calcular_pago_minutos(minutos_trabajados, recargo, reglas)
+
+    return {
+        'dia': dia,
+        'minutos_trabajados': minutos_trabajados,
+        'horas_formato': formato_horas_minutos(minutos_trabajados),
+        'horas_texto': formato_horas_minutos_texto(minutos_trabajados),
+        'horas_decimal': horas_trabajadas,
+        'pago_base': pago_base,
+        'pago_total': pago_total,
+        'recargo': recargo,
+        'descripcion': descripcion,
+        'sin_trabajo': sin_trabajo
+    }
+
+def calcular_totales_semana(registros_semana):
+    """Retorna (total_semanal, total_minutos_trabajados) de una lista de registros"""
+    total_semanal = sum(registro['pago_total'] for registro in registros_semana)
+    total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in registros_semana)
+    return total_semanal, total_minutos_trabajados
+
+def calcular_semana(turnos, lunes=None, reglas=None, tabla=None, compacto=False):
+    """Calcula una semana completa a partir de turnos tipados.
+
+    Los días sin turno se registran como días sin trabajo. Varios turnos del
+    mismo día son tramos que se fusionan, y se aplica el mayor de sus
+    recargos (el recargo es por día). Si no se indican
+    reglas se usa la versión de tarifas vigente el lunes de la semana; tabla es
+    una TablaPagos opcional de esas reglas. Retorna
+    (registros_semana, horarios_completos, total_semanal), igual que la interfaz.
+
+    Con compacto los registros son RegistroDia (ver registros_compactos) en
+    lugar de dicts: mismas claves y valores, con los textos derivados al leerlos.
+    """
+    turnos = list(turnos)
+    if lunes is None:
+        if not turnos:
+            return [], {}, 0
+        lunes, _ = obtener_rango_semana(turnos[0].fecha)
+    lunes = lunes.date() if isinstance(lunes, datetime.datetime) else lunes
+    if reglas is None:
+        reglas = reglas_para_fecha(lunes)
+
+    turnos_por_dia = {}
+    for turno in turnos:
+        fecha = turno.fecha.date() if isinstance(turno.fecha, datetime.datetime) else turno.fecha
+        indice = (fecha - lunes).days
+        if not 0 <= indice < 7:
+            raise ValueError(f"El turno del {fecha.strftime('%d/%m/%Y')} no pertenece a la semana del {lunes.strftime('%d/%m/%Y')}")
+        turnos_por_dia.setdefault(indice, []).append(turno)
+
+    if compacto:
+        from registros_compactos import RegistroDia
+
+    registros_semana = []
+    horarios_completos = {}
+
+    for i, dia in enumerate(DIAS_SEMANA):
+        trabajados = [turno for turno in turnos_por_dia.get(i, ()) if not turno.sin_trabajo]
+        if not trabajados:
+            if compacto:
+                registro = RegistroDia.calcular(i, None, None, 0, sin_trabajo=True, reglas=reglas, tabla=tabla)
+            else:
+                registro = calcular_registro_dia(dia, datetime.time(0, 0), datetime.time(0, 0), 0, sin_trabajo=True,
+                                                 reglas=reglas, tabla=tabla)
+        else:
+            segmentos = [(turno.entrada, turno.salida) for turno in trabajados]
+            horarios_completos[dia] = horario_desde_segmentos(segmentos)
+            recargo = max(turno.recargo for turno in trabajados)
+            if compacto:
+                registro = RegistroDia.calcular(i, None, None, recargo, reglas=reglas, tabla=tabla, segmentos=segmentos)
+            else:
+                registro = calcular_registro_dia(dia, trabajados[0].entrada, trabajados[0].salida, recargo,
+                                                 reglas=reglas, segmentos=segmentos, tabla=tabla)
+        registros_semana.append(registro)
+
+    total_semanal, _ = calcular_totales_semana(registros_semana)
+    return registros_semana, horarios_completos, total_semanal
+
+
+class SemanaIncremental:
+    """Registros de una semana que solo se recalculan para el día que cambió.
+
+    Cada día guarda la clave (entrada, salida, recargo, sin_trabajo, versión de
+    tarifas, tramos) con la que se calculó; si un rerun llega con la misma clave se
+    reutiliza el registro. Los totales semanales se ajustan por diferencia.
+    """
+
+    def __init__(self):
+        self.claves = [None] * len(DIAS_SEMANA)
+        self.registros = [None] * len(DIAS_SEMANA)
+        self.total_semanal = 0
+        self.total_minutos_trabajados = 0
+        self.recalculos = 0
+
+    def actualizar_dia(self, indice, dia, hora_entrada, hora_salida, recargo, sin_trabajo=False,
+                       version_tarifas=None, reglas=None, segmentos=None):
+        """Retorna el registro del día, recalculándolo solo si cambió alguna entrada.
+
+        Con segmentos (lista de (entrada, salida)) el día se calcula por tramos.
+        """
+        if version_tarifas is None:
+            version_tarifas = huella_reglas_tarifas(reglas)
+        if sin_trabajo:
+            # Las horas y el recargo no influyen en un día sin trabajo
+            clave = (dia, None, None, 0, True, version_tarifas)
+        else:
+            clave = (dia, hora_entrada, hora_salida, recargo, False, version_tarifas,
+                     tuple(segmentos) if segmentos is not None else None)
+
+        if self.claves[indice] == clave:
+            return self.registros[indice]
+
+        registro = calcular_registro_dia(dia, hora_entrada, hora_salida, recargo, sin_trabajo, reglas, segmentos)
+        anterior = self.registros[indice]
+        if anterior is not None:
+            self.total_semanal -= anterior['pago_total']
+            self.total_minutos_trabajados -= anterior['minutos_trabajados']
+        self.total_semanal += registro['pago_total']
+        self.total_minutos_trabajados += registro['minutos_trabajados']
+
+        self.claves[indice] = clave
+        self.registros[indice] = registro
+        self.recalculos += 1
+        return registro
@@ -0,0 +1,58 @@
+"""Cálculo de pagos en bloque con NumPy.
+
+Replica exactamente calcular_pago_minutos (aritmética entera con un solo
+redondeo al par más cercano, igual que redondear_division) sobre arreglos
+de millones de turnos en una sola pasada.
+"""
+import numpy as np
+
+from motor_salario import REGLAS_TARIFAS
+
+MINUTOS_DIA = 24 * 60
+
+
+def calcular_minutos_vectorizado(minutos_entrada, minutos_salida):
+    """Minutos trabajados por turno, cruzando medianoche cuando la salida es menor"""
+    minutos_entrada = np.asarray(minutos_entrada, dtype=np.int64)
+    minutos_salida = np.asarray(minutos_salida, dtype=np.int64)
+
+    minutos_trabajados = minutos_salida - minutos_entrada
+    return np.where(minutos_trabajados < 0, minutos_trabajados + MINUTOS_DIA, minutos_trabajados)
+
+def calcular_pagos_vectorizado(minutos_entrada, minutos_salida, recargos, sin_trabajo=None, reglas=None):
+    """Calcula minutos_trabajados, pago_base y pago_total para arreglos de turnos.
+
+    Los tres arreglos de entrada deben tener la misma longitud. Si se pasa
+    sin_trabajo (arreglo booleano), esos días quedan en cero igual que en la interfaz.
+    Retorna un dict con arreglos int64 bajo las mismas claves que el registro diario.
+    """
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    HORA_NORMAL = reglas['hora_normal']
+    TARIFA_6_HORAS = reglas['tarifa_6_horas']
+    UMBRAL = reglas.get('umbral_horas', 6)
+    MINUTOS_UMBRAL = UMBRAL * 60
+
+    minutos_trabajados = calcular_minutos_vectorizado(minutos_entrada, minutos_salida)
+    recargos = np.asarray(recargos, dtype=np.int64)
+
+    if sin_trabajo is not None:
+        sin_trabajo = np.asarray(sin_trabajo, dtype=bool)
+        minutos_trabajados = np.where(sin_trabajo, 0, minutos_trabajados)
+
+    # Mismas operaciones enteras que la versión escalar: minutos × tarifa / 60 redondeado al par
+    bajo_umbral = minutos_trabajados < MINUTOS_UMBRAL
+    numerador = np.where(bajo_umbral, minutos_trabajados, minutos_trabajados - MINUTOS_UMBRAL) * HORA_NORMAL
+    cociente, resto = np.divmod(numerador, 60)
+    cociente += (2 * resto > 60) | ((2 * resto == 60) & (cociente % 2 == 1))
+    pago_base = np.where(bajo_umbral, cociente, TARIFA_6_HORAS + cociente)
+
+    sin_pago = minutos_trabajados == 0
+    pago_total = np.where(sin_pago, 0, pago_base + recargos).astype(np.int64)
+    pago_base = np.where(sin_pago, 0, pago_base).astype(np.int64)
+
+    return {
+        'minutos_trabajados': minutos_trabajados.astype(np.int64),
+        'pago_base': pago_base,
+        'pago_total': pago_total
+    }
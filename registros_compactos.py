@@ -0,0 +1,197 @@
+"""Registros diarios compactos para cálculos de nómina a gran escala.
+
+RegistroDia guarda solo los enteros de un día (con __slots__) y deriva los
+textos (horas_formato, horas_texto, descripcion) al consultarlos.
+DiasCompactos guarda muchos días como columnas de array para cuando se
+procesan millones de días de empleados.
+
+Ambos aceptan registro['clave'] con las mismas claves que el dict de
+calcular_registro_dia, por lo que renderizar_pdf, el exportador de Sheets y
+el almacén pueden usarlos sin cambios. calcular_semana(..., compacto=True)
+produce RegistroDia, y así calculan las semanas los procesos por lotes
+(importador_horarios, reportes_lote, exportador_archivos).
+
+Cada día guarda la versión de tarifas con la que se calculó, de la que sale
+su descripción; sin reglas se fija la versión vigente al crear el registro,
+de modo que una recarga posterior de las tarifas no cambia los textos.
+"""
+from array import array
+
+from motor_salario import (
+    DIAS_SEMANA,
+    calcular_pago_minutos,
+    calcular_minutos_segmentos,
+    calcular_minutos_trabajados,
+    formato_horas_minutos,
+    formato_horas_minutos_texto,
+)
+from reglas_tarifas import obtener_catalogo
+
+CLAVES_REGISTRO = (
+    'dia', 'minutos_trabajados', 'horas_formato', 'horas_texto', 'horas_decimal',
+    'pago_base', 'pago_total', 'recargo', 'descripcion', 'sin_trabajo'
+)
+
+
+class RegistroDia:
+    """Registro de un día con solo los valores enteros; los textos se derivan al leerlos"""
+
+    __slots__ = ('indice_dia', 'minutos_trabajados', 'pago_base', 'pago_total', 'recargo', 'sin_trabajo', 'reglas')
+
+    def __init__(self, indice_dia, minutos_trabajados, pago_base, pago_total, recargo, sin_trabajo, reglas=None):
+        self.indice_dia = indice_dia
+        self.minutos_trabajados = minutos_trabajados
+        self.pago_base = pago_base
+        self.pago_total = pago_total
+        self.recargo = recargo
+        self.sin_trabajo = sin_trabajo
+        self.reglas = reglas if reglas is not None else obtener_catalogo().vigente()
+
+    @classmethod
+    def calcular(cls, indice_dia, hora_entrada, hora_salida, recargo, sin_trabajo=False, reglas=None, tabla=None, segmentos=None):
+        """Calcula el día con las mismas reglas que calcular_registro_dia (tabla: una TablaPagos de reglas)"""
+        if reglas is None:
+            reglas = tabla.reglas if tabla is not None else obtener_catalogo().vigente()
+        if sin_trabajo:
+            return cls(indice_dia, 0, 0, 0, 0, True, reglas)
+        if segmentos is not None:
+            minutos_trabajados = calcular_minutos_segmentos(segmentos)
+        else:
+            minutos_trabajados = calcular_minutos_trabajados(hora_entrada, hora_salida)
+        if tabla is not None:
+            pago_total, _, pago_base = tabla.pago(minutos_trabajados, recargo)
+        else:
+            pago_total, _, pago_base = calcular_pago_minutos(minutos_trabajados, recargo, reglas)
+        return cls(indice_dia, minutos_trabajados, pago_base, pago_total, recargo, False, reglas)
+
+    @classmethod
+    def desde_registro(cls, registro, reglas=None):
+        """Convierte un registro dict de calcular_registro_dia calculado con reglas (por defecto, las vigentes)"""
+        return cls(
+            DIAS_SEMANA.index(registro['dia']),
+            registro['minutos_trabajados'],
+            registro['pago_base'],
+            registro['pago_total'],
+            registro['recargo'],
+            registro['sin_trabajo'],
+            reglas
+        )
+
+    @property
+    def dia(self):
+        return DIAS_SEMANA[self.indice_dia]
+
+    @property
+    def horas_decimal(self):
+        return 0 if self.sin_trabajo else self.minutos_trabajados / 60
+
+    @property
+    def horas_formato(self):
+        return formato_horas_minutos(self.minutos_trabajados)
+
+    @property
+    def horas_texto(self):
+        return formato_horas_minutos_texto(self.minutos_trabajados)
+
+    @property
+    def descripcion(self):
+        return calcular_pago_minutos(0 if self.sin_trabajo else self.minutos_trabajados, self.recargo, self.reglas)[1]
+
+    def __getitem__(self, clave):
+        if clave not in CLAVES_REGISTRO:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def get(self, clave, defecto=None):
+        return getattr(self, clave) if clave in CLAVES_REGISTRO else defecto
+
+    def a_dict(self):
+        """Registro en el formato dict de calcular_registro_dia"""
+        return {clave: getattr(self, clave) for clave in CLAVES_REGISTRO}
+
+    def __eq__(self, otro):
+        if not isinstance(otro, RegistroDia):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(otro, campo) for campo in self.__slots__)
+
+    def __repr__(self):
+        return (f"RegistroDia({self.dia}, {self.minutos_trabajados} min, "
+                f"base={self.pago_base}, total={self.pago_total}, recargo={self.recargo})")
+
+
+class DiasCompactos:
+    """Columnas de enteros (struct-of-arrays) para muchos días de empleados.
+
+    Cada día ocupa 18 bytes: minutos (2), pago base (4), pago total (4),
+    recargo (4), día de la semana (1), sin trabajo (1) y versión de tarifas
+    (2, índice en versiones). El índice i retorna un RegistroDia con las
+    reglas de su versión.
+    """
+
+    def __init__(self):
+        self.minutos_trabajados = array('H')
+        self.pago_base = array('i')
+        self.pago_total = array('i')
+        self.recargo = array('i')
+        self.indice_dia = array('B')
+        self.sin_trabajo = array('B')
+        self.indice_version = array('H')
+        self.versiones = []
+        self._por_version = {}
+
+    def __len__(self):
+        return len(self.minutos_trabajados)
+
+    def _indice_de_version(self, reglas):
+        if reglas is None:
+            reglas = obtener_catalogo().vigente()
+        # Una misma versión puede cambiar de contenido con una recarga: se compara entera
+        for indice in self._por_version.get(reglas['version'], ()):
+            version = self.versiones[indice]
+            if version is reglas or version == reglas:
+                return indice
+        self.versiones.append(reglas)
+        self._por_version.setdefault(reglas['version'], []).append(len(self.versiones) - 1)
+        return len(self.versiones) - 1
+
+    def agregar(self, indice_dia, minutos_trabajados, pago_base, pago_total, recargo, sin_trabajo, reglas=None):
+        """Agrega un día ya calculado con reglas (por defecto, las vigentes)"""
+        self.indice_dia.append(indice_dia)
+        self.minutos_trabajados.append(minutos_trabajados)
+        self.pago_base.append(pago_base)
+        self.pago_total.append(pago_total)
+        self.recargo.append(recargo)
+        self.sin_trabajo.append(1 if sin_trabajo else 0)
+        self.indice_version.append(self._indice_de_version(reglas))
+
+    def agregar_registro(self, registro, reglas=None):
+        """Agrega un RegistroDia (con su versión) o un registro dict calculado con reglas"""
+        if not isinstance(registro, RegistroDia):
+            registro = RegistroDia.desde_registro(registro, reglas)
+        self.agregar(registro.indice_dia, registro.minutos_trabajados, registro.pago_base,
+                     registro.pago_total, registro.recargo, registro.sin_trabajo, registro.reglas)
+
+    def __getitem__(self, i):
+        return RegistroDia(
+            self.indice_dia[i],
+            self.minutos_trabajados[i],
+            self.pago_base[i],
+            self.pago_total[i],
+            self.recargo[i],
+            bool(self.sin_trabajo[i]),
+            self.versiones[self.indice_version[i]]
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def semana(self, inicio):
+        """Los siete registros de la semana que empieza en la posición inicio"""
+        return [self[i] for i in range(inicio, inicio + len(DIAS_SEMANA))]
+
+    def total_pagado(self):
+        return sum(self.pago_total)
+
+    def total_minutos(self):
+        return sum(self.minutos_trabajados)
@@ -0,0 +1,169 @@
+"""Catálogo versionado de reglas y tarifas con fechas de vigencia.
+
+Las versiones se leen de un archivo JSON (por defecto reglas_tarifas.json junto
+a este módulo, o la ruta de la variable REGLAS_TARIFAS_ARCHIVO):
+
+    {"versiones": [
+        {"version": "2025-01", "vigente_desde": "2025-01-01",
+         "hora_normal": 15500, "tarifa_6_horas": 100000, "umbral_horas": 6,
+         "recargos_disponibles": {"Ninguno": 0, "$5,000": 5000}}
+    ]}
+
+Cada versión se normaliza una sola vez al cargar (tipos, textos de las
+reglas) al mismo formato de REGLAS_TARIFAS, y se indexa por fecha de vigencia
+para encontrar con búsqueda binaria la versión que aplica a cualquier semana.
+
+Un archivo ilegible o con una versión inválida (por ejemplo, a medio escribir)
+no reemplaza al catálogo cargado: se registra una advertencia, se conserva el
+último índice válido y se vuelve a intentar cuando el archivo cambie otra vez.
+"""
+import bisect
+import datetime
+import json
+import logging
+import os
+import threading
+
+_log = logging.getLogger(__name__)
+
+ARCHIVO_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reglas_tarifas.json')
+
+# Tarifas originales, usadas si no existe el archivo de reglas
+VERSION_POR_DEFECTO = {
+    "version": "1",
+    "vigente_desde": "2024-01-01",
+    "hora_normal": 15500,
+    "tarifa_6_horas": 100000,
+    "umbral_horas": 6,
+    "recargos_disponibles": {
+        "Ninguno": 0,
+        "$5,000": 5000,
+        "$10,000": 10000,
+        "$15,000": 15000,
+        "$20,000": 20000,
+        "$25,000": 25000,
+        "$40,000": 40000
+    }
+}
+
+
+def generar_descripciones(hora_normal, tarifa_umbral, umbral_horas):
+    """Textos de las reglas de cálculo a partir de las tarifas"""
+    return {
+        "menos_6_horas": f"Menos de {umbral_horas} horas: Horas trabajadas × ${hora_normal:,.0f}",
+        "exacto_6_horas": f"Exactamente {umbral_horas} horas: ${tarifa_umbral:,.0f} fijos",
+        "mas_6_horas": f"Más de {umbral_horas} horas: ${tarifa_umbral:,.0f} + (horas extra × ${hora_normal:,.0f})",
+        "recargos": "Recargos: Se suman al pago base según corresponda"
+    }
+
+def normalizar_version(datos):
+    """Valida una versión del archivo y la convierte al formato de REGLAS_TARIFAS"""
+    faltantes = [clave for clave in ('version', 'vigente_desde', 'hora_normal', 'tarifa_6_horas', 'recargos_disponibles')
+                 if clave not in datos]
+    if faltantes:
+        raise ValueError(f"Versión de tarifas incompleta, faltan: {', '.join(faltantes)}")
+
+    hora_normal = int(datos['hora_normal'])
+    tarifa_umbral = int(datos['tarifa_6_horas'])
+    umbral_horas = int(datos.get('umbral_horas', 6))
+    return {
+        "version": str(datos['version']),
+        "vigente_desde": datetime.date.fromisoformat(str(datos['vigente_desde'])).isoformat(),
+        "hora_normal": hora_normal,
+        "tarifa_6_horas": tarifa_umbral,
+        "umbral_horas": umbral_horas,
+        "recargos_disponibles": {str(nombre): int(valor) for nombre, valor in datos['recargos_disponibles'].items()},
+        "descripciones": dict(datos.get('descripciones') or generar_descripciones(hora_normal, tarifa_umbral, umbral_horas))
+    }
+
+
+class CatalogoTarifas:
+    """Versiones de tarifas ordenadas por vigencia, recargables desde archivo"""
+
+    def __init__(self, versiones, ruta=None):
+        self.ruta = ruta
+        self._firma_archivo = None
+        # Última falla al leer el archivo, o None si la última lectura fue válida
+        self.error_carga = None
+        self._lock = threading.Lock()
+        self._indexar(versiones)
+
+    @classmethod
+    def desde_archivo(cls, ruta=ARCHIVO_POR_DEFECTO):
+        """Carga el catálogo; si el archivo no existe usa VERSION_POR_DEFECTO"""
+        catalogo = cls([VERSION_POR_DEFECTO], ruta=ruta)
+        catalogo.recargar_si_cambio()
+        return catalogo
+
+    def _indexar(self, versiones):
+        normalizadas = sorted((normalizar_version(datos) for datos in versiones), key=lambda v: v['vigente_desde'])
+        if not normalizadas:
+            raise ValueError("El catálogo de tarifas no tiene versiones")
+        fechas = [datetime.date.fromisoformat(version['vigente_desde']) for version in normalizadas]
+        if len(set(fechas)) != len(fechas):
+            raise ValueError("Hay dos versiones de tarifas con la misma fecha de vigencia")
+        # Reemplazo atómico: los lectores ven el índice anterior o el nuevo completo
+        self._indice = (fechas, normalizadas)
+
+    def _firma(self):
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def recargar_si_cambio(self):
+        """Vuelve a leer el archivo si cambió desde la última carga; retorna True si recargó.
+
+        Si el archivo no se puede leer o validar se conservan las versiones
+        cargadas, se guarda el error en error_carga y se retorna False.
+        """
+        if self.ruta is None:
+            return False
+        firma = self._firma()
+        if firma is None or firma == self._firma_archivo:
+            return False
+        with self._lock:
+            if firma == self._firma_archivo:
+                return False
+            # Con la firma registrada, un archivo inválido se reintenta solo al volver a cambiar
+            self._firma_archivo = firma
+            try:
+                with open(self.ruta, encoding='utf-8') as archivo:
+                    datos = json.load(archivo)
+                self._indexar(datos['versiones'])
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                self.error_carga = f"{type(e).__name__}: {e}"
+                _log.warning("No se pudo cargar %s, se conservan las tarifas anteriores: %s", self.ruta, self.error_carga)
+                return False
+            self.error_carga = None
+            return True
+
+    @property
+    def versiones(self):
+        return list(self._indice[1])
+
+    def version_para(self, fecha):
+        """Versión vigente en la fecha; antes de la primera vigencia se usa la más antigua"""
+        if isinstance(fecha, datetime.datetime):
+            fecha = fecha.date()
+        fechas, versiones = self._indice
+        posicion = bisect.bisect_right(fechas, fecha) - 1
+        return versiones[max(posicion, 0)]
+
+    def vigente(self):
+        """Versión que aplica hoy"""
+        return self.version_para(datetime.date.today())
+
+
+_catalogo = None
+_catalogo_lock = threading.Lock()
+
+def obtener_catalogo():
+    """Catálogo del proceso, cargado una vez desde REGLAS_TARIFAS_ARCHIVO o el archivo por defecto"""
+    global _catalogo
+    if _catalogo is None:
+        with _catalogo_lock:
+            if _catalogo is None:
+                _catalogo = CatalogoTarifas.desde_archivo(os.environ.get('REGLAS_TARIFAS_ARCHIVO', ARCHIVO_POR_DEFECTO))
+    return _catalogo
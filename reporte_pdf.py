@@ -0,0 +1,349 @@
+"""Generación del reporte semanal en PDF sin dependencias de interfaz.
+
+Las funciones de este módulo lanzan excepciones en lugar de mostrarlas con
+Streamlit, para poder usarse desde procesos por lotes. renderizar_pdf genera
+el reporte de una semana; renderizar_pdf_combinado, un solo documento con
+muchas semanas de muchos empleados.
+"""
+import datetime
+import hashlib
+import importlib.util
+import json
+import unicodedata
+from datetime import timedelta
+
+from metricas import contar, medido
+from motor_salario import REGLAS_TARIFAS, formato_horas_minutos_texto, huella_reglas_tarifas, reglas_para_fecha
+
+# Manejo de importaciones: se comprueba que fpdf2 esté instalado sin importarlo;
+# la importación (cerca de medio segundo) ocurre al generar el primer PDF
+PDF_AVAILABLE = importlib.util.find_spec('fpdf') is not None
+
+# Letras sin descomposición Unicode que las fuentes estándar (Latin-1) no incluyen
+_TRANSLITERACIONES = str.maketrans({
+    'Ł': 'L', 'ł': 'l', 'Đ': 'D', 'đ': 'd', 'Ħ': 'H', 'ħ': 'h', 'ı': 'i',
+    'Œ': 'OE', 'œ': 'oe', 'ŀ': 'l', 'Ŀ': 'L', 'ŉ': "'n", 'ſ': 's'
+})
+
+
+def obtener_nombre_pdf(lunes_semana, domingo_semana):
+    """Genera el nombre del PDF con el formato solicitado"""
+    return f"Salary_sem_{lunes_semana.strftime('%d_%m_%y')}_to_{domingo_semana.strftime('%d_%m_%y')}.pdf"
+
+def huella_reporte(registros_semana, total_semanal, horarios_completos, lunes_semana):
+    """Hash de todo lo que determina el contenido del reporte: datos de la semana y versión de tarifas"""
+    contenido = json.dumps(
+        [
+            [dict(registro) if isinstance(registro, dict) else registro.a_dict() for registro in registros_semana],
+            total_semanal,
+            horarios_completos,
+            lunes_semana.strftime('%Y-%m-%d'),
+            huella_reglas_tarifas(reglas_para_fecha(lunes_semana))
+        ],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+def texto_latin1(texto):
+    """Adapta un texto a Latin-1, lo único que cubren las fuentes estándar del PDF (Arial/Helvetica).
+
+    Las letras con diacríticos fuera de Latin-1 pierden el diacrítico
+    ("Łukasz Dvořák" -> "Lukasz Dvorák"); lo que no tiene equivalente se
+    reemplaza por '?'.
+    """
+    texto = str(texto)
+    try:
+        texto.encode('latin-1')
+        return texto
+    except UnicodeEncodeError:
+        pass
+    resultado = []
+    for caracter in texto.translate(_TRANSLITERACIONES):
+        try:
+            caracter.encode('latin-1')
+            resultado.append(caracter)
+        except UnicodeEncodeError:
+            descompuesto = unicodedata.normalize('NFKD', caracter)
+            base = ''.join(c for c in descompuesto if not unicodedata.combining(c)).encode('latin-1', 'replace')
+            resultado.append(base.decode('latin-1') or '?')
+    return ''.join(resultado)
+
+def formato_hora_12h(hora):
+    """Formatea una hora en formato 12h AM/PM sin cero inicial"""
+    return hora.strftime('%I:%M %p').lstrip('0')
+
+def escribir_encabezado(pdf, lunes_semana, domingo_semana, fecha_generacion):
+    """Escribe el título, el rango de la semana y la fecha de generación"""
+    # Título con rango de fechas
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'REPORTE DE SALARIO SEMANAL', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(2)
+
+    # Rango de fechas de la semana
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, f'Semana: {lunes_semana.strftime("%d/%m/%Y")} - {domingo_semana.strftime("%d/%m/%Y")}', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(2)
+
+    # Fecha y hora de generación
+    pdf.set_font('Arial', 'I', 10)
+    pdf.cell(0, 10, f'Generado el: {fecha_generacion.strftime("%d/%m/%Y a las %H:%M")}', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(10)
+
+def escribir_reglas_tarifas(pdf, reglas=None):
+    """Escribe las secciones de reglas, tarifas y recargos disponibles (por defecto, REGLAS_TARIFAS)"""
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 10, 'REGLAS Y TARIFAS APLICADAS:', new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(5)
+
+    # Tarifas
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, 'TARIFAS:', new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(0, 6, f"- Hora normal: ${reglas['hora_normal']:,.0f}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 6, f"- {reglas.get('umbral_horas', 6)} horas completas: ${reglas['tarifa_6_horas']:,.0f}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 6, f"- Horas extra: ${reglas['hora_normal']:,.0f} c/u", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(5)
+
+    # Reglas
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, 'REGLAS DE CALCULO:', new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font('Arial', '', 10)
+    textos_reglas = [
+        reglas['descripciones']['menos_6_horas'],
+        reglas['descripciones']['exacto_6_horas'],
+        reglas['descripciones']['mas_6_horas'],
+        reglas['descripciones']['recargos']
+    ]
+
+    for regla in textos_reglas:
+        pdf.cell(0, 6, regla, new_x="LMARGIN", new_y="NEXT")
+
+    # Recargos
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, 'RECARGOS DISPONIBLES:', new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font('Arial', '', 10)
+    recargos_texto = ", ".join(reglas['recargos_disponibles'].keys())
+    pdf.cell(0, 6, recargos_texto, new_x="LMARGIN", new_y="NEXT")
+
+    pdf.ln(10)
+
+def escribir_detalle_semana(pdf, registros_semana, total_semanal, horarios_completos, lunes_semana):
+    """Escribe la tabla por día, los totales y el análisis detallado"""
+    # Tabla de datos
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 10, 'DETALLE POR DIA:', new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(5)
+
+    # Encabezados de tabla
+    pdf.set_font('Arial', 'B', 9)
+    pdf.cell(25, 10, 'DIA', border=1, align='C')
+    pdf.cell(25, 10, 'FECHA', border=1, align='C')
+    pdf.cell(20, 10, 'ENTRADA', border=1, align='C')
+    pdf.cell(20, 10, 'SALIDA', border=1, align='C')
+    pdf.cell(20, 10, 'HORAS', border=1, align='C')
+    pdf.cell(30, 10, 'PAGO BASE', border=1, align='C')
+    pdf.cell(25, 10, 'RECARGO', border=1, align='C')
+    pdf.cell(35, 10, 'TOTAL DIA', border=1, new_x="LMARGIN", new_y="NEXT", align='C')
+
+    # Datos de la tabla
+    pdf.set_font('Arial', '', 9)
+
+    for i, registro in enumerate(registros_semana):
+        # Calcular fecha específica para cada día
+        fecha_dia = lunes_semana + timedelta(days=i)
+        fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
+
+        dia = registro['dia']
+        if dia in horarios_completos and not registro['sin_trabajo']:
+            # Formatear hora en formato 12h AM/PM para el PDF
+            entrada_str = formato_hora_12h(horarios_completos[dia]['entrada'])
+            salida_str = formato_hora_12h(horarios_completos[dia]['salida'])
+        else:
+            entrada_str = "---"
+            salida_str = "---"
+
+        pdf.cell(25, 10, registro['dia'][:7], border=1, align='C')
+        pdf.cell(25, 10, fecha_dia_str, border=1, align='C')
+        pdf.cell(20, 10, entrada_str, border=1, align='C')
+        pdf.cell(20, 10, salida_str, border=1, align='C')
+        pdf.cell(20, 10, registro['horas_formato'], border=1, align='C')  # Usar formato hh:mm
+        pdf.cell(30, 10, f"${registro['pago_base']:,.0f}", border=1, align='C')
+        pdf.cell(25, 10, f"${registro['recargo']:,.0f}", border=1, align='C')
+        pdf.cell(35, 10, f"${registro['pago_total']:,.0f}", border=1, new_x="LMARGIN", new_y="NEXT", align='C')
+
+    pdf.ln(10)
+
+    # CALCULAR TOTAL DE HORAS TRABAJADAS EN MINUTOS
+    total_minutos_trabajados = sum(registro['minutos_trabajados'] for registro in registros_semana)
+    total_horas_texto = formato_horas_minutos_texto(total_minutos_trabajados)
+
+    # Totales
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, f'TOTAL SEMANAL: ${total_semanal:,.0f} COP', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(0, 10, f'TOTAL HORAS TRABAJADAS: {total_horas_texto}', new_x="LMARGIN", new_y="NEXT", align='C')
+
+    # Análisis detallado
+    pdf.ln(10)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'ANALISIS DETALLADO:', new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font('Arial', '', 10)
+
+    for i, registro in enumerate(registros_semana, 1):
+        fecha_dia = lunes_semana + timedelta(days=i-1)
+        fecha_dia_str = fecha_dia.strftime('%d/%m/%Y')
+
+        dia = registro['dia']
+        if dia in horarios_completos and not registro['sin_trabajo']:
+            # Turno partido: listar cada tramo
+            tramos = horarios_completos[dia].get('segmentos') or [horarios_completos[dia]]
+            horario_info = " (" + ", ".join(
+                f"{formato_hora_12h(tramo['entrada'])} - {formato_hora_12h(tramo['salida'])}" for tramo in tramos
+            ) + ")"
+        else:
+            horario_info = ""
+
+        pdf.cell(0, 8, f"{i}. {registro['dia']} ({fecha_dia_str}): {registro['descripcion']}{horario_info}", new_x="LMARGIN", new_y="NEXT")
+        if registro['recargo'] > 0:
+            pdf.cell(0, 8, f"   + Recargo aplicado: ${registro['recargo']:,.0f}", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+@medido('renderizar_pdf')
+def renderizar_pdf(registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana, fecha_generacion=None, reglas=None):
+    """Genera los bytes del reporte semanal; lanza RuntimeError si fpdf2 no está instalado.
+
+    Las reglas impresas son las de la versión de tarifas vigente el lunes de
+    la semana, salvo que se indiquen otras.
+    """
+    if not PDF_AVAILABLE:
+        raise RuntimeError("Se requiere fpdf2 para generar reportes PDF")
+    from fpdf import FPDF
+
+    if fecha_generacion is None:
+        fecha_generacion = datetime.datetime.now()
+    if reglas is None:
+        reglas = reglas_para_fecha(lunes_semana)
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    escribir_encabezado(pdf, lunes_semana, domingo_semana, fecha_generacion)
+    escribir_reglas_tarifas(pdf, reglas)
+    escribir_detalle_semana(pdf, registros_semana, total_semanal, horarios_completos, lunes_semana)
+
+    # pdf.output() ya retorna bytes, no necesita encode
+    pdf_bytes = pdf.output()
+    contar('pdf_generados')
+    contar('pdf_bytes', len(pdf_bytes))
+    return pdf_bytes
+
+def escribir_indice(pdf, secciones):
+    """Escribe la tabla de contenido con enlaces a cada sección (para insert_toc_placeholder)"""
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'CONTENIDO', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(5)
+    for seccion in secciones:
+        sangria = 8 * seccion.level
+        pdf.set_font('Arial', 'B' if seccion.level == 0 else '', 10)
+        pdf.set_x(pdf.l_margin + sangria)
+        enlace = pdf.add_link(page=seccion.page_number)
+        pdf.cell(pdf.epw - sangria - 20, 7, seccion.name, link=enlace)
+        pdf.cell(20, 7, str(seccion.page_number), link=enlace, new_x="LMARGIN", new_y="NEXT", align='R')
+
+def escribir_encabezado_combinado(pdf, semanas_totales, fecha_generacion):
+    """Portada del reporte combinado"""
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'REPORTE DE SALARIOS CONSOLIDADO', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(2)
+    pdf.set_font('Arial', 'I', 10)
+    pdf.cell(0, 10, f'Generado el: {fecha_generacion.strftime("%d/%m/%Y a las %H:%M")}', new_x="LMARGIN", new_y="NEXT", align='C')
+    if semanas_totales is not None:
+        pdf.cell(0, 10, f'Semanas incluidas: {semanas_totales}', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(5)
+
+def escribir_encabezado_semana(pdf, empleado, lunes_semana, domingo_semana, version_tarifas):
+    """Título de una semana dentro del reporte combinado"""
+    pdf.set_font('Arial', 'B', 14)
+    titulo = f'Semana: {lunes_semana.strftime("%d/%m/%Y")} - {domingo_semana.strftime("%d/%m/%Y")}'
+    pdf.cell(0, 10, f'{texto_latin1(empleado)} - {titulo}' if empleado else titulo, new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.set_font('Arial', 'I', 10)
+    pdf.cell(0, 8, f'Tarifas: version {version_tarifas} (ver reglas al inicio)', new_x="LMARGIN", new_y="NEXT", align='C')
+    pdf.ln(5)
+
+def escribir_semana_fallida(pdf, error):
+    """Deja constancia en el reporte combinado de una semana que no se pudo escribir"""
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.multi_cell(0, 8, texto_latin1(f'No se pudo generar esta semana: {type(error).__name__}: {error}'),
+                   new_x="LMARGIN", new_y="NEXT")
+
+@medido('renderizar_pdf_combinado')
+def renderizar_pdf_combinado(semanas, destino, fecha_generacion=None, semanas_totales=None, al_fallar=None):
+    """Escribe en destino (ruta o archivo binario) un PDF con muchas semanas; retorna la cantidad de semanas.
+
+    semanas: iterable de (empleado, registros_semana, total_semanal,
+    horarios_completos, lunes_semana, domingo_semana), consumido una vez y en
+    orden; conviene agruparlo por empleado. Las reglas de cada versión de
+    tarifas se escriben una sola vez, antes de la primera semana que la usa,
+    y cada semana empieza en una página nueva. Tras la portada va una tabla
+    de contenido por empleado y semana, con enlaces.
+
+    fpdf2 mantiene el documento en memoria hasta escribirlo (los números de
+    página del índice se conocen al final), por lo que la memoria crece con
+    la cantidad de páginas; las semanas de entrada no se retienen.
+
+    Los nombres de empleado se adaptan a Latin-1 (ver texto_latin1). Si se
+    indica al_fallar, una semana que no se puede escribir no detiene el
+    documento: en su página queda una nota, se llama a
+    al_fallar(empleado, lunes_semana, error) y no cuenta en el total.
+    """
+    if not PDF_AVAILABLE:
+        raise RuntimeError("Se requiere fpdf2 para generar reportes PDF")
+    from fpdf import FPDF
+
+    if fecha_generacion is None:
+        fecha_generacion = datetime.datetime.now()
+
+    pdf = FPDF()
+    pdf.add_page()
+    escribir_encabezado_combinado(pdf, semanas_totales, fecha_generacion)
+    pdf.insert_toc_placeholder(escribir_indice, allow_extra_pages=True)
+
+    versiones_escritas = set()
+    empleado_actual = None
+    cantidad = 0
+    for empleado, registros_semana, total_semanal, horarios_completos, lunes_semana, domingo_semana in semanas:
+        reglas = reglas_para_fecha(lunes_semana)
+        if reglas['version'] not in versiones_escritas:
+            versiones_escritas.add(reglas['version'])
+            pdf.add_page()
+            pdf.start_section(f"Reglas y tarifas (version {reglas['version']}, desde {reglas['vigente_desde']})")
+            escribir_reglas_tarifas(pdf, reglas)
+
+        pdf.add_page()
+        if empleado != empleado_actual:
+            empleado_actual = empleado
+            if empleado:
+                pdf.start_section(texto_latin1(empleado))
+        pdf.start_section(
+            f'Semana {lunes_semana.strftime("%d/%m/%Y")} - {domingo_semana.strftime("%d/%m/%Y")}',
+            level=1 if empleado else 0
+        )
+        try:
+            escribir_encabezado_semana(pdf, empleado, lunes_semana, domingo_semana, reglas['version'])
+            escribir_detalle_semana(pdf, registros_semana, total_semanal, horarios_completos, lunes_semana)
+        except Exception as e:
+            if al_fallar is None:
+                raise
+            escribir_semana_fallida(pdf, e)
+            al_fallar(empleado, lunes_semana, e)
+            continue
+        cantidad += 1
+
+    pdf.output(destino)
+    contar('pdf_combinados')
+    contar('pdf_combinados_semanas', cantidad)
+    return cantidad
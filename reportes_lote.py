@@ -0,0 +1,225 @@
+"""Generación en paralelo de reportes PDF semanales para toda la empresa.
+
+Cada semana se renderiza en un proceso del pool y se escribe con el nombre de
+obtener_nombre_pdf dentro del directorio de salida (una carpeta por empleado).
+Un error en un reporte, o una fila del archivo que no se puede leer, se
+registra en su resultado sin detener el lote.
+Con --combinado, todas las semanas van a un solo PDF con índice (ver
+generar_reporte_combinado).
+
+Uso:
+    python reportes_lote.py horarios.csv --directorio reportes --trabajadores 4
+    python reportes_lote.py horarios.csv --combinado nomina.pdf
+"""
+import argparse
+import concurrent.futures
+import datetime
+import hashlib
+import os
+import re
+import sys
+
+from motor_salario import calcular_semana
+from reporte_pdf import obtener_nombre_pdf, renderizar_pdf, renderizar_pdf_combinado
+
+_PATRON_NO_PERMITIDO = re.compile(r'[^\w.-]+')
+
+
+def nombre_directorio_empleado(empleado):
+    """Nombre de carpeta seguro para un empleado: solo letras, dígitos, '_', '-' y '.' internos.
+
+    Si hubo que cambiar el nombre se agrega un sufijo con su hash, para que
+    dos empleados distintos no compartan carpeta.
+    """
+    nombre = _PATRON_NO_PERMITIDO.sub('_', empleado).strip('.')
+    if nombre == empleado:
+        return nombre
+    sufijo = hashlib.sha256(empleado.encode('utf-8')).hexdigest()[:8]
+    return f"{nombre or 'empleado'}-{sufijo}"
+
+def resultado_fila_invalida(numero_fila, empleado, lunes, error):
+    """Resultado de error, con la forma de los de _renderizar_reporte, para una fila que no se pudo leer"""
+    semana = f" (semana del {lunes.strftime('%d/%m/%Y')})" if lunes is not None else ""
+    return {'empleado': empleado, 'archivo': None, 'bytes': 0, 'error': f"Fila {numero_fila}{semana}: {error}"}
+
+def resultado_semana_fallida(archivo, empleado, lunes, error):
+    """Resultado de error, con la misma forma, para una semana que no entró al reporte combinado"""
+    return {
+        'empleado': empleado, 'archivo': archivo, 'bytes': 0,
+        'error': f"Semana del {lunes.strftime('%d/%m/%Y')}: {type(error).__name__}: {error}"
+    }
+
+def _renderizar_reporte(trabajo):
+    """Renderiza y escribe un reporte; se ejecuta dentro de un proceso del pool"""
+    empleado = trabajo.get('empleado')
+    directorio = trabajo['directorio']
+    if empleado:
+        directorio = os.path.join(directorio, nombre_directorio_empleado(empleado))
+
+    ruta = None
+    try:
+        if 'registros_semana' not in trabajo:
+            trabajo = preparar_trabajo(empleado, trabajo['lunes'], trabajo['turnos'], trabajo['directorio'])
+        lunes = trabajo['lunes']
+        domingo = trabajo['domingo']
+        ruta = os.path.join(directorio, obtener_nombre_pdf(lunes, domingo))
+
+        pdf_bytes = renderizar_pdf(
+            trabajo['registros_semana'],
+            trabajo['total_semanal'],
+            trabajo['horarios_completos'],
+            lunes,
+            domingo
+        )
+        os.makedirs(directorio, exist_ok=True)
+        with open(ruta, 'wb') as archivo:
+            archivo.write(pdf_bytes)
+        return {'empleado': empleado, 'archivo': ruta, 'bytes': len(pdf_bytes), 'error': None}
+    except Exception as e:
+        return {'empleado': empleado, 'archivo': ruta, 'bytes': 0, 'error': f"{type(e).__name__}: {e}"}
+
+def preparar_trabajo(empleado, lunes, turnos, directorio):
+    """Calcula la semana de un empleado y arma el trabajo de renderizado"""
+    registros_semana, horarios_completos, total_semanal = calcular_semana(turnos, lunes, compacto=True)
+    lunes = datetime.datetime.combine(lunes, datetime.time())
+    return {
+        'empleado': empleado,
+        'registros_semana': registros_semana,
+        'total_semanal': total_semanal,
+        'horarios_completos': horarios_completos,
+        'lunes': lunes,
+        'domingo': lunes + datetime.timedelta(days=6),
+        'directorio': directorio
+    }
+
+def generar_reportes_lote(trabajos, trabajadores=None, progreso=None, max_pendientes=None):
+    """Renderiza los trabajos en un pool de procesos y retorna la lista de resultados.
+
+    Cada trabajo trae la semana ya calculada (ver preparar_trabajo) o solo
+    'lunes' y 'turnos' para calcularla en el proceso. trabajos puede ser un
+    generador: solo se mantienen max_pendientes trabajos en vuelo (por defecto
+    cuatro por proceso). progreso, si se indica, se llama con
+    (completados, resultado) cada vez que termina un reporte.
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    max_pendientes = max_pendientes or trabajadores * 4
+    resultados = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=trabajadores) as executor:
+        pendientes = set()
+
+        def recoger():
+            listos, restantes = concurrent.futures.wait(pendientes, return_when=concurrent.futures.FIRST_COMPLETED)
+            for futuro in listos:
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    # Fallo del proceso (por ejemplo, datos no serializables)
+                    resultado = {'empleado': None, 'archivo': None, 'bytes': 0, 'error': f"{type(e).__name__}: {e}"}
+                resultados.append(resultado)
+                if progreso:
+                    progreso(len(resultados), resultado)
+            return restantes
+
+        for trabajo in trabajos:
+            pendientes.add(executor.submit(_renderizar_reporte, trabajo))
+            if len(pendientes) >= max_pendientes:
+                pendientes = recoger()
+
+        while pendientes:
+            pendientes = recoger()
+
+    return resultados
+
+def generar_reporte_combinado(semanas, destino, fecha_generacion=None, semanas_totales=None, al_fallar=None):
+    """Calcula las semanas (empleado, lunes, turnos) a medida que se escriben en un solo PDF.
+
+    Retorna la cantidad de semanas escritas. Cada semana usa la versión de
+    tarifas vigente en su lunes. Con al_fallar, una semana que no se puede
+    calcular o escribir se informa con al_fallar(empleado, lunes, error) y
+    el documento sigue (ver renderizar_pdf_combinado).
+    """
+    from motor_salario import reglas_para_fecha
+    from tabla_pagos import obtener_tabla
+
+    def semanas_calculadas():
+        for empleado, lunes, turnos in semanas:
+            try:
+                reglas = reglas_para_fecha(lunes)
+                registros_semana, horarios_completos, total_semanal = calcular_semana(
+                    turnos, lunes, reglas, obtener_tabla(reglas), compacto=True
+                )
+            except Exception as e:
+                if al_fallar is None:
+                    raise
+                al_fallar(empleado, lunes, e)
+                continue
+            lunes = datetime.datetime.combine(lunes, datetime.time())
+            yield empleado, registros_semana, total_semanal, horarios_completos, lunes, lunes + datetime.timedelta(days=6)
+
+    return renderizar_pdf_combinado(semanas_calculadas(), destino, fecha_generacion, semanas_totales, al_fallar)
+
+def main(argv=None):
+    from importador_horarios import agrupar_semanas, leer_filas
+    from atribucion_turnos import CORTES, CORTE_SEMANA
+
+    parser = argparse.ArgumentParser(description="Genera en paralelo los reportes PDF semanales de todos los empleados")
+    parser.add_argument('archivo', help="Archivo CSV o Parquet con employee, date, entrada, salida, recargo")
+    parser.add_argument('--directorio', default='reportes', help="Directorio de salida de los PDF")
+    parser.add_argument('--trabajadores', type=int, default=None, help="Cantidad de procesos (por defecto, núcleos disponibles)")
+    parser.add_argument('--ordenado', action='store_true',
+                        help="El archivo está ordenado por fecha: emite cada semana al cerrarse "
+                             "(necesario para que la memoria no crezca con el archivo)")
+    parser.add_argument('--corte', choices=CORTES, default=CORTE_SEMANA,
+                        help="Dónde dividir los turnos que cruzan medianoche (por defecto, entre semanas)")
+    parser.add_argument('--combinado', metavar='ARCHIVO',
+                        help="Escribir todas las semanas en un solo PDF con índice en lugar de un archivo por semana")
+    args = parser.parse_args(argv)
+
+    # Las filas ilegibles se informan como reportes con error y el lote sigue
+    filas_invalidas = []
+
+    def registrar_fila_invalida(numero_fila, empleado, lunes, error):
+        resultado = resultado_fila_invalida(numero_fila, empleado, lunes, error)
+        filas_invalidas.append(resultado)
+        print(f"[{empleado or '?'}] ERROR {resultado['error']}", file=sys.stderr)
+
+    semanas = agrupar_semanas(
+        leer_filas(args.archivo), ordenado=args.ordenado, corte=args.corte, al_fallar=registrar_fila_invalida
+    )
+
+    if args.combinado:
+        semanas_fallidas = []
+
+        def registrar_semana_fallida(empleado, lunes, error):
+            resultado = resultado_semana_fallida(args.combinado, empleado, lunes, error)
+            semanas_fallidas.append(resultado)
+            print(f"[{empleado or '?'}] ERROR {resultado['error']}", file=sys.stderr)
+
+        try:
+            cantidad = generar_reporte_combinado(semanas, args.combinado, al_fallar=registrar_semana_fallida)
+        except Exception as e:
+            print(f"Error: no se pudo generar {args.combinado}: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        errores = filas_invalidas + semanas_fallidas
+        print(f"Semanas en {args.combinado}: {cantidad}, con error: {len(errores)}", file=sys.stderr)
+        return 1 if errores else 0
+
+    def mostrar_progreso(completados, resultado):
+        estado = "ERROR " + resultado['error'] if resultado['error'] else "OK"
+        print(f"[{completados}] {resultado['archivo']}: {estado}", file=sys.stderr)
+
+    # El cálculo de cada semana también ocurre en el pool, aislado por reporte
+    trabajos = (
+        {'empleado': empleado, 'lunes': lunes, 'turnos': turnos, 'directorio': args.directorio}
+        for empleado, lunes, turnos in semanas
+    )
+    resultados = generar_reportes_lote(trabajos, trabajadores=args.trabajadores, progreso=mostrar_progreso)
+    resultados = filas_invalidas + resultados
+
+    errores = [resultado for resultado in resultados if resultado['error']]
+    print(f"Reportes generados: {len(resultados) - len(errores)}, con error: {len(errores)}", file=sys.stderr)
+    return 1 if errores else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
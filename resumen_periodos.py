@@ -0,0 +1,68 @@
+"""Totales por mes, trimestre y año a partir de los agregados mensuales.
+
+Los agregados por empleado y mes se mantienen al guardar cada semana (ver
+almacen_semanas), por lo que un resumen anual combina como máximo doce filas
+por empleado en lugar de recorrer todos los registros diarios.
+"""
+from motor_salario import formato_horas_minutos_texto
+
+PERIODOS = {
+    'mes': "Mensual",
+    'trimestre': "Trimestral",
+    'anio': "Anual"
+}
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+         "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+
+def clave_periodo(mes, periodo):
+    """Convierte 'AAAA-MM' en la clave del período: 'AAAA-MM', 'AAAA-T1' o 'AAAA'"""
+    if periodo == 'mes':
+        return mes
+    anio, numero_mes = mes.split('-')
+    if periodo == 'trimestre':
+        return f"{anio}-T{(int(numero_mes) - 1) // 3 + 1}"
+    if periodo == 'anio':
+        return anio
+    raise ValueError(f"Período desconocido: {periodo!r} (use {', '.join(PERIODOS)})")
+
+def nombre_periodo(clave):
+    """Texto para mostrar una clave de período ('Marzo 2025', 'T1 2025', '2025')"""
+    if '-T' in clave:
+        anio, trimestre = clave.split('-')
+        return f"{trimestre} {anio}"
+    if '-' in clave:
+        anio, numero_mes = clave.split('-')
+        return f"{MESES[int(numero_mes) - 1]} {anio}"
+    return clave
+
+def combinar_agregados(filas_mes, periodo):
+    """Suma filas de agregados_mes por empleado y período, en orden"""
+    combinados = {}
+    for fila in filas_mes:
+        clave = (fila['empleado'], clave_periodo(fila['mes'], periodo))
+        if clave not in combinados:
+            combinados[clave] = {
+                'empleado': clave[0],
+                'periodo': clave[1],
+                'dias_trabajados': 0,
+                'minutos_trabajados': 0,
+                'pago_base': 0,
+                'recargos': 0,
+                'total_pagado': 0
+            }
+        total = combinados[clave]
+        for columna in ('dias_trabajados', 'minutos_trabajados', 'pago_base', 'recargos', 'total_pagado'):
+            total[columna] += fila[columna]
+
+    resultado = [combinados[clave] for clave in sorted(combinados)]
+    for total in resultado:
+        total['horas_texto'] = formato_horas_minutos_texto(total['minutos_trabajados'])
+    return resultado
+
+def resumen_por_periodo(almacen, periodo='mes', empleado=None, anio=None):
+    """Totales por período de un empleado (o de todos) en un año (o en todos)"""
+    clave_periodo('2000-01', periodo)  # Validar el período antes de consultar
+    desde, hasta = (f"{anio}-01", f"{anio}-12") if anio is not None else (None, None)
+    return combinar_agregados(almacen.agregados_mes(empleado, desde, hasta), periodo)
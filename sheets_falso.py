@@ -0,0 +1,170 @@
+"""Documento de Google Sheets falso para pruebas y mediciones sin conexión.
+
+Imita la parte de la API de gspread que usa la aplicación (worksheets,
+worksheet, add_worksheet, clear, update, format, batch_update,
+values_batch_get y get_lastUpdateTime), cuenta cada llamado como una
+solicitud, puede simular latencia y respuestas 429. batch_update rechaza el
+lote entero, como la API, si crea una hoja que ya existe o usa un id de hoja
+que no existe.
+"""
+import threading
+import time
+
+try:
+    from gspread import WorksheetNotFound
+except ImportError:
+    class WorksheetNotFound(Exception):
+        """Hoja inexistente (sustituto cuando gspread no está instalado)"""
+
+
+class ErrorCuotaFalso(Exception):
+    """Error equivalente a un APIError de gspread con código 429"""
+    code = 429
+
+class ErrorSolicitudFalso(Exception):
+    """Error equivalente a un APIError de gspread con código 400"""
+    code = 400
+
+
+class HojaFalsa:
+    """Hoja en memoria: valores por fila y lista de formatos aplicados"""
+
+    def __init__(self, documento, title, id_hoja):
+        self.documento = documento
+        self.title = title
+        self.id = id_hoja
+        self.valores = []
+        self.formatos = []
+
+    def clear(self):
+        self.documento._solicitud('clear')
+        self.valores = []
+
+    def update(self, rango, valores=None):
+        # gspread acepta update('A1', data) y update(data, 'A1')
+        if valores is None or isinstance(rango, list):
+            rango, valores = valores, rango
+        self.documento._solicitud('update')
+        self.valores = [list(fila) for fila in valores]
+
+    def format(self, rango, formato):
+        self.documento._solicitud('format')
+        self.formatos.append((rango, formato))
+
+
+class HojaCalculoFalsa:
+    """Documento en memoria con contador de solicitudes.
+
+    latencia: segundos que tarda cada solicitud.
+    errores_429: cantidad de solicitudes siguientes que fallarán por cuota.
+    """
+
+    def __init__(self, latencia=0.0, errores_429=0):
+        self.latencia = latencia
+        self.errores_429 = errores_429
+        self.solicitudes = 0
+        self.registro = []
+        self.hojas = {}
+        self.revision = 0
+        self._siguiente_id = 1
+        self._lock = threading.Lock()
+
+    def _solicitud(self, metodo):
+        with self._lock:
+            self.solicitudes += 1
+            self.registro.append(metodo)
+            if metodo in ('clear', 'update', 'add_worksheet', 'batch_update'):
+                self.revision += 1
+            error_429 = self.errores_429 > 0
+            if error_429:
+                self.errores_429 -= 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        if error_429:
+            raise ErrorCuotaFalso("Quota exceeded (429)")
+
+    def _crear_hoja(self, title, id_hoja=None):
+        if id_hoja is None:
+            id_hoja = self._siguiente_id
+        self._siguiente_id = max(self._siguiente_id, id_hoja) + 1
+        hoja = HojaFalsa(self, title, id_hoja)
+        self.hojas[title] = hoja
+        return hoja
+
+    def worksheets(self):
+        self._solicitud('worksheets')
+        return list(self.hojas.values())
+
+    def worksheet(self, title):
+        self._solicitud('worksheet')
+        if title not in self.hojas:
+            raise WorksheetNotFound(title)
+        return self.hojas[title]
+
+    def add_worksheet(self, title, rows=100, cols=20):
+        self._solicitud('add_worksheet')
+        return self._crear_hoja(title)
+
+    def _validar_lote(self, solicitudes):
+        """Lanza ErrorSolicitudFalso con el mensaje de la API si alguna solicitud no aplica"""
+        titulos = set(self.hojas)
+        ids = {hoja.id for hoja in self.hojas.values()}
+        for i, solicitud in enumerate(solicitudes):
+            if 'addSheet' in solicitud:
+                propiedades = solicitud['addSheet']['properties']
+                if propiedades['title'] in titulos:
+                    raise ErrorSolicitudFalso(
+                        f"Invalid requests[{i}].addSheet: A sheet with the name \"{propiedades['title']}\" already exists."
+                    )
+                titulos.add(propiedades['title'])
+                ids.add(propiedades.get('sheetId'))
+                continue
+            datos = next(iter(solicitud.values()))
+            id_hoja = (datos.get('range') or datos.get('start') or {}).get('sheetId')
+            if id_hoja is not None and id_hoja not in ids:
+                raise ErrorSolicitudFalso(f"Invalid requests[{i}].{next(iter(solicitud))}: No grid with id: {id_hoja}")
+
+    def batch_update(self, body):
+        self._solicitud('batch_update')
+        self._validar_lote(body.get('requests', []))
+        hojas_por_id = {hoja.id: hoja for hoja in self.hojas.values()}
+        for solicitud in body.get('requests', []):
+            if 'addSheet' in solicitud:
+                propiedades = solicitud['addSheet']['properties']
+                hoja = self._crear_hoja(propiedades['title'], propiedades.get('sheetId'))
+                hojas_por_id[hoja.id] = hoja
+            elif 'updateCells' in solicitud:
+                datos = solicitud['updateCells']
+                if 'range' in datos:
+                    hojas_por_id[datos['range']['sheetId']].valores = []
+                else:
+                    hojas_por_id[datos['start']['sheetId']].valores = [
+                        [self._valor(celda) for celda in fila.get('values', [])] for fila in datos['rows']
+                    ]
+            elif 'repeatCell' in solicitud:
+                datos = solicitud['repeatCell']
+                hojas_por_id[datos['range']['sheetId']].formatos.append((datos['range'], datos['cell']['userEnteredFormat']))
+        return {'replies': [{} for _ in body.get('requests', [])]}
+
+    def values_batch_get(self, ranges, params=None):
+        """Valores de varios rangos "'Hoja'!A1:J20" en el orden pedido (vacíos si la hoja no existe)"""
+        self._solicitud('values_batch_get')
+        rangos = []
+        for rango in ranges:
+            titulo = rango.rsplit('!', 1)[0].strip("'")
+            hoja = self.hojas.get(titulo)
+            rango_valores = {'range': rango, 'majorDimension': 'ROWS'}
+            if hoja is not None and hoja.valores:
+                rango_valores['values'] = [list(fila) for fila in hoja.valores]
+            rangos.append(rango_valores)
+        return {'valueRanges': rangos}
+
+    def get_lastUpdateTime(self):
+        """Revisión del documento; cambia con cada modificación"""
+        self._solicitud('get_lastUpdateTime')
+        return str(self.revision)
+
+    @staticmethod
+    def _valor(celda):
+        valor = celda.get('userEnteredValue', {})
+        return next(iter(valor.values()), "")
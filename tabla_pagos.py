@@ -0,0 +1,99 @@
+"""Tabla precalculada de pagos y textos de horas por minutos trabajados.
+
+El pago de un día depende solo de los minutos (0 a 1440), el recargo y la
+versión de tarifas, y el recargo se suma al final (ver calcular_pago_minutos).
+Por eso una tabla de 1441 entradas por versión, con pago base, descripción y
+los textos de formato_horas_minutos y formato_horas_minutos_texto, sirve
+para todos los recargos y convierte el cálculo de cada día en una consulta
+por índice.
+
+    tabla = obtener_tabla(reglas)
+    registros_semana, horarios_completos, total = calcular_semana(turnos, lunes, reglas, tabla)
+
+obtener_tabla compara las tarifas guardadas en la tabla con las actuales,
+así que un cambio de REGLAS_TARIFAS (actualizar_reglas_tarifas) produce una
+tabla nueva en el siguiente llamado.
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+from motor_salario import REGLAS_TARIFAS, calcular_pago_minutos, formato_horas_minutos, formato_horas_minutos_texto
+
+MINUTOS_TABLA = 24 * 60 + 1
+
+# Versiones de tarifas con tabla en memoria (cada una ocupa unos 300 KB)
+MAXIMO_TABLAS = 8
+
+
+class TablaPagos:
+    """Pago base, descripción y textos de horas de 0 a 1440 minutos para una versión de tarifas"""
+
+    def __init__(self, reglas):
+        self.reglas = copy.deepcopy(reglas)
+        self.pagos_base = []
+        self.descripciones = []
+        for minutos in range(MINUTOS_TABLA):
+            _, descripcion, pago_base = calcular_pago_minutos(minutos, 0, self.reglas)
+            self.pagos_base.append(pago_base)
+            self.descripciones.append(descripcion)
+        self.horas_formato = [formato_horas_minutos(minutos) for minutos in range(MINUTOS_TABLA)]
+        self.horas_texto = [formato_horas_minutos_texto(minutos) for minutos in range(MINUTOS_TABLA)]
+
+    def pago(self, minutos_trabajados, recargo):
+        """Igual que calcular_pago_minutos: (pago_total, descripcion, pago_base)"""
+        if minutos_trabajados == 0:
+            return 0, self.descripciones[0], 0
+        if minutos_trabajados >= MINUTOS_TABLA:
+            # Tramos fusionados que superan un día: fuera de la tabla
+            return calcular_pago_minutos(minutos_trabajados, recargo, self.reglas)
+        pago_base = self.pagos_base[minutos_trabajados]
+        return pago_base + recargo, self.descripciones[minutos_trabajados], pago_base
+
+    def registro_dia(self, dia, minutos_trabajados, recargo, sin_trabajo=False):
+        """Registro del día con las mismas claves y valores que calcular_registro_dia"""
+        if sin_trabajo:
+            minutos_trabajados = 0
+            recargo = 0
+        pago_total, descripcion, pago_base = self.pago(minutos_trabajados, recargo)
+        if minutos_trabajados < MINUTOS_TABLA:
+            horas_formato = self.horas_formato[minutos_trabajados]
+            horas_texto = self.horas_texto[minutos_trabajados]
+        else:
+            horas_formato = formato_horas_minutos(minutos_trabajados)
+            horas_texto = formato_horas_minutos_texto(minutos_trabajados)
+        return {
+            'dia': dia,
+            'minutos_trabajados': minutos_trabajados,
+            'horas_formato': horas_formato,
+            'horas_texto': horas_texto,
+            'horas_decimal': 0 if sin_trabajo else minutos_trabajados / 60,
+            'pago_base': pago_base,
+            'pago_total': pago_total,
+            'recargo': recargo,
+            'descripcion': descripcion,
+            'sin_trabajo': sin_trabajo
+        }
+
+
+_TABLAS = OrderedDict()
+_lock = threading.Lock()
+
+def obtener_tabla(reglas=None):
+    """Tabla de la versión de tarifas (REGLAS_TARIFAS por defecto), reconstruida si las tarifas cambiaron"""
+    if reglas is None:
+        reglas = REGLAS_TARIFAS
+    version = reglas['version']
+    with _lock:
+        tabla = _TABLAS.get(version)
+        if tabla is not None and tabla.reglas == reglas:
+            _TABLAS.move_to_end(version)
+            return tabla
+
+    tabla = TablaPagos(reglas)
+    with _lock:
+        _TABLAS[version] = tabla
+        _TABLAS.move_to_end(version)
+        while len(_TABLAS) > MAXIMO_TABLAS:
+            _TABLAS.popitem(last=False)
+    return tabla
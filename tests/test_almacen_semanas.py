@@ -0,0 +1,88 @@
+"""Totales mensuales (agregados_mes) del almacén de semanas."""
+import datetime
+
+import pytest
+
+from almacen_semanas import AlmacenSemanas
+from motor_salario import Turno, calcular_semana
+from reglas_tarifas import VERSION_POR_DEFECTO, normalizar_version
+
+REGLAS_ORIGINALES = normalizar_version(VERSION_POR_DEFECTO)
+# Semana que cruza de enero a febrero
+LUNES = datetime.date(2025, 1, 27)
+
+
+def semana(horas_por_dia, recargo=0):
+    """(registros_semana, horarios_completos) con turnos desde las 08:00 de lunes a domingo"""
+    turnos = [
+        Turno(LUNES + datetime.timedelta(days=i), datetime.time(8, 0), datetime.time(8 + horas, 0), recargo)
+        for i, horas in enumerate(horas_por_dia) if horas
+    ]
+    registros_semana, horarios_completos, _ = calcular_semana(turnos, LUNES, REGLAS_ORIGINALES)
+    return registros_semana, horarios_completos
+
+def agregados(almacen):
+    return {(fila['empleado'], fila['mes']): fila for fila in almacen.agregados_mes()}
+
+def agregados_reconstruidos(almacen):
+    """Agregados incrementales y recalculados desde los días (sin los meses solo con días sin trabajo)"""
+    antes = agregados(almacen)
+    almacen.reconstruir_agregados()
+    reconstruidos = {clave: fila for clave, fila in agregados(almacen).items() if fila['dias_trabajados']}
+    return antes, reconstruidos
+
+@pytest.fixture
+def almacen():
+    almacen = AlmacenSemanas(':memory:')
+    yield almacen
+    almacen.cerrar()
+
+
+def test_insertar(almacen):
+    registros_semana, horarios = semana([6, 4, 0, 0, 0, 8, 0])
+    assert almacen.guardar_semanas([('ana', LUNES, registros_semana, horarios, '1')]) == 1
+
+    totales = agregados(almacen)
+    assert totales[('ana', '2025-01')]['dias_trabajados'] == 2
+    assert totales[('ana', '2025-01')]['minutos_trabajados'] == 10 * 60
+    assert totales[('ana', '2025-01')]['total_pagado'] == 100000 + 4 * 15500
+    assert totales[('ana', '2025-02')]['dias_trabajados'] == 1
+    assert totales[('ana', '2025-02')]['total_pagado'] == 100000 + 2 * 15500
+
+    antes, reconstruidos = agregados_reconstruidos(almacen)
+    assert antes == reconstruidos
+
+def test_sobrescribir(almacen):
+    almacen.guardar_semanas([('ana', LUNES, *semana([6, 4, 0, 0, 0, 8, 0]), '1')])
+    almacen.guardar_semanas([('ana', LUNES, *semana([0, 2, 0, 0, 0, 0, 0], recargo=5000), '1')])
+
+    totales = agregados(almacen)
+    assert ('ana', '2025-02') not in totales
+    assert totales[('ana', '2025-01')]['dias_trabajados'] == 1
+    assert totales[('ana', '2025-01')]['recargos'] == 5000
+    assert totales[('ana', '2025-01')]['total_pagado'] == 2 * 15500 + 5000
+
+    antes, reconstruidos = agregados_reconstruidos(almacen)
+    assert antes == reconstruidos
+
+def test_semana_repetida_en_un_lote(almacen):
+    almacen.guardar_semanas([('ana', LUNES, *semana([6, 0, 0, 0, 0, 0, 0]), '1')])
+    guardadas = almacen.guardar_semanas([
+        ('ana', LUNES, *semana([6, 4, 0, 0, 0, 8, 0]), '1'),
+        ('beto', LUNES, *semana([0, 0, 3, 0, 0, 0, 0]), '1'),
+        ('ana', LUNES, *semana([0, 0, 0, 0, 0, 0, 7]), '1'),
+    ])
+    assert guardadas == 2
+
+    # Gana la última versión de la semana de ana
+    totales = agregados(almacen)
+    assert ('ana', '2025-01') not in totales
+    assert totales[('ana', '2025-02')]['dias_trabajados'] == 1
+    assert totales[('ana', '2025-02')]['total_pagado'] == 100000 + 15500
+    assert totales[('beto', '2025-01')]['total_pagado'] == 3 * 15500
+    registros_semana, _, total_semanal = almacen.cargar_semana('ana', LUNES)
+    assert total_semanal == 100000 + 15500
+    assert [registro['minutos_trabajados'] for registro in registros_semana] == [0, 0, 0, 0, 0, 0, 7 * 60]
+
+    antes, reconstruidos = agregados_reconstruidos(almacen)
+    assert antes == reconstruidos
@@ -0,0 +1,53 @@
+"""División de turnos nocturnos entre días y semanas."""
+import datetime
+
+import pytest
+
+from atribucion_turnos import CORTE_MEDIANOCHE, CORTE_NINGUNO, CORTE_SEMANA, atribuir_turno, dividir_turno
+from motor_salario import Turno
+
+DOMINGO = datetime.date(2025, 1, 12)
+MIERCOLES = datetime.date(2025, 1, 8)
+MEDIANOCHE = datetime.time(0, 0)
+
+
+def turno_nocturno(fecha, recargo=5000):
+    return Turno(fecha, datetime.time(22, 0), datetime.time(6, 0), recargo)
+
+
+@pytest.mark.parametrize('corte', [CORTE_SEMANA, CORTE_MEDIANOCHE])
+def test_domingo_noche_se_divide_en_el_lunes(corte):
+    assert atribuir_turno(turno_nocturno(DOMINGO), corte) == [
+        Turno(DOMINGO, datetime.time(22, 0), MEDIANOCHE, 5000),
+        Turno(DOMINGO + datetime.timedelta(days=1), MEDIANOCHE, datetime.time(6, 0), 0),
+    ]
+
+def test_entre_semana_solo_divide_el_corte_medianoche():
+    turno = turno_nocturno(MIERCOLES)
+    assert atribuir_turno(turno, CORTE_SEMANA) == [Turno(MIERCOLES, datetime.time(22, 0), datetime.time(6, 0), 5000)]
+    assert atribuir_turno(turno, CORTE_MEDIANOCHE) == [
+        Turno(MIERCOLES, datetime.time(22, 0), MEDIANOCHE, 5000),
+        Turno(MIERCOLES + datetime.timedelta(days=1), MEDIANOCHE, datetime.time(6, 0), 0),
+    ]
+
+def test_sin_corte_no_divide():
+    assert atribuir_turno(turno_nocturno(DOMINGO), CORTE_NINGUNO) == [turno_nocturno(DOMINGO)]
+
+def test_turno_que_termina_a_medianoche_no_se_divide():
+    inicio = datetime.datetime.combine(DOMINGO, datetime.time(16, 0))
+    assert dividir_turno(inicio, inicio + datetime.timedelta(hours=8), corte=CORTE_MEDIANOCHE) == [
+        Turno(DOMINGO, datetime.time(16, 0), MEDIANOCHE, 0)
+    ]
+
+def test_dia_sin_trabajo_no_se_toca():
+    turno = Turno(DOMINGO, MEDIANOCHE, MEDIANOCHE, 0, sin_trabajo=True)
+    assert atribuir_turno(turno, CORTE_MEDIANOCHE) == [turno]
+
+def test_turnos_invalidos():
+    inicio = datetime.datetime.combine(DOMINGO, datetime.time(8, 0))
+    with pytest.raises(ValueError):
+        dividir_turno(inicio, inicio + datetime.timedelta(days=1))
+    with pytest.raises(ValueError):
+        dividir_turno(inicio, inicio - datetime.timedelta(minutes=1))
+    with pytest.raises(ValueError):
+        dividir_turno(inicio, inicio + datetime.timedelta(hours=18), corte='dia')
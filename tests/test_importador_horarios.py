@@ -0,0 +1,101 @@
+"""Lectura de filas del importador de horarios."""
+import datetime
+
+import pytest
+
+import reglas_tarifas
+from atribucion_turnos import CORTE_NINGUNO, CORTE_SEMANA
+from importador_horarios import agrupar_semanas, fila_a_turno, parsear_recargo
+from motor_salario import calcular_semana
+from reglas_tarifas import CatalogoTarifas, VERSION_POR_DEFECTO
+
+
+@pytest.fixture
+def catalogo_historico(monkeypatch):
+    """Dos versiones: la de 2025 retira el recargo 'Nocturno' y sube el de '$5,000'"""
+    version_2024 = dict(VERSION_POR_DEFECTO, version='2024', vigente_desde='2024-01-01',
+                        recargos_disponibles={'Ninguno': 0, '$5,000': 5000, 'Nocturno': 8000})
+    version_2025 = dict(VERSION_POR_DEFECTO, version='2025', vigente_desde='2025-01-01',
+                        recargos_disponibles={'Ninguno': 0, '$5,000': 6000})
+    monkeypatch.setattr(reglas_tarifas, '_catalogo', CatalogoTarifas([version_2024, version_2025]))
+
+
+def test_etiqueta_con_la_version_de_la_fecha(catalogo_historico):
+    assert parsear_recargo('Nocturno', datetime.date(2024, 6, 3)) == 8000
+    assert parsear_recargo('$5,000', datetime.date(2024, 6, 3)) == 5000
+    assert parsear_recargo('$5,000', datetime.date(2025, 6, 2)) == 6000
+    with pytest.raises(ValueError):
+        parsear_recargo('Nocturno', datetime.date(2025, 6, 2))
+
+def test_montos_sin_etiqueta(catalogo_historico):
+    assert parsear_recargo('7000', datetime.date(2025, 6, 2)) == 7000
+    assert parsear_recargo('$12,500', datetime.date(2025, 6, 2)) == 12500
+    assert parsear_recargo('', datetime.date(2025, 6, 2)) == 0
+    assert parsear_recargo(None) == 0
+
+def test_fila_usa_la_fecha_del_turno(catalogo_historico):
+    fila = {'employee': 'ana', 'date': '2024-12-31', 'entrada': '22:00', 'salida': '06:00', 'recargo': 'Nocturno'}
+    empleado, turno = fila_a_turno(fila)
+    assert (empleado, turno.recargo) == ('ana', 8000)
+
+def fila(empleado, fecha, entrada='08:00', salida='16:00', recargo=''):
+    return {'employee': empleado, 'date': fecha, 'entrada': entrada, 'salida': salida, 'recargo': recargo}
+
+def minutos_por_semana(semanas):
+    return {
+        (empleado, lunes): sum(registro['minutos_trabajados'] for registro in calcular_semana(turnos, lunes)[0])
+        for empleado, lunes, turnos in semanas
+    }
+
+def test_domingo_noche_segun_corte():
+    filas = [fila('ana', '2025-01-12', '22:00', '06:00')]
+    semana_domingo, semana_siguiente = datetime.date(2025, 1, 6), datetime.date(2025, 1, 13)
+
+    assert minutos_por_semana(agrupar_semanas(filas, corte=CORTE_SEMANA)) == {
+        ('ana', semana_domingo): 120, ('ana', semana_siguiente): 360
+    }
+    assert minutos_por_semana(agrupar_semanas(filas, corte=CORTE_NINGUNO)) == {('ana', semana_domingo): 480}
+
+def test_ordenado_rechaza_una_semana_ya_emitida():
+    filas = [fila('ana', '2025-01-06'), fila('ana', '2025-01-14'), fila('beto', '2025-01-07')]
+    semanas = agrupar_semanas(filas, ordenado=True)
+
+    assert next(semanas)[:2] == ('ana', datetime.date(2025, 1, 6))
+    with pytest.raises(ValueError, match=r'Fila 3: el archivo no está ordenado'):
+        list(semanas)
+    # Sin ordenado la misma entrada es válida
+    assert len(list(agrupar_semanas(filas))) == 3
+
+def test_ordenado_con_al_fallar_informa_y_sigue():
+    filas = [fila('ana', '2025-01-06'), fila('ana', '2025-01-14'), fila('beto', '2025-01-07'), fila('beto', '2025-01-15')]
+    fallas = []
+    semanas = list(agrupar_semanas(filas, ordenado=True, al_fallar=lambda *falla: fallas.append(falla)))
+
+    assert [semana[:2] for semana in semanas] == [
+        ('ana', datetime.date(2025, 1, 6)), ('ana', datetime.date(2025, 1, 13)), ('beto', datetime.date(2025, 1, 13))
+    ]
+    assert [falla[:3] for falla in fallas] == [(3, 'beto', datetime.date(2025, 1, 6))]
+
+def test_fila_invalida_va_a_al_fallar_y_descarta_su_semana():
+    filas = [
+        fila('ana', '2025-01-06'),
+        fila('ana', '2025-01-07', entrada='xx'),
+        fila('ana', '2025-01-08'),
+        fila('ana', '2025-01-14'),
+        fila('beto', 'no-es-fecha'),
+        {'employee': 'carla', 'entrada': '08:00', 'salida': '16:00'},
+    ]
+    fallas = []
+    semanas = list(agrupar_semanas(filas, al_fallar=lambda *falla: fallas.append(falla)))
+
+    # La semana de ana con la fila inválida no se emite incompleta; la siguiente sí
+    assert [semana[:2] for semana in semanas] == [('ana', datetime.date(2025, 1, 13))]
+    assert [(numero, empleado, lunes) for numero, empleado, lunes, _ in fallas] == [
+        (2, 'ana', datetime.date(2025, 1, 6)), (5, 'beto', None), (6, 'carla', None)
+    ]
+    assert all(isinstance(error, ValueError) for *_, error in fallas)
+    assert "falta la columna 'date'" in str(fallas[2][3])
+
+def test_fila_invalida_sin_al_fallar():
+    with pytest.raises(ValueError, match=r"Fila 2: Hora inválida: 'xx'"):
+        list(agrupar_semanas([fila('ana', '2025-01-06'), fila('ana', '2025-01-07', entrada='xx')]))
@@ -0,0 +1,46 @@
+"""Lectura de semanas desde un documento de Sheets (sheets_falso)."""
+import datetime
+import logging
+
+from exportador_sheets import EscritorSheets
+from lector_sheets import LectorSheets
+from motor_salario import Turno, calcular_semana
+from reglas_tarifas import VERSION_POR_DEFECTO, normalizar_version
+from sheets_falso import HojaCalculoFalsa
+
+REGLAS_ORIGINALES = normalizar_version(VERSION_POR_DEFECTO)
+
+
+def guardar_semana(documento, lunes):
+    turnos = [Turno(lunes, datetime.time(8, 0), datetime.time(14, 0), 5000)]
+    registros_semana, horarios_completos, total_semanal = calcular_semana(turnos, lunes, REGLAS_ORIGINALES)
+    lunes = datetime.datetime.combine(lunes, datetime.time())
+    escritor = EscritorSheets(documento)
+    escritor.encolar(registros_semana, total_semanal, horarios_completos, lunes, lunes + datetime.timedelta(days=6))
+    escritor.vaciar()
+    return total_semanal
+
+
+def test_hojas_omitidas_se_informan(caplog):
+    documento = HojaCalculoFalsa()
+    total_semanal = guardar_semana(documento, datetime.date(2025, 1, 6))
+    guardar_semana(documento, datetime.date(2025, 1, 13))
+    # Una semana con una celda que no se puede leer y una hoja que no es semanal
+    documento.hojas['Semana_13_01_25_a_19_01_25'].valores[1][4] = 'seis horas'
+    documento.add_worksheet('Notas').update('A1', [['texto libre']])
+
+    lector = LectorSheets(documento, dormir=lambda segundos: None)
+    with caplog.at_level(logging.WARNING, logger='lector_sheets'):
+        semanas = lector.leer_semanas(nombres_hojas=[
+            'Semana_06_01_25_a_12_01_25', 'Semana_13_01_25_a_19_01_25', 'Notas'
+        ])
+
+    assert [(semana['nombre_hoja'], semana['total_semanal']) for semana in semanas] == [
+        ('Semana_06_01_25_a_12_01_25', total_semanal)
+    ]
+    assert sorted(lector.hojas_omitidas) == ['Notas', 'Semana_13_01_25_a_19_01_25']
+    assert 'Notas' in caplog.text and 'Semana_13_01_25_a_19_01_25' in caplog.text
+
+    # Cada lectura informa solo sus propias omisiones
+    lector.leer_semanas(nombres_hojas=['Semana_06_01_25_a_12_01_25'])
+    assert lector.hojas_omitidas == {}
@@ -0,0 +1,103 @@
+"""Pago entero por minutos (calcular_pago_minutos) contra el cálculo flotante original."""
+import random
+from fractions import Fraction
+
+import pytest
+
+from motor_salario import calcular_pago_dia, calcular_pago_minutos, redondear_division
+from reglas_tarifas import VERSION_POR_DEFECTO, normalizar_version, obtener_catalogo
+
+MINUTOS_DIA = 24 * 60
+
+# Tarifas originales fijas, para que los límites no dependan de reglas_tarifas.json
+REGLAS_ORIGINALES = normalizar_version(VERSION_POR_DEFECTO)
+
+CASOS_CATALOGO = [
+    pytest.param(reglas, recargo, id=f"v{reglas['version']}-{nombre}")
+    for reglas in obtener_catalogo().versiones + [REGLAS_ORIGINALES]
+    for nombre, recargo in reglas['recargos_disponibles'].items()
+]
+
+
+@pytest.mark.parametrize('reglas, recargo', CASOS_CATALOGO)
+def test_igual_al_calculo_flotante_en_todo_el_dia(reglas, recargo):
+    for minutos in range(MINUTOS_DIA + 1):
+        assert calcular_pago_minutos(minutos, recargo, reglas) == calcular_pago_dia(minutos / 60, recargo, reglas), minutos
+
+@pytest.mark.parametrize('reglas, recargo', CASOS_CATALOGO)
+def test_total_es_base_mas_recargo_en_enteros(reglas, recargo):
+    for minutos in range(1, MINUTOS_DIA + 1):
+        pago_total, _, pago_base = calcular_pago_minutos(minutos, recargo, reglas)
+        assert type(pago_total) is int and type(pago_base) is int
+        assert pago_total == pago_base + recargo
+
+@pytest.mark.parametrize('minutos, pago_base, descripcion', [
+    (0, 0, "Día sin trabajo"),
+    (1, 258, "Horas normales (0.02h)"),
+    (30, 7750, "Horas normales (0.50h)"),
+    (359, 92742, "Horas normales (5.98h)"),
+    (360, 100000, "6 horas completas"),
+    (361, 100258, "6h + 0.02h extra"),
+    (390, 107750, "6h + 0.50h extra"),
+    (MINUTOS_DIA, 379000, "6h + 18.00h extra"),
+])
+def test_limites_de_tramos(minutos, pago_base, descripcion):
+    assert calcular_pago_minutos(minutos, 0, REGLAS_ORIGINALES) == (pago_base, descripcion, pago_base)
+    assert calcular_pago_minutos(minutos, 5000, REGLAS_ORIGINALES)[0] == pago_base + (5000 if minutos else 0)
+
+def test_sin_trabajo_ignora_recargo():
+    assert calcular_pago_minutos(0, 40000, REGLAS_ORIGINALES) == (0, "Día sin trabajo", 0)
+
+def test_umbral_configurable():
+    reglas = dict(REGLAS_ORIGINALES, umbral_horas=8, tarifa_6_horas=130000)
+    assert calcular_pago_minutos(479, 0, reglas)[2] == redondear_division(479 * 15500, 60)
+    assert calcular_pago_minutos(480, 0, reglas) == (130000, "8 horas completas", 130000)
+    assert calcular_pago_minutos(540, 0, reglas)[2] == 130000 + 15500
+
+@pytest.mark.parametrize('numerador, denominador, esperado', [
+    (1, 2, 0), (3, 2, 2), (5, 2, 2), (7, 2, 4), (29, 60, 0), (30, 60, 0), (90, 60, 2), (31, 60, 1), (59, 60, 1),
+])
+def test_redondeo_al_par(numerador, denominador, esperado):
+    assert redondear_division(numerador, denominador) == esperado
+    assert redondear_division(numerador, denominador) == round(numerador / denominador)
+
+def pago_base_exacto(minutos, reglas):
+    """Pago base sin redondear, como fracción"""
+    minutos_umbral = reglas['umbral_horas'] * 60
+    if minutos == 0:
+        return Fraction(0)
+    if minutos < minutos_umbral:
+        return Fraction(minutos * reglas['hora_normal'], 60)
+    return reglas['tarifa_6_horas'] + Fraction((minutos - minutos_umbral) * reglas['hora_normal'], 60)
+
+def reglas_aleatorias(aleatorio):
+    """Tarifas al azar; la mitad con hora normal múltiplo de 30, que produce empates exactos (,5)"""
+    umbral_horas = aleatorio.randrange(1, 13)
+    hora_normal = aleatorio.choice((aleatorio.randrange(1000, 50000), aleatorio.randrange(100, 5000) * 30))
+    return {
+        'hora_normal': hora_normal,
+        'tarifa_6_horas': hora_normal * umbral_horas + aleatorio.randrange(-5000, 5000),
+        'umbral_horas': umbral_horas,
+    }
+
+@pytest.mark.parametrize('semilla', range(50))
+def test_propiedades_con_tarifas_aleatorias(semilla):
+    aleatorio = random.Random(semilla)
+    reglas = reglas_aleatorias(aleatorio)
+    umbral_horas = reglas['umbral_horas']
+    recargo = aleatorio.randrange(0, 50001)
+    anterior = 0
+    for minutos in range(MINUTOS_DIA + 1):
+        pago_total, _, pago_base = calcular_pago_minutos(minutos, recargo, reglas)
+        exacto = pago_base_exacto(minutos, reglas)
+        # Un solo redondeo, al entero más cercano
+        assert abs(pago_base - exacto) <= Fraction(1, 2)
+        if minutos:
+            assert pago_total == pago_base + recargo
+        # Al llegar justo al umbral el pago pasa a la tarifa fija, que puede ser menor
+        if minutos != umbral_horas * 60:
+            assert pago_base >= anterior
+        anterior = pago_base
+        # Solo un empate exacto (,5) puede redondearse distinto que en punto flotante
+        if (pago_total, pago_base) != calcular_pago_dia(minutos / 60, recargo, reglas)[::2]:
+            assert (exacto * 2).denominator == 1
@@ -0,0 +1,83 @@
+"""Registros compactos (RegistroDia, DiasCompactos) contra los registros dict del motor."""
+import datetime
+
+from motor_salario import Turno, calcular_semana
+from registros_compactos import DiasCompactos, RegistroDia
+from reglas_tarifas import VERSION_POR_DEFECTO, normalizar_version
+from tabla_pagos import obtener_tabla
+
+REGLAS_ORIGINALES = normalizar_version(VERSION_POR_DEFECTO)
+LUNES = datetime.date(2025, 1, 6)
+
+
+def turnos_semana():
+    return [
+        Turno(LUNES, datetime.time(8, 0), datetime.time(14, 0), 5000),
+        Turno(LUNES + datetime.timedelta(days=1), datetime.time(8, 0), datetime.time(12, 0)),
+        Turno(LUNES + datetime.timedelta(days=1), datetime.time(11, 0), datetime.time(15, 30), 10000),
+        Turno(LUNES + datetime.timedelta(days=3), datetime.time(22, 0), datetime.time(6, 15)),
+        Turno(LUNES + datetime.timedelta(days=4), datetime.time(0, 0), datetime.time(0, 0), 40000, sin_trabajo=True),
+    ]
+
+def version(numero, umbral_horas):
+    return normalizar_version(dict(VERSION_POR_DEFECTO, version=str(numero), umbral_horas=umbral_horas))
+
+
+def test_semana_compacta_igual_a_la_de_dicts():
+    for tabla in (None, obtener_tabla(REGLAS_ORIGINALES)):
+        registros, horarios, total = calcular_semana(turnos_semana(), LUNES, REGLAS_ORIGINALES, tabla)
+        compactos, horarios_compactos, total_compacto = calcular_semana(
+            turnos_semana(), LUNES, REGLAS_ORIGINALES, tabla, compacto=True
+        )
+        assert all(isinstance(registro, RegistroDia) for registro in compactos)
+        assert [registro.a_dict() for registro in compactos] == registros
+        assert (horarios_compactos, total_compacto) == (horarios, total)
+
+def test_descripcion_con_la_version_del_registro():
+    siete_horas = version('7h', 7)
+    registro = RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(15, 0), 0, reglas=siete_horas)
+    assert registro.descripcion == "7 horas completas"
+    assert registro['descripcion'] == "7 horas completas"
+
+def test_sin_reglas_se_fija_la_version_al_crear(monkeypatch):
+    import registros_compactos
+
+    class Catalogo:
+        def __init__(self, reglas):
+            self.reglas = reglas
+
+        def vigente(self):
+            return self.reglas
+
+    monkeypatch.setattr(registros_compactos, 'obtener_catalogo', lambda: Catalogo(REGLAS_ORIGINALES))
+    registro = RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(15, 0), 0)
+    dias = DiasCompactos()
+    dias.agregar_registro(registro.a_dict())
+
+    # Una recarga posterior de las tarifas no cambia los textos ya calculados
+    monkeypatch.setattr(registros_compactos, 'obtener_catalogo', lambda: Catalogo(version('8h', 8)))
+    assert registro.descripcion == "6h + 1.00h extra"
+    assert dias[0].descripcion == "6h + 1.00h extra"
+
+def test_mas_de_255_versiones():
+    dias = DiasCompactos()
+    versiones = [version(i, 1 + i % 12) for i in range(300)]
+    for reglas in versiones:
+        dias.agregar_registro(RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(14, 0), 0, reglas=reglas))
+    # Repetir una versión no agrega otra entrada
+    dias.agregar_registro(RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(14, 0), 0, reglas=versiones[-1]))
+
+    assert len(dias.versiones) == 300
+    assert dias.indice_version[-1] == 299
+    for i, reglas in enumerate(versiones):
+        assert dias[i].reglas is reglas
+        assert dias[i].descripcion == RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(14, 0), 0, reglas=reglas).descripcion
+
+def test_misma_version_con_otro_contenido_no_se_confunde():
+    original = version('1', 6)
+    editada = dict(original, umbral_horas=4)
+    dias = DiasCompactos()
+    for reglas in (original, editada):
+        dias.agregar_registro(RegistroDia.calcular(0, datetime.time(8, 0), datetime.time(13, 0), 0, reglas=reglas))
+    assert dias[0].descripcion == "Horas normales (5.00h)"
+    assert dias[1].descripcion == "4h + 1.00h extra"